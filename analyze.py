@@ -0,0 +1,52 @@
+import argparse
+import json
+import logging
+import os
+from pathlib import Path
+
+from supplier.report_analyzer import DEFAULT_CHUNK_ROWS, analyze_reports, find_reports, merge_analyses
+
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.WARNING)
+logging.getLogger().addHandler(console_handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summaries, percentiles and memory leak verdicts of reports')
+    parser.add_argument('reports', help='Reports (csv or npcol) or directories of reports', type=str, nargs='+')
+    parser.add_argument('-w', '--workers', help='Number of processes analyzing the reports in parallel', type=int,
+                        default=os.cpu_count())
+    parser.add_argument('--chunk-rows', help='Number of rows of a report read at once', type=int,
+                        default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--leak-tolerance', help='Tolerated memory decrease before the leak trend is reset '
+                                                 '(in percent)', type=float, default=1.0)
+    parser.add_argument('-o', '--output', help='JSON file with the analysis of each report and their total',
+                        type=str, default=None)
+    args = parser.parse_args()
+    if args.workers < 1 or args.chunk_rows < 1:
+        parser.error('the number of workers and chunk rows should be at least 1')
+
+    try:
+        paths = find_reports([Path(report) for report in args.reports])
+        if not paths:
+            raise RuntimeError('No report has been found')
+        analyses = analyze_reports(paths, workers=args.workers, chunk_rows=args.chunk_rows,
+                                   leak_tolerance=args.leak_tolerance)
+    except RuntimeError as runtime_error:
+        logging.error(str(runtime_error))
+        return
+
+    total = merge_analyses('all reports', analyses)
+    for analysis in analyses + ([total] if len(analyses) > 1 else []):
+        for line in analysis.summary():
+            print(line)
+        print()
+
+    if args.output is not None:
+        content = {'reports': [analysis.to_dict() for analysis in analyses], 'total': total.to_dict()}
+        Path(args.output).write_text(json.dumps(content, indent=2))
+        print(f'Analysis written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
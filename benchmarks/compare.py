@@ -0,0 +1,49 @@
+import argparse
+import json
+from pathlib import Path
+from typing import List, Tuple
+
+
+def load_results(path: Path) -> dict:
+    try:
+        content = json.loads(path.read_text())
+    except (OSError, ValueError) as error:
+        raise RuntimeError(f'Benchmark results {path} cannot be read: {error}')
+    return {
+        (result['name'], json.dumps(result['parameters'], sort_keys=True)): result['metrics']
+        for result in content['results']
+    }
+
+
+def compare(baseline: dict, current: dict) -> List[Tuple[str, str, str, float, float, float]]:
+    # Only the benchmarks present in both results are compared, change in percent of the baseline
+    rows = []
+    for key, metrics in current.items():
+        if key not in baseline:
+            continue
+        name, parameters = key
+        for metric, value in metrics.items():
+            reference = baseline[key].get(metric)
+            if reference is None:
+                continue
+            change = (value - reference) / reference * 100 if reference else 0.0
+            rows.append((name, parameters, metric, reference, value, change))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compare two benchmark results')
+    parser.add_argument('baseline', help='JSON results of the reference version', type=str)
+    parser.add_argument('current', help='JSON results of the version to compare', type=str)
+    parser.add_argument('--threshold', help='Only show the changes greater than this percentage', type=float,
+                        default=0.0)
+    args = parser.parse_args()
+
+    for name, parameters, metric, reference, value, change in compare(load_results(Path(args.baseline)),
+                                                                      load_results(Path(args.current))):
+        if abs(change) >= args.threshold:
+            print(f'{name} {parameters} {metric}: {round(reference, 3)} -> {round(value, 3)} ({change:+.1f}%)')
+
+
+if __name__ == '__main__':
+    main()
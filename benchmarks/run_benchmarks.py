@@ -0,0 +1,350 @@
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import psutil
+
+from benchmarks import workload
+from model.configuration import Configuration
+from model.leak_detector import MemoryLeakDetector
+from model.running_statistics import RunningAggregates
+from model.sample_buffer import SampleBuffer
+from model.trend_detector import TrendDetector, trend_tests
+from supplier.process_monitoring import ProcessMonitoring, REPORT_COLUMNS
+from supplier.report_writer import CsvReportWriter, NpcolReportWriter
+from utils.date_utils import serialize_datetime_to_file_format
+
+RESULTS_VERSION = 1
+HISTORY_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+PERSIST_SIZES = [10_000, 100_000, 1_000_000]
+TREND_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+METRICS = ['cpu_percent', 'private_memory', 'handles_fds']
+# Imports of a fresh interpreter, the monitoring alone and with pandas as it was imported before being lazy
+STARTUP_IMPORTS = {
+    'monitoring': 'import main',
+    'monitoring_with_pandas': 'import pandas, main',
+}
+STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+{imports}
+duration = time.perf_counter() - start
+import psutil
+print(json.dumps({{'import_s': duration, 'rss_bytes': psutil.Process().memory_info().rss,
+                  'pandas_loaded': 'pandas' in sys.modules}}))
+'''
+FakeMemory = namedtuple('FakeMemory', ['rss', 'uss'])
+
+
+class FakeProcess:
+    # Stands for psutil.Process with constant values, so only the cost of the application is measured
+
+    def __init__(self, pid: int = 1234) -> None:
+        self.pid = pid
+        self._memory = FakeMemory(rss=2 * 1024 ** 2, uss=1024 ** 2)
+
+    def oneshot(self):
+        return nullcontext()
+
+    def cpu_percent(self) -> float:
+        return 12.5
+
+    def memory_info(self):
+        return self._memory
+
+    def memory_full_info(self):
+        return self._memory
+
+    def num_fds(self) -> int:
+        return 8
+
+    def num_handles(self) -> int:
+        return 8
+
+
+def latency(durations: List[float]) -> Dict[str, float]:
+    # Durations in seconds, statistics in microseconds
+    durations = sorted(duration * 1e6 for duration in durations)
+    return {
+        'count': len(durations),
+        'mean_us': statistics.fmean(durations),
+        'median_us': statistics.median(durations),
+        'p95_us': durations[int(len(durations) * 0.95) - 1],
+        'p99_us': durations[int(len(durations) * 0.99) - 1],
+        'max_us': durations[-1],
+    }
+
+
+def time_calls(function: Callable[[], None], count: int) -> List[float]:
+    durations = []
+    for _ in range(count):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def create_monitoring(directory: Path, **options) -> ProcessMonitoring:
+    configuration = Configuration(
+        process_name='workload',
+        duration=3600,
+        sampling=1,
+        reports_directory=directory,
+        logs_directory=directory,
+        console='quiet',
+        **options
+    )
+    return ProcessMonitoring(configuration=configuration)
+
+
+def bench_process_metrics(directory: Path, samples: int, workload_pid: int = None) -> List[dict]:
+    results = []
+    variants = [('mocked', 'psutil', 'full')]
+    if workload_pid is not None:
+        variants += [('workload', backend, tier) for backend in ['psutil', 'procfs'] for tier in ['rss', 'rollup', 'full']]
+
+    for source, backend, tier in variants:
+        monitoring = create_monitoring(directory, backend=backend, memory_tier=tier)
+        monitoring._process = FakeProcess() if source == 'mocked' else monitoring._open_process(workload_pid)
+        monitoring._process.cpu_percent()
+
+        durations = time_calls(monitoring._process_metrics, samples)
+        monitoring._close()
+        results.append({
+            'name': 'process_metrics',
+            'parameters': {'process': source, 'backend': backend, 'memory_tier': tier},
+            'metrics': latency(durations),
+        })
+    return results
+
+
+def bench_history(sizes: List[int], operations: int = 1000) -> List[dict]:
+    # The cost per sample of the aggregates and of the leak detection should not depend on the history size
+    results = []
+    for size in sizes:
+        for window in [None, 1000]:
+            detector = MemoryLeakDetector(window=window)
+            aggregates = RunningAggregates(metrics=METRICS)
+            sample = {'cpu_percent': 12.5, 'private_memory': 0, 'handles_fds': 8}
+
+            start = time.perf_counter()
+            for index in range(size):
+                sample['private_memory'] = index
+                aggregates.update(sample)
+                detector.update(index)
+            fill = time.perf_counter() - start
+
+            update_durations = time_calls(lambda: (aggregates.update(sample), detector.update(size)), operations)
+            leak_durations = time_calls(lambda: detector.is_leaking, operations)
+            means_durations = time_calls(aggregates.means, operations)
+            results.append({
+                'name': 'history',
+                'parameters': {'size': size, 'leak_window': window},
+                'metrics': {
+                    'fill_ns_per_sample': fill / size * 1e9,
+                    'update_median_us': latency(update_durations)['median_us'],
+                    'has_potential_memory_leak_median_us': latency(leak_durations)['median_us'],
+                    'aggregates_median_us': latency(means_durations)['median_us'],
+                },
+            })
+            logging.info(f'History of {size} samples benchmarked')
+    return results
+
+
+def bench_trends(sizes: List[int], operations: int = 5) -> List[dict]:
+    # The trend tests are evaluated on a bounded number of points whatever the number of samples
+    results = []
+    generator = np.random.default_rng(42)
+    for size in sizes:
+        elapsed = np.arange(size, dtype=np.float64)
+        values = np.vstack([generator.normal(12.5, 2, size), 1024 ** 2 + elapsed * 10, np.full(size, 8.0)])
+        test_durations = time_calls(lambda: trend_tests(elapsed, values), operations)
+
+        detector = TrendDetector(metrics=METRICS)
+        sample = {'cpu_percent': 12.5, 'private_memory': 0, 'handles_fds': 8}
+        start = time.perf_counter()
+        for index in range(size):
+            sample['private_memory'] = index
+            detector.update(sample, float(index))
+        fill = time.perf_counter() - start
+        evaluate_durations = time_calls(detector.evaluate, operations)
+        results.append({
+            'name': 'trends',
+            'parameters': {'size': size},
+            'metrics': {
+                'trend_tests_median_ms': statistics.median(test_durations) * 1e3,
+                'update_ns_per_sample': fill / size * 1e9,
+                'evaluate_median_ms': statistics.median(evaluate_durations) * 1e3,
+            },
+        })
+        logging.info(f'Trends of {size} samples benchmarked')
+    return results
+
+
+def bench_startup(runs: int = 5) -> List[dict]:
+    # Import time and baseline rss of the monitoring, each run in a new interpreter so nothing is cached
+    results = []
+    root = Path(__file__).resolve().parent.parent
+    for name, imports in STARTUP_IMPORTS.items():
+        measures = []
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT.format(imports=imports)], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout
+            measures.append(json.loads(output))
+        results.append({
+            'name': 'startup',
+            'parameters': {'imports': name},
+            'metrics': {
+                'import_median_ms': statistics.median(measure['import_s'] for measure in measures) * 1e3,
+                'rss_bytes': statistics.median(measure['rss_bytes'] for measure in measures),
+                'pandas_loaded': int(measures[0]['pandas_loaded']),
+            },
+        })
+        logging.info(f'Startup with {name} benchmarked')
+    return results
+
+
+def fill_samples(size: int) -> SampleBuffer:
+    samples = SampleBuffer(columns=REPORT_COLUMNS, initial_capacity=size)
+    timestamp = datetime(2024, 2, 10, 17, 0)
+    for index in range(size):
+        samples.append({
+            'timestamp': timestamp,
+            'cpu_percent': 12.5,
+            'private_memory': index,
+            'handles_fds': 8,
+            'memory_tier': 'full',
+            'lateness': 0.0001,
+        })
+    return samples
+
+
+def bench_persist(directory: Path, sizes: List[int]) -> List[dict]:
+    results = []
+    for size in sizes:
+        for report_format, writer_class in [('csv', CsvReportWriter), ('npcol', NpcolReportWriter)]:
+            samples = fill_samples(size)
+            path = directory.joinpath(f'persist_{size}.{report_format}')
+            options = {'dtypes': samples.dtypes} if report_format == 'npcol' else {}
+            writer = writer_class(path=path, columns=samples.columns, **options)
+
+            start = time.perf_counter()
+            writer.flush(samples)
+            writer.close()
+            duration = time.perf_counter() - start
+
+            report_size = sum(file.stat().st_size for file in path.iterdir()) if path.is_dir() else path.stat().st_size
+            results.append({
+                'name': 'persist',
+                'parameters': {'rows': size, 'report_format': report_format},
+                'metrics': {
+                    'duration_s': duration,
+                    'rows_per_s': size / duration,
+                    'mb_per_s': report_size / 1024 ** 2 / duration,
+                    'report_bytes': report_size,
+                },
+            })
+    return results
+
+
+def bench_memory(directory: Path, sizes: List[int]) -> List[dict]:
+    # Memory allocated by a whole monitoring after N samples, bounded by the report batches
+    results = []
+    for size in sizes:
+        tracemalloc.start()
+        monitoring = create_monitoring(directory, flush_rows=1000)
+        monitoring._process = FakeProcess()
+        for _ in range(size):
+            monitoring.sample(0.0)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        monitoring._persist()
+        monitoring._close()
+
+        results.append({
+            'name': 'memory',
+            'parameters': {'samples': size},
+            'metrics': {
+                'traced_current_bytes': current,
+                'traced_peak_bytes': peak,
+                'rss_bytes': psutil.Process().memory_info().rss,
+            },
+        })
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(output: Path, quick: bool, max_history: int, with_workload: bool) -> dict:
+    history_sizes = [size for size in HISTORY_SIZES if size <= max_history]
+    persist_sizes = PERSIST_SIZES[:1] if quick else PERSIST_SIZES
+    samples = 200 if quick else 2000
+
+    results = bench_startup(3 if quick else 10)
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        process = workload.spawn() if with_workload else None
+        try:
+            results += bench_process_metrics(directory, samples, process.pid if process is not None else None)
+        finally:
+            if process is not None:
+                workload.stop(process)
+        results += bench_history(history_sizes)
+        results += bench_trends([size for size in TREND_SIZES if size <= max_history])
+        results += bench_persist(directory, persist_sizes)
+        results += bench_memory(directory, [1_000, 10_000] if quick else [1_000, 10_000, 100_000])
+
+    content = {
+        'version': RESULTS_VERSION,
+        'datetime': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(content, indent=2))
+    return content
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmarks of the sampling and report pipeline')
+    parser.add_argument('-o', '--output', help='JSON results file', type=str,
+                        default=f'output/benchmarks/benchmark_{serialize_datetime_to_file_format(datetime.now())}.json')
+    parser.add_argument('--quick', help='Smaller sizes, for a smoke run', action='store_true')
+    parser.add_argument('--max-history', help='Largest history benchmarked (in samples)', type=int,
+                        default=max(HISTORY_SIZES))
+    parser.add_argument('--without-workload', help='Only benchmark with a mocked process', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    output = Path(args.output)
+    content = run(output, args.quick, args.max_history if not args.quick else 100_000, not args.without_workload)
+    for result in content['results']:
+        parameters = ', '.join(f'{name}={value}' for name, value in result['parameters'].items())
+        metrics = ', '.join(f'{name}={round(value, 3)}' for name, value in result['metrics'].items())
+        print(f'{result["name"]} ({parameters}): {metrics}')
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
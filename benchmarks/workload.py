@@ -0,0 +1,50 @@
+import argparse
+import subprocess
+import sys
+import time
+
+
+def spawn(cpu: float = 0.2, memory_step: int = 64 * 1024, files: int = 8) -> subprocess.Popen:
+    # The workload prints a line once started, so its startup is not part of the measures
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.workload', '--cpu', str(cpu), '--memory-step', str(memory_step),
+         '--files', str(files)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE
+    )
+    process.stdout.readline()
+    return process
+
+
+def stop(process: subprocess.Popen) -> None:
+    process.kill()
+    process.wait()
+    process.stdin.close()
+    process.stdout.close()
+
+
+def run(cpu: float, memory_step: int, files: int) -> None:
+    # Synthetic monitored process: busy a fraction of each 10 ms slice, growing memory and some open files
+    # The files stay open until the workload is killed
+    handles = [open(__file__, 'rb') for _ in range(files)]
+    memory = []
+    print('ready', flush=True)
+
+    while True:
+        start = time.perf_counter()
+        while time.perf_counter() - start < cpu * 0.01:
+            pass
+        memory.append(bytearray(memory_step))
+        if len(memory) > 1000:
+            memory.clear()
+        time.sleep(max(0.0, 0.01 - (time.perf_counter() - start)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Synthetic workload for the benchmarks')
+    parser.add_argument('--cpu', help='Fraction of a CPU used', type=float, default=0.2)
+    parser.add_argument('--memory-step', help='Memory allocated every 10 milliseconds (in bytes)', type=int,
+                        default=64 * 1024)
+    parser.add_argument('--files', help='Number of open files', type=int, default=8)
+    args = parser.parse_args()
+    run(args.cpu, args.memory_step, args.files)
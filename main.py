@@ -1,5 +1,8 @@
 import logging
+import signal
+import sys
 
+from supplier.monitoring_engine import MonitoringEngine
 from supplier.process_monitoring import ProcessMonitoring
 from utils.common_utils import parse_configuration
 
@@ -20,8 +23,14 @@ def main():
     root_logger.addHandler(log_handler)
 
     try:
-        process_monitoring = ProcessMonitoring(configuration=configuration)
-        process_monitoring.run()
+        if configuration.targets:
+            # The engine handles SIGTERM in its event loop
+            MonitoringEngine(configuration=configuration).run()
+        else:
+            # A stopped daemon still writes its pending samples and summary, as on keyboard interrupt
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+            process_monitoring = ProcessMonitoring(configuration=configuration)
+            process_monitoring.run()
     except RuntimeError as runtime_error:
         logging.error(str(runtime_error))
     except Exception as exception:
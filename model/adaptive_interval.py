@@ -0,0 +1,55 @@
+import math
+
+# The interval is halved as soon as the metrics change fast and relaxed slowly while they are stable
+SHRINK_FACTOR = 0.5
+RELAX_FACTOR = 1.25
+# Changes between two samples considered as fast: CPU in percentage points, memory relative to the previous sample
+CPU_CHANGE_THRESHOLD = 10.0
+MEMORY_CHANGE_THRESHOLD = 0.05
+
+
+class AdaptiveInterval:
+    # Sampling interval driven by the volatility of the metrics, between a minimum and a maximum
+
+    def __init__(self, initial: float, minimum: float, maximum: float,
+                 cpu_threshold: float = CPU_CHANGE_THRESHOLD,
+                 memory_threshold: float = MEMORY_CHANGE_THRESHOLD) -> None:
+        if not 0 < minimum <= initial <= maximum:
+            raise RuntimeError('The adaptive sampling interval should start between its minimum and its maximum.')
+        self.interval = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self._cpu_threshold = cpu_threshold
+        self._memory_threshold = memory_threshold
+        self._last = None
+        # Number of samples which have shrunk the interval, because of a fast change or an anomaly
+        self.shrinks = 0
+
+    def update(self, cpu_percent: float, private_memory: float, anomaly: bool = False) -> float:
+        # Returns the interval until the next sample
+        last = self._last
+        self._last = (cpu_percent, private_memory)
+        if last is None and not anomaly:
+            return self.interval
+
+        if anomaly:
+            # e.g. a memory leak detected, the following samples are taken at the highest resolution
+            interval = self.minimum
+        elif self._is_volatile(last, cpu_percent, private_memory):
+            interval = max(self.minimum, self.interval * SHRINK_FACTOR)
+        else:
+            self.interval = min(self.maximum, self.interval * RELAX_FACTOR)
+            return self.interval
+
+        if interval < self.interval:
+            self.shrinks += 1
+        self.interval = interval
+        return self.interval
+
+    def _is_volatile(self, last: tuple, cpu_percent: float, private_memory: float) -> bool:
+        last_cpu_percent, last_private_memory = last
+        if math.isnan(cpu_percent) or math.isnan(last_cpu_percent):
+            return False
+        if abs(cpu_percent - last_cpu_percent) > self._cpu_threshold:
+            return True
+        return abs(private_memory - last_private_memory) > self._memory_threshold * max(last_private_memory, 1)
@@ -1,33 +1,241 @@
+import math
+import re
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
+from typing import List, Optional, Tuple
 
 from utils.date_utils import serialize_datetime_to_file_format
 
+TARGET_MODES = ['first', 'all', 'tree']
+MEMORY_TIERS = ['rss', 'rollup', 'full']
+BACKENDS = ['psutil', 'procfs']
+OVERRUN_POLICIES = ['skip', 'catch-up']
+REPORT_FORMATS = {'csv': '.csv', 'npcol': '.npcol'}
+MATCH_MODES = ['name', 'regex', 'cmdline', 'pid', 'pidfile']
+CONSOLE_MODES = ['rows', 'live', 'quiet']
+# Default bounds of the adaptive sampling interval, relative to the sampling interval
+ADAPTIVE_SAMPLING_RATIO = 4
+METRIC_COLLECTORS = ['io', 'ctx_switches', 'page_faults', 'threads', 'connections']
+
 
 @dataclass
 class Configuration:
     process_name: str
-    duration: int
-    sampling: int
+    duration: Optional[float]
+    sampling: float
     reports_directory: Path
     logs_directory: Path
     reference_datetime: datetime = field(default_factory=lambda: datetime.now())
+    leak_window: Optional[float] = None
+    leak_tolerance: float = 1.0
+    target_mode: str = 'first'
+    group_refresh: float = 10.0
+    memory_tier: str = 'full'
+    memory_tier_interval: int = 1
+    backend: str = 'psutil'
+    overrun_policy: str = 'skip'
+    targets: List['Configuration'] = field(default_factory=list)
+    max_workers: int = 4
+    flush_rows: int = 1000
+    flush_interval: float = 10.0
+    rotate_size: Optional[float] = None
+    report_format: str = 'csv'
+    daemon: bool = False
+    raw_retention: float = 3600.0
+    match: str = 'name'
+    reattach: bool = False
+    console: str = 'rows'
+    refresh_interval: float = 1.0
+    instrumentation: bool = False
+    metrics_host: str = '127.0.0.1'
+    metrics_port: Optional[int] = None
+    top_threads: int = 0
+    collectors: List[str] = field(default_factory=list)
+    adaptive_sampling: bool = False
+    min_sampling: Optional[float] = None
+    max_sampling: Optional[float] = None
+    trend_detection: bool = False
+    trend_window: Optional[float] = None
     
     def validate(self) -> None:
-        if self.sampling > self.duration:
+        if self.targets:
+            self._validate_targets()
+            return
+        
+        if self.daemon:
+            # No end time, the raw samples are only kept for the retention window
+            if self.raw_retention < self.sampling:
+                raise RuntimeError('The raw samples retention should be greater than the sampling interval.')
+        elif self.duration is None or self.sampling > self.duration:
             raise RuntimeError('The sampling interval should be lower than the total duration.')
         
+        if self.sampling < 0.01:
+            raise RuntimeError('The sampling interval should be at least 10 milliseconds.')
+        
+        if self.overrun_policy not in OVERRUN_POLICIES:
+            raise RuntimeError(f'Unknown overrun policy {self.overrun_policy}, expected skip or catch-up.')
+        
+        if self.leak_window is not None and self.leak_window < self.sampling * 10:
+            raise RuntimeError('The leak detection window should cover at least 10 sampling intervals.')
+        
+        if self.trend_window is not None and self.trend_window < self.sampling * 10:
+            raise RuntimeError('The trend detection window should cover at least 10 sampling intervals.')
+        
+        if self.target_mode not in TARGET_MODES:
+            raise RuntimeError(f'Unknown target mode {self.target_mode}, expected first, all or tree.')
+        
+        if self.group_refresh < 0:
+            raise RuntimeError('The group refresh interval should be 0 second or more.')
+        
+        if self.memory_tier not in MEMORY_TIERS:
+            raise RuntimeError(f'Unknown memory tier {self.memory_tier}, expected rss, rollup or full.')
+        
+        if self.backend not in BACKENDS:
+            raise RuntimeError(f'Unknown sampling backend {self.backend}, expected psutil or procfs.')
+        
+        if self.memory_tier_interval < 1:
+            raise RuntimeError('The memory tier interval should be at least 1 sample.')
+        
+        if not 0 <= self.leak_tolerance < 100:
+            raise RuntimeError('The leak tolerance should be a percentage between 0 and 100.')
+        
+        if self.flush_rows < 1 or self.flush_interval < 0:
+            raise RuntimeError('The report should be flushed every sample or more and every 0 second or more.')
+        
+        if self.report_format not in REPORT_FORMATS:
+            raise RuntimeError(f'Unknown report format {self.report_format}, expected csv or npcol.')
+        
+        if self.rotate_size is not None and self.rotate_size <= 0:
+            raise RuntimeError('The report rotation size should be greater than 0.')
+        
+        if self.top_threads < 0:
+            raise RuntimeError('The number of threads reported should be 0 or more.')
+        
+        unknown_collectors = [name for name in self.collectors if name not in METRIC_COLLECTORS]
+        if unknown_collectors:
+            raise RuntimeError(f'Unknown metrics {", ".join(unknown_collectors)}, '
+                               f'expected {", ".join(METRIC_COLLECTORS)}.')
+        
+        self._validate_match()
+        self._validate_console()
+        self._validate_metrics()
+        self._validate_adaptive_sampling()
+        
+        self._validate_directories()
+    
+    def _validate_targets(self) -> None:
+        if self.max_workers < 1:
+            raise RuntimeError('The number of workers should be at least 1.')
+        
+        self._validate_console()
+        self._validate_metrics()
+        
+        if len({target.process_name for target in self.targets}) != len(self.targets):
+            raise RuntimeError('Each target should monitor a different process name.')
+        
+        for target in self.targets:
+            target.validate()
+        
+        if not (self.logs_directory.exists() and self.logs_directory.is_dir()):
+            raise RuntimeError(f'Logs directory {self.logs_directory} does not exist or is not a valid directory.')
+    
+    def _validate_match(self) -> None:
+        if self.match not in MATCH_MODES:
+            raise RuntimeError(f'Unknown match mode {self.match}, expected name, regex, cmdline, pid or pidfile.')
+        
+        if self.match in ['regex', 'cmdline']:
+            try:
+                re.compile(self.process_name)
+            except re.error as error:
+                raise RuntimeError(f'Invalid process pattern {self.process_name}: {error}')
+        
+        if self.match == 'pid' and not self.process_name.isdigit():
+            raise RuntimeError(f'Invalid pid {self.process_name}')
+        
+        if self.match == 'pid' and self.reattach:
+            raise RuntimeError('A process matched by pid cannot be re-attached, use a pidfile instead.')
+    
+    def _validate_console(self) -> None:
+        if self.console not in CONSOLE_MODES:
+            raise RuntimeError(f'Unknown console mode {self.console}, expected rows, live or quiet.')
+        
+        if self.refresh_interval <= 0:
+            raise RuntimeError('The console refresh interval should be greater than 0.')
+    
+    def _validate_metrics(self) -> None:
+        if self.metrics_port is not None and not 0 <= self.metrics_port <= 65535:
+            raise RuntimeError('The metrics port should be between 0 and 65535.')
+    
+    def _validate_adaptive_sampling(self) -> None:
+        if not self.adaptive_sampling:
+            return
+        
+        min_sampling, max_sampling = self.sampling_bounds
+        if min_sampling < 0.01:
+            raise RuntimeError('The minimum sampling interval should be at least 10 milliseconds.')
+        
+        if not min_sampling <= self.sampling <= max_sampling:
+            raise RuntimeError('The sampling interval should be between the minimum and maximum sampling intervals.')
+    
+    def _validate_directories(self) -> None:
         if not (self.reports_directory.exists() and self.reports_directory.is_dir()):
             raise RuntimeError(f'Report directory {self.reports_directory} does not exist or is not a valid directory.')
     
         if not (self.logs_directory.exists() and self.logs_directory.is_dir()):
             raise RuntimeError(f'Logs directory {self.logs_directory} does not exist or is not a valid directory.')
         
+    @property
+    def monitoring_duration(self) -> Optional[float]:
+        return None if self.daemon else self.duration
+
+    @property
+    def leak_window_samples(self) -> Optional[int]:
+        if self.leak_window is None:
+            return None
+        # With adaptive sampling, the window holds as many samples as the shortest interval allows
+        sampling = self.sampling_bounds[0] if self.adaptive_sampling else self.sampling
+        return math.ceil(self.leak_window / sampling)
+
+    @property
+    def leak_window_duration(self) -> Optional[float]:
+        # With adaptive sampling, the samples are evicted by timestamp instead of by count
+        return self.leak_window if self.adaptive_sampling else None
+
+    @property
+    def sampling_bounds(self) -> Tuple[float, float]:
+        min_sampling = self.min_sampling if self.min_sampling is not None \
+            else max(0.01, self.sampling / ADAPTIVE_SAMPLING_RATIO)
+        max_sampling = self.max_sampling if self.max_sampling is not None else self.sampling * ADAPTIVE_SAMPLING_RATIO
+        return min_sampling, max_sampling
+
+    @property
+    def target_name(self) -> str:
+        if self.match == 'name':
+            return self.process_name
+        # Patterns and pidfile paths are made usable in the report and log file names
+        return re.sub(r'[^\w.-]+', '_', self.process_name).strip('_.') or self.match
+
     @property
     def log_path(self) -> Path:
-        return self.logs_directory.joinpath(f'{self.process_name}_{serialize_datetime_to_file_format(self.reference_datetime)}.log')
+        return self.logs_directory.joinpath(f'{self.target_name}_{serialize_datetime_to_file_format(self.reference_datetime)}.log')
     
     @property
     def csv_report_path(self) -> Path:
-        return self.reports_directory.joinpath(f'{self.process_name}_{serialize_datetime_to_file_format(self.reference_datetime)}.csv')
\ No newline at end of file
+        return self.reports_directory.joinpath(f'{self.target_name}_{serialize_datetime_to_file_format(self.reference_datetime)}.csv')
+    
+    @property
+    def report_path(self) -> Path:
+        return self.csv_report_path.with_suffix(REPORT_FORMATS[self.report_format])
+
+    def rollup_report_path(self, resolution: str) -> Path:
+        report_path = self.report_path
+        return report_path.with_name(f'{report_path.stem}_{resolution}{report_path.suffix}')
+
+    @property
+    def overhead_report_path(self) -> Path:
+        return self.csv_report_path.with_name(f'{self.csv_report_path.stem}_overhead.json')
+
+    @property
+    def sketches_report_path(self) -> Path:
+        return self.csv_report_path.with_name(f'{self.csv_report_path.stem}_sketches.json')
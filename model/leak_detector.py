@@ -0,0 +1,166 @@
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+
+class MemoryLeakDetector:
+
+    def __init__(self, min_samples: int = 10, window: Optional[int] = None, tolerance: float = 0.0,
+                 distinct_ratio: float = 2/3, duration: Optional[float] = None) -> None:
+        if window is not None and window < min_samples:
+            raise RuntimeError(f'The leak detection window should contain at least {min_samples} samples.')
+
+        self._min_samples = min_samples
+        self._window = window
+        # With a duration, the samples are also evicted once older than the duration before the last one
+        self._duration = duration if window is not None else None
+        self._tolerance = tolerance
+        self._distinct_ratio = distinct_ratio
+
+        self.count = 0
+        self.run_length = 0
+        self._peak = None
+        # Number of new peaks in the current run (whole history) or in the window
+        self._run_new_peaks = 0
+        self._new_peaks_sum = 0
+
+        # Least squares sums, values are shifted by the first point to keep them small
+        # In a window, each point also records whether its sample was a new peak. The sliding updates accumulate
+        # rounding errors, so every window evictions the sums are computed again from the points, shifted by the oldest
+        self._points = deque() if window is not None else None
+        self._evictions = 0
+        self._origin = None
+        self._sum_x = self._sum_y = self._sum_xx = self._sum_xy = self._sum_yy = 0.0
+
+    def update(self, value: float, elapsed: Optional[float] = None) -> None:
+        x = float(self.count if elapsed is None else elapsed)
+        self.count += 1
+
+        is_new_peak = self._update_run(value)
+        self._update_regression(x, float(value), is_new_peak)
+
+    def update_many(self, values: np.ndarray, elapsed: Optional[np.ndarray] = None) -> None:
+        # Same result as an update per value, e.g. to analyze a report by chunks
+        if self._window is not None:
+            for index, value in enumerate(values.tolist()):
+                self.update(value, elapsed[index] if elapsed is not None else None)
+            return
+        if len(values) == 0:
+            return
+
+        x = np.arange(self.count, self.count + len(values), dtype=np.float64) if elapsed is None \
+            else np.asarray(elapsed, dtype=np.float64)
+        y = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        for value in values.tolist():
+            self._update_run(value)
+
+        if self._origin is None:
+            self._origin = (float(x[0]), float(y[0]))
+        x = x - self._origin[0]
+        y = y - self._origin[1]
+        self._sum_x += float(x.sum())
+        self._sum_y += float(y.sum())
+        self._sum_xx += float((x * x).sum())
+        self._sum_xy += float((x * y).sum())
+        self._sum_yy += float((y * y).sum())
+
+    @property
+    def sample_count(self) -> int:
+        return self.count if self._window is None else len(self._points)
+
+    @property
+    def distinct_count(self) -> int:
+        # In a non-decreasing series, every new peak is a new distinct value
+        if self.count == 0:
+            return 0
+        if self._window is None:
+            return 1 + self._run_new_peaks
+        # The oldest sample of the window is not compared with an older peak
+        return 1 + self._new_peaks_sum - self._points[0][2]
+
+    @property
+    def is_leaking(self) -> bool:
+        sample_count = self.sample_count
+        if sample_count < self._min_samples:
+            return False
+
+        # The memory should not have decreased in the observed samples,
+        # and should not stay the same for more than 1 - distinct_ratio of the time
+        return self.run_length >= sample_count and self.distinct_count > sample_count * self._distinct_ratio
+
+    @property
+    def slope(self) -> float:
+        # Growth per unit of elapsed time (bytes per second when elapsed is in seconds)
+        n = self.sample_count
+        denominator = n * self._sum_xx - self._sum_x ** 2
+        if n < 2 or denominator == 0:
+            return 0.0
+        return (n * self._sum_xy - self._sum_x * self._sum_y) / denominator
+
+    @property
+    def confidence(self) -> float:
+        # Coefficient of determination (r²) of the linear trend
+        n = self.sample_count
+        x_variance = n * self._sum_xx - self._sum_x ** 2
+        y_variance = n * self._sum_yy - self._sum_y ** 2
+        if n < 2 or x_variance <= 0 or y_variance <= 0:
+            return 0.0
+        covariance = n * self._sum_xy - self._sum_x * self._sum_y
+        return min(1.0, covariance ** 2 / (x_variance * y_variance))
+
+    def _update_run(self, value: float) -> bool:
+        if self._peak is not None and value >= self._peak * (1 - self._tolerance):
+            self.run_length += 1
+            is_new_peak = value > self._peak
+        else:
+            # First sample or the memory dropped below the tolerance, a new run starts
+            self.run_length = 1
+            self._run_new_peaks = 0
+            self._peak = value
+            is_new_peak = False
+
+        if is_new_peak:
+            self._peak = value
+            self._run_new_peaks += 1
+        return is_new_peak
+
+    def _update_regression(self, x: float, y: float, is_new_peak: bool) -> None:
+        if self._origin is None:
+            self._origin = (x, y)
+        origin_x, origin_y = self._origin
+
+        self._add_point(x - origin_x, y - origin_y, 1)
+        if self._points is None:
+            return
+
+        # The points are kept unshifted, the origin moves when the sums are computed again
+        self._points.append((x, y, int(is_new_peak)))
+        self._new_peaks_sum += int(is_new_peak)
+        while len(self._points) > self._window or self._is_expired(x):
+            old_x, old_y, old_new_peak = self._points.popleft()
+            self._add_point(old_x - origin_x, old_y - origin_y, -1)
+            self._new_peaks_sum -= old_new_peak
+            self._evictions += 1
+        if self._evictions >= self._window:
+            self._rebase()
+
+    def _rebase(self) -> None:
+        self._evictions = 0
+        origin_x, origin_y, _ = self._points[0]
+        self._origin = (origin_x, origin_y)
+        self._sum_x = self._sum_y = self._sum_xx = self._sum_xy = self._sum_yy = 0.0
+        for x, y, _ in self._points:
+            self._add_point(x - origin_x, y - origin_y, 1)
+
+    def _is_expired(self, x: float) -> bool:
+        return self._duration is not None and x - self._points[0][0] > self._duration
+
+    def _add_point(self, x: float, y: float, sign: int) -> None:
+        self._sum_x += sign * x
+        self._sum_y += sign * y
+        self._sum_xx += sign * x * x
+        self._sum_xy += sign * x * y
+        self._sum_yy += sign * y * y
+
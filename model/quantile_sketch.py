@@ -0,0 +1,143 @@
+import math
+from typing import Dict, List
+
+import numpy as np
+
+# Relative accuracy of the quantiles and maximum number of buckets of a sketch
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_BUCKETS = 2048
+# Values below are counted as zeros, e.g. an idle CPU
+MIN_INDEXABLE_VALUE = 1e-9
+PERCENTILES = [50, 95, 99]
+
+
+class QuantileSketch:
+    # DDSketch: the values are counted in logarithmic buckets, so any quantile is estimated within the relative
+    # accuracy, in bounded memory and O(1) per value. Sketches with the same accuracy are merged by adding the counts.
+    # Only positive values are supported, which is enough for the process metrics.
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+                 max_buckets: int = DEFAULT_MAX_BUCKETS) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise RuntimeError('The relative accuracy of a sketch should be between 0 and 1.')
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        # Sum of the weights of the values, equal to the count when the values are not weighted
+        self.weight = 0
+        # The estimates are bounded by the exact extremes
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def __len__(self) -> int:
+        return self.count
+
+    def update(self, value: float, weight: float = 1) -> None:
+        if value != value:  # NaN, e.g. the CPU of a gap marker
+            return
+        self.count += 1
+        self.weight += weight
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        if value < MIN_INDEXABLE_VALUE:
+            self.zero_count += weight
+            return
+
+        index = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self._buckets
+        if index in buckets:
+            buckets[index] += weight
+        else:
+            buckets[index] = weight
+            if len(buckets) > self.max_buckets:
+                self._collapse()
+
+    def update_batch(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.weight += len(values)
+        self.minimum = min(self.minimum, values.min().item())
+        self.maximum = max(self.maximum, values.max().item())
+
+        indexable = values[values >= MIN_INDEXABLE_VALUE]
+        self.zero_count += len(values) - len(indexable)
+        indexes, counts = np.unique(np.ceil(np.log(indexable) / self._log_gamma).astype(np.int64),
+                                    return_counts=True)
+        buckets = self._buckets
+        for index, count in zip(indexes.tolist(), counts.tolist()):
+            buckets[index] = buckets.get(index, 0) + count
+        while len(buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise RuntimeError('Only sketches with the same relative accuracy can be merged.')
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.weight += other.weight
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        while len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, quantile: float) -> float:
+        if self.count == 0:
+            return math.nan
+
+        # Nearest rank, so the high percentiles of a short monitoring are actual spikes: the first value whose
+        # cumulated weight reaches the rank
+        rank = quantile * self.weight
+        if self.zero_count > 0 and self.zero_count >= rank:
+            return 0.0
+
+        cumulated = self.zero_count
+        for index in sorted(self._buckets):
+            cumulated += self._buckets[index]
+            if cumulated >= rank and cumulated > 0:
+                break
+        # Middle of the bucket in relative terms, within the relative accuracy of all its values
+        value = 2 * self._gamma ** index / (self._gamma + 1)
+        return min(max(value, self.minimum), self.maximum)
+
+    def percentiles(self, percentiles: List[float] = PERCENTILES) -> List[float]:
+        return [self.quantile(percentile / 100) for percentile in percentiles]
+
+    def _collapse(self) -> None:
+        # The lowest buckets are merged, the accuracy of the high quantiles is kept
+        lowest = min(self._buckets)
+        count = self._buckets.pop(lowest)
+        following = min(self._buckets)
+        self._buckets[following] += count
+
+    def to_dict(self) -> dict:
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'max_buckets': self.max_buckets,
+            'count': self.count,
+            'weight': self.weight,
+            'zero_count': self.zero_count,
+            'minimum': self.minimum,
+            'maximum': self.maximum,
+            'buckets': {str(index): count for index, count in sorted(self._buckets.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, content: dict) -> 'QuantileSketch':
+        sketch = cls(relative_accuracy=content['relative_accuracy'], max_buckets=content['max_buckets'])
+        sketch._buckets = {int(index): count for index, count in content['buckets'].items()}
+        sketch.zero_count = content['zero_count']
+        sketch.count = content['count']
+        sketch.weight = content.get('weight', content['count'])
+        sketch.minimum = content['minimum']
+        sketch.maximum = content['maximum']
+        return sketch
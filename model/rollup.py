@@ -0,0 +1,78 @@
+import math
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+ROLLUP_RESOLUTIONS = {'1m': 60, '1h': 3600}
+ROLLUP_STATISTICS = ['min', 'mean', 'max', 'last']
+
+
+class Rollup:
+    # Consolidates the samples into fixed time buckets (min, mean, max and last value per metric), RRD-style
+
+    def __init__(self, resolution: int, metrics: Iterable[str]) -> None:
+        self._resolution = resolution
+        self._metrics = list(metrics)
+        self._bucket: Optional[int] = None
+        self._count = 0
+        self._weight = 0.0
+        self._sums: Dict[str, float] = {}
+        self._minimums: Dict[str, float] = {}
+        self._maximums: Dict[str, float] = {}
+        self._lasts: Dict[str, float] = {}
+
+    @property
+    def columns(self) -> Dict[str, str]:
+        columns = {'timestamp': 'datetime64[us]', 'count': 'int64'}
+        for metric in self._metrics:
+            for statistic in ROLLUP_STATISTICS:
+                columns[f'{metric}_{statistic}'] = 'float64'
+        return columns
+
+    def update(self, timestamp: datetime, sample: Dict[str, float], weight: float = 1.0) -> Optional[dict]:
+        # Returns the previous bucket once a sample of a newer bucket is received
+        bucket = math.floor(timestamp.timestamp() / self._resolution)
+        completed = None
+        if self._bucket is not None and bucket != self._bucket:
+            completed = self.flush()
+
+        if self._count == 0:
+            self._bucket = bucket
+            for metric in self._metrics:
+                value = sample[metric]
+                self._minimums[metric] = self._maximums[metric] = value
+                self._sums[metric] = value * weight
+        else:
+            for metric in self._metrics:
+                value = sample[metric]
+                self._sums[metric] += value * weight
+                if value < self._minimums[metric]:
+                    self._minimums[metric] = value
+                elif value > self._maximums[metric]:
+                    self._maximums[metric] = value
+
+        for metric in self._metrics:
+            self._lasts[metric] = sample[metric]
+        self._count += 1
+        self._weight += weight
+
+        return completed
+
+    def flush(self) -> Optional[dict]:
+        if self._count == 0:
+            return None
+
+        row = {
+            'timestamp': datetime.fromtimestamp(self._bucket * self._resolution),
+            'count': self._count,
+        }
+        for metric in self._metrics:
+            row[f'{metric}_min'] = self._minimums[metric]
+            # Weighted by the interval covered by each sample with an adaptive sampling
+            row[f'{metric}_mean'] = self._sums[metric] / self._weight
+            row[f'{metric}_max'] = self._maximums[metric]
+            row[f'{metric}_last'] = self._lasts[metric]
+
+        self._count = 0
+        self._weight = 0.0
+        self._bucket = None
+        return row
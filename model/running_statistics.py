@@ -0,0 +1,112 @@
+import math
+from typing import Dict, Iterable, List, Mapping
+
+import numpy as np
+
+from model.quantile_sketch import QuantileSketch, PERCENTILES
+
+
+class MetricStatistics:
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.minimum = math.nan
+        self.maximum = math.nan
+        # Sum of the weights and of their squares, equal to the count when the values are not weighted
+        self.weight = 0.0
+        self._weight_squares = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float, weight: float = 1.0) -> None:
+        # Welford's online algorithm, weighted (West), numerically stable and O(1) per value
+        self.count += 1
+        self.weight += weight
+        self._weight_squares += weight * weight
+        delta = value - self.mean
+        self.mean += delta * weight / self.weight
+        self._m2 += weight * delta * (value - self.mean)
+
+        if self.count == 1:
+            self.minimum = value
+            self.maximum = value
+        elif value < self.minimum:
+            self.minimum = value
+        elif value > self.maximum:
+            self.maximum = value
+
+    def update_batch(self, values: np.ndarray) -> None:
+        if len(values) == 0:
+            return
+        batch = MetricStatistics()
+        batch.count = len(values)
+        batch.weight = batch._weight_squares = float(len(values))
+        batch.mean = float(values.mean())
+        batch._m2 = float(((values - batch.mean) ** 2).sum())
+        batch.minimum = values.min().item()
+        batch.maximum = values.max().item()
+        self.merge(batch)
+
+    def merge(self, other: 'MetricStatistics') -> None:
+        # Chan's parallel algorithm, the statistics of two sets of values are combined without the values
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self._m2 = other.count, other.mean, other._m2
+            self.weight, self._weight_squares = other.weight, other._weight_squares
+            self.minimum, self.maximum = other.minimum, other.maximum
+            return
+
+        weight = self.weight + other.weight
+        delta = other.mean - self.mean
+        self.mean += delta * other.weight / weight
+        self._m2 += other._m2 + delta ** 2 * self.weight * other.weight / weight
+        self.count += other.count
+        self.weight = weight
+        self._weight_squares += other._weight_squares
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def variance(self) -> float:
+        # Sample variance (ddof=1) to stay consistent with pandas, unbiased for reliability weights
+        if self.count < 2:
+            return math.nan
+        return self._m2 / (self.weight - self._weight_squares / self.weight)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class RunningAggregates:
+
+    def __init__(self, metrics: Iterable[str]) -> None:
+        self._statistics = {metric: MetricStatistics() for metric in metrics}
+        # The percentiles are estimated in bounded memory, whatever the monitoring duration
+        self._sketches = {metric: QuantileSketch() for metric in self._statistics}
+        self.count = 0
+
+    def __getitem__(self, metric: str) -> MetricStatistics:
+        return self._statistics[metric]
+
+    @property
+    def metrics(self) -> list:
+        return list(self._statistics)
+
+    def update(self, sample: Mapping[str, float], weight: float = 1.0) -> None:
+        # With an adaptive sampling, each sample is weighted by the interval it covers
+        self.count += 1
+        for metric, statistics in self._statistics.items():
+            value = sample[metric]
+            statistics.update(value, weight)
+            self._sketches[metric].update(value, weight)
+
+    def means(self) -> Dict[str, float]:
+        return {metric: statistics.mean for metric, statistics in self._statistics.items()}
+
+    def sketch(self, metric: str) -> QuantileSketch:
+        return self._sketches[metric]
+
+    def percentiles(self, percentiles: List[float] = PERCENTILES) -> Dict[str, List[float]]:
+        return {metric: sketch.percentiles(percentiles) for metric, sketch in self._sketches.items()}
@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Mapping
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_COLUMNS = {
+    'timestamp': 'datetime64[us]',
+    'cpu_percent': 'float64',
+    'private_memory': 'int64',
+    'handles_fds': 'int64',
+}
+
+
+class SampleBuffer:
+
+    def __init__(self, columns: Mapping[str, str] = None, initial_capacity: int = 1024) -> None:
+        if initial_capacity <= 0:
+            raise RuntimeError('The sample buffer capacity should be greater than 0.')
+
+        self._dtypes = {name: np.dtype(dtype) for name, dtype in (columns or DEFAULT_COLUMNS).items()}
+        self._capacity = initial_capacity
+        self._size = 0
+        self._columns = {name: np.empty(self._capacity, dtype=dtype) for name, dtype in self._dtypes.items()}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def columns(self) -> list:
+        return list(self._dtypes)
+
+    @property
+    def dtypes(self) -> Dict[str, np.dtype]:
+        return dict(self._dtypes)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def append(self, row: Mapping[str, Any]) -> None:
+        if self._size == self._capacity:
+            self._grow()
+
+        index = self._size
+        for name, values in self._columns.items():
+            value = row[name]
+            if isinstance(value, datetime):
+                value = np.datetime64(value, 'us')
+            values[index] = value
+
+        self._size += 1
+
+    def column(self, name: str) -> np.ndarray:
+        # Read-only view on the filled part of the column, no copy is made
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def last(self) -> Dict[str, Any]:
+        if self._size == 0:
+            raise RuntimeError('The sample buffer is empty.')
+
+        return {name: values[self._size - 1] for name, values in self._columns.items()}
+
+    def clear(self) -> None:
+        self._size = 0
+
+    def to_dataframe(self) -> 'pd.DataFrame':
+        # pandas is imported on first use only, the monitoring itself never needs it
+        import pandas as pd
+
+        return pd.DataFrame({name: values[:self._size] for name, values in self._columns.items()}, copy=False)
+
+    def _grow(self) -> None:
+        # Doubling the capacity keeps the append amortized O(1)
+        self._capacity *= 2
+        for name, values in self._columns.items():
+            grown = np.empty(self._capacity, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[name] = grown
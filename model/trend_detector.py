@@ -0,0 +1,209 @@
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+# Points kept by a detector, the resolution is halved when they are all used
+DEFAULT_CAPACITY = 4096
+# Points of a trend test, a longer series is reduced to the medians of consecutive blocks
+DEFAULT_MAX_POINTS = 512
+DEFAULT_SIGNIFICANCE = 0.01
+MIN_TREND_POINTS = 10
+
+
+@dataclass
+class TrendResult:
+    direction: str
+    # Theil-Sen slope, per unit of elapsed time (per second when elapsed is in seconds)
+    slope: float
+    # Mann-Kendall statistic, Kendall's tau, normal score and two-sided p-value
+    s: int
+    tau: float
+    z: float
+    p_value: float
+    points: int
+
+    @property
+    def slope_per_hour(self) -> float:
+        return self.slope * 3600
+
+    def to_dict(self) -> dict:
+        return {
+            'direction': self.direction,
+            'slope_per_hour': self.slope_per_hour,
+            'tau': self.tau,
+            'z': self.z,
+            'p_value': self.p_value,
+            'points': self.points,
+        }
+
+
+def pairwise_differences(elapsed: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Differences of all the pairs of points, lag by lag so each one is a contiguous subtraction
+    count = len(elapsed)
+    durations = np.empty(count * (count - 1) // 2, dtype=np.float64)
+    differences = np.empty((len(values), len(durations)), dtype=np.float64)
+    position = 0
+    for lag in range(1, count):
+        end = position + count - lag
+        np.subtract(elapsed[lag:], elapsed[:-lag], out=durations[position:end])
+        np.subtract(values[:, lag:], values[:, :-lag], out=differences[:, position:end])
+        position = end
+    return durations, differences
+
+
+def downsample(elapsed: np.ndarray, values: np.ndarray, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Medians of consecutive blocks, robust to the spikes; the oldest values not filling a block are dropped
+    count = len(elapsed)
+    if count <= max_points:
+        return elapsed, values
+    size = math.ceil(count / max_points)
+    blocks = count // size
+    start = count - blocks * size
+    elapsed = elapsed[start:].reshape(blocks, size).mean(axis=1)
+    values = np.median(values[:, start:].reshape(len(values), blocks, size), axis=2)
+    return elapsed, values
+
+
+def trend_tests(elapsed: np.ndarray, values: np.ndarray, max_points: int = DEFAULT_MAX_POINTS,
+                significance: float = DEFAULT_SIGNIFICANCE) -> List[Optional[TrendResult]]:
+    # Mann-Kendall test and Theil-Sen slope of several series sharing their elapsed times (one row per series),
+    # on all the pairs of points at once, O(max_points²) whatever the length of the series
+    elapsed, values = downsample(np.asarray(elapsed, dtype=np.float64), np.asarray(values, dtype=np.float64),
+                                 max_points)
+    count = len(elapsed)
+    if count < MIN_TREND_POINTS:
+        return [None] * len(values)
+
+    durations, differences = pairwise_differences(elapsed, values)
+    statistics = np.count_nonzero(differences > 0, axis=1) - np.count_nonzero(differences < 0, axis=1)
+    valid = durations > 0
+    slopes = np.median(differences[:, valid] / durations[valid], axis=1) if valid.any() \
+        else np.zeros(len(values))
+
+    pairs = count * (count - 1) / 2
+    results = []
+    for series, s, slope in zip(values, statistics.tolist(), slopes.tolist()):
+        # Variance of S corrected for the tied values, e.g. a memory staying the same
+        _, ties = np.unique(series, return_counts=True)
+        ties = ties[ties > 1].astype(np.float64)
+        variance = (count * (count - 1) * (2 * count + 5) - (ties * (ties - 1) * (2 * ties + 5)).sum()) / 18
+        if variance <= 0:
+            z = 0.0
+        else:
+            # Continuity correction, S moves by steps of 2
+            z = (s - np.sign(s)) / math.sqrt(variance)
+        p_value = math.erfc(abs(z) / math.sqrt(2))
+        if p_value < significance:
+            direction = 'increasing' if s > 0 else 'decreasing'
+        else:
+            direction = 'stable'
+        results.append(TrendResult(direction=direction, slope=slope, s=s, tau=s / pairs, z=float(z),
+                                   p_value=p_value, points=count))
+    return results
+
+
+class TrendDetector:
+    # Robust trends of several metrics: the samples are kept in a bounded number of points, each one the mean of
+    # a block of consecutive samples. When all the points are used, consecutive points are merged two by two and
+    # the blocks become twice longer, so the points always cover the whole monitoring (or the window) uniformly.
+
+    def __init__(self, metrics: Iterable[str], window: Optional[float] = None, capacity: int = DEFAULT_CAPACITY,
+                 max_points: int = DEFAULT_MAX_POINTS, significance: float = DEFAULT_SIGNIFICANCE) -> None:
+        if capacity < 2 * MIN_TREND_POINTS:
+            raise RuntimeError(f'The trend detector should keep at least {2 * MIN_TREND_POINTS} points.')
+        self.metrics = list(metrics)
+        self._window = window
+        self._capacity = capacity
+        self._max_points = max_points
+        self._significance = significance
+        # First row: elapsed time of the points, then one row per metric
+        self._points = np.empty((len(self.metrics) + 1, capacity), dtype=np.float64)
+        self._size = 0
+        # Samples per point, and sum of the samples of the point being filled
+        self._stride = 1
+        self._pending = np.zeros(len(self.metrics) + 1, dtype=np.float64)
+        self._pending_count = 0
+        self.count = 0
+
+    @property
+    def stride(self) -> int:
+        return self._stride
+
+    def update(self, sample: Mapping[str, float], elapsed: float) -> None:
+        self.count += 1
+        if self._stride == 1:
+            self._points[0, self._size] = elapsed
+            for row, metric in enumerate(self.metrics, start=1):
+                self._points[row, self._size] = sample[metric]
+            self._added(1)
+            return
+
+        pending = self._pending
+        pending[0] += elapsed
+        for row, metric in enumerate(self.metrics, start=1):
+            pending[row] += sample[metric]
+        self._pending_count += 1
+        if self._pending_count == self._stride:
+            self._points[:, self._size] = pending / self._stride
+            pending[:] = 0.0
+            self._pending_count = 0
+            self._added(1)
+
+    def update_batch(self, elapsed: np.ndarray, values: Mapping[str, np.ndarray]) -> None:
+        # Same result as an update per sample
+        samples = np.vstack([np.asarray(elapsed, dtype=np.float64)] +
+                            [np.asarray(values[metric], dtype=np.float64) for metric in self.metrics])
+        total = samples.shape[1]
+        self.count += total
+        start = 0
+        while start < total:
+            if self._pending_count:
+                # The point being filled is completed first
+                taken = min(self._stride - self._pending_count, total - start)
+                self._pending += samples[:, start:start + taken].sum(axis=1)
+                self._pending_count += taken
+                start += taken
+                if self._pending_count == self._stride:
+                    self._points[:, self._size] = self._pending / self._stride
+                    self._pending[:] = 0.0
+                    self._pending_count = 0
+                    self._added(1)
+                continue
+
+            blocks = min((total - start) // self._stride, self._capacity - self._size)
+            if blocks == 0:
+                # Less than a point left
+                self._pending += samples[:, start:].sum(axis=1)
+                self._pending_count = total - start
+                return
+            end = start + blocks * self._stride
+            self._points[:, self._size:self._size + blocks] = \
+                samples[:, start:end].reshape(len(samples), blocks, self._stride).mean(axis=2)
+            start = end
+            self._added(blocks)
+
+    def evaluate(self) -> Dict[str, Optional[TrendResult]]:
+        points = self._points[:, :self._size]
+        if self._window is not None and self._size:
+            points = points[:, np.searchsorted(points[0], points[0, -1] - self._window):]
+        results = trend_tests(points[0], points[1:], self._max_points, self._significance)
+        return dict(zip(self.metrics, results))
+
+    def _added(self, count: int) -> None:
+        self._size += count
+        if self._size < self._capacity:
+            return
+        if self._window is not None:
+            # The points out of the window are dropped before losing resolution
+            start = np.searchsorted(self._points[0], self._points[0, -1] - self._window)
+            if start > self._capacity // 4:
+                self._size -= start
+                self._points[:, :self._size] = self._points[:, start:].copy()
+                return
+
+        half = self._capacity // 2
+        self._points[:, :half] = self._points[:, :half * 2].reshape(len(self._points), half, 2).mean(axis=2)
+        self._size = half
+        self._stride *= 2
@@ -0,0 +1,162 @@
+import logging
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from utils.common_utils import pretty_print_bytes
+from utils.date_utils import serialize_time
+
+HEADER = [
+    '+----------+-------------------------+-------------------------+-------------------------+',
+    '+          |          CPU %          |          Memory         |       Handle / FDS      |',
+    '+   Time   +------------+------------+------------+------------+------------+------------+',
+    '+          |    AVG     |    CUR     |    AVG     |    CUR     |    AVG     |    CUR     |',
+    '+----------+------------+------------+------------+------------+------------+------------+',
+]
+# Width of the target column of the live table
+TARGET_WIDTH = 16
+LIVE_HEADER = [('+' + '-' * TARGET_WIDTH if line.startswith('+-') else '+' + ' ' * TARGET_WIDTH) + line
+               for line in HEADER]
+LIVE_HEADER[1] = '+' + ' Target'.ljust(TARGET_WIDTH) + HEADER[1]
+# The live table also shows the CPU percentiles, the tail spikes are hidden by the average
+PERCENTILES_HEADER = [
+    '-' * 38 + '+',
+    'CPU % percentiles'.center(38) + '|',
+    '------------+------------+------------+',
+    '    P50     |    P95     |    P99     |',
+    '------------+------------+------------+',
+]
+LIVE_HEADER = [line + percentiles for line, percentiles in zip(LIVE_HEADER, PERCENTILES_HEADER)]
+
+
+@dataclass
+class ConsoleSnapshot:
+    name: str
+    count: int
+    timestamp: datetime
+    averages: Dict[str, float]
+    sample: dict
+    suffix: str = ''
+    leaking: bool = False
+    # Estimated 50th, 95th and 99th percentiles of each metric
+    percentiles: Dict[str, List[float]] = field(default_factory=dict)
+
+
+def format_row(snapshot: ConsoleSnapshot, with_percentiles: bool = False) -> str:
+    # We combine average and current metrics to compile them into an ascii table row
+    metrics = [
+        round(snapshot.averages['cpu_percent'], 2),
+        snapshot.sample['cpu_percent'],
+        pretty_print_bytes(snapshot.averages['private_memory']),
+        pretty_print_bytes(snapshot.sample['private_memory']),
+        int(snapshot.averages['handles_fds']),
+        snapshot.sample['handles_fds']
+    ]
+    if with_percentiles:
+        metrics += [round(value, 2) for value in snapshot.percentiles['cpu_percent']]
+    output = '|' + serialize_time(snapshot.timestamp).rjust(9, ' ') + ' |' \
+             + ' |'.join([str(metric).rjust(11, ' ') for metric in metrics]) + ' |' + snapshot.suffix
+
+    if snapshot.leaking:
+        output += ' WARNING, potential memory leak detected'
+
+    return output
+
+
+class ConsoleRenderer:
+    # Prints the latest metrics of the monitored targets from its own thread, at most every refresh interval,
+    # so a slow terminal or pipe never delays the collection. Samples taken in between are only in the report.
+
+    def __init__(self, mode: str = 'rows', refresh_interval: float = 1.0) -> None:
+        # A live table is redrawn in place, which needs a terminal
+        if mode == 'live' and not sys.stdout.isatty():
+            logging.info('The standard output is not a terminal, the console is rendered as rows')
+            mode = 'rows'
+
+        self._mode = mode
+        self._refresh_interval = refresh_interval
+        self._sources: List[Callable[[], Optional[ConsoleSnapshot]]] = []
+        self._rendered_counts: Dict[int, int] = {}
+        self._header_printed = False
+        self._live_lines = 0
+        # The rows and the lines written by the targets, e.g. their summary, are printed one at a time
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, source: Callable[[], Optional[ConsoleSnapshot]]) -> None:
+        self._sources.append(source)
+
+    def start(self) -> None:
+        if self._mode == 'quiet':
+            return
+        self._thread = threading.Thread(target=self._run, name='console', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        # The last samples are shown before the summary
+        self.render()
+
+    def render(self) -> None:
+        with self._lock:
+            self._render()
+
+    def write(self, lines: List[str]) -> None:
+        # e.g. the summary of a target done while the others are still monitored: its last rows are shown first,
+        # and the lines are neither interleaved with a row nor overwritten by the next redraw of the live table
+        with self._lock:
+            self._render()
+            for line in lines:
+                print(line)
+            self._live_lines = 0
+
+    def _render(self) -> None:
+        if self._mode == 'quiet':
+            return
+        snapshots = [source() for source in self._sources]
+        if self._mode == 'live':
+            self._render_live(snapshots)
+        elif self._mode == 'rows':
+            self._render_rows(snapshots)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._refresh_interval):
+            try:
+                self.render()
+            except Exception as exception:
+                logging.exception(f'Console rendering has failed: {exception}')
+
+    def _render_rows(self, snapshots: List[Optional[ConsoleSnapshot]]) -> None:
+        for index, snapshot in enumerate(snapshots):
+            if snapshot is None or self._rendered_counts.get(index) == snapshot.count:
+                continue
+            self._rendered_counts[index] = snapshot.count
+
+            # First metric output, we show the header first
+            if not self._header_printed:
+                for line in HEADER:
+                    print(line)
+                self._header_printed = True
+
+            row = format_row(snapshot)
+            print(row if len(self._sources) == 1 else f'{row} {snapshot.name}')
+
+    def _render_live(self, snapshots: List[Optional[ConsoleSnapshot]]) -> None:
+        lines = list(LIVE_HEADER)
+        for snapshot in snapshots:
+            if snapshot is not None:
+                lines.append('| ' + snapshot.name[:TARGET_WIDTH - 2].ljust(TARGET_WIDTH - 2) + ' '
+                             + format_row(snapshot, with_percentiles=True))
+
+        # The cursor is moved back to the start of the table, each line is cleared before being printed again
+        output = f'\x1b[{self._live_lines}F' if self._live_lines else ''
+        output += '\n'.join(f'{line}\x1b[K' for line in lines)
+        print(output, flush=True)
+        self._live_lines = len(lines)
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import os
+import selectors
+import time
+from typing import Dict, Iterable, List
+
+
+def is_pidfd_available() -> bool:
+    # pidfd_open is available from Linux 5.3 and Python 3.9
+    return hasattr(os, 'pidfd_open')
+
+
+class ExitWatcher:
+    # Waits until a watched process exits or a timeout, a pidfd becomes readable when its process terminates.
+    # Without pidfd, it only sleeps and the exit is found by the next collection.
+
+    def __init__(self) -> None:
+        self._selector = selectors.DefaultSelector()
+        self._pidfds: Dict[int, int] = {}
+        self._supported = is_pidfd_available()
+
+    @property
+    def pids(self) -> list:
+        return list(self._pidfds)
+
+    def update(self, pids: Iterable[int]) -> None:
+        pids = set(pids)
+        for pid in [pid for pid in self._pidfds if pid not in pids]:
+            self._unwatch(pid)
+        for pid in pids:
+            if pid not in self._pidfds:
+                self._watch(pid)
+
+    def wait(self, timeout: float) -> List[int]:
+        # Returns the pids which have exited, none on timeout
+        if not self._pidfds:
+            time.sleep(timeout)
+            return []
+
+        exited = []
+        for key, _ in self._selector.select(timeout):
+            logging.info(f'Process with PID {key.data} has exited')
+            self._unwatch(key.data)
+            exited.append(key.data)
+        return exited
+
+    async def wait_async(self, timeout: float) -> List[int]:
+        if not self._pidfds:
+            await asyncio.sleep(timeout)
+            return []
+
+        loop = asyncio.get_running_loop()
+        exited = loop.create_future()
+
+        def on_exit(pid: int) -> None:
+            if not exited.done():
+                exited.set_result(pid)
+
+        pidfds = dict(self._pidfds)
+        for pid, pidfd in pidfds.items():
+            loop.add_reader(pidfd, on_exit, pid)
+        try:
+            pid = await asyncio.wait_for(exited, timeout)
+        except asyncio.TimeoutError:
+            return []
+        finally:
+            for pidfd in pidfds.values():
+                loop.remove_reader(pidfd)
+
+        logging.info(f'Process with PID {pid} has exited')
+        self._unwatch(pid)
+        return [pid]
+
+    def close(self) -> None:
+        self.update([])
+        self._selector.close()
+
+    def _watch(self, pid: int) -> None:
+        if not self._supported:
+            return
+        try:
+            pidfd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            # Already exited, found by the next collection
+            return
+        except OSError as error:
+            logging.warning(f'pidfd is not available ({error}), process exits are found by the collections')
+            self._supported = False
+            return
+
+        self._pidfds[pid] = pidfd
+        self._selector.register(pidfd, selectors.EVENT_READ, data=pid)
+
+    def _unwatch(self, pid: int) -> None:
+        pidfd = self._pidfds.pop(pid)
+        self._selector.unregister(pidfd)
+        os.close(pidfd)
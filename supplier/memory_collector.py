@@ -0,0 +1,81 @@
+import logging
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import psutil
+from psutil import NoSuchProcess
+
+from supplier.procfs_process import ProcfsProcess, parse_smaps_rollup
+
+# Memory tier of the samples whose memory is estimated from the rss variation since the last precise measure
+ESTIMATED_TIER = 'estimated'
+# Proportional set size, the shared pages divided among the processes mapping them, so a group total does not
+# count them several times. Only the rollup tier has it at no extra cost.
+PSS_COLUMN = 'proportional_memory'
+
+
+def read_smaps_rollup(pid: int) -> Tuple[int, int, int]:
+    # smaps_rollup (Linux >= 4.14) is the kernel side sum of /proc/<pid>/smaps, far cheaper to read and parse
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'rb') as smaps_rollup:
+            return parse_smaps_rollup(smaps_rollup.read())
+    except (FileNotFoundError, ProcessLookupError):
+        raise NoSuchProcess(pid)
+
+
+class MemoryCollector:
+
+    def __init__(self, tier: str = 'full', interval: int = 1) -> None:
+        if tier == 'rollup' and not os.path.exists('/proc/self/smaps_rollup'):
+            logging.warning('smaps_rollup is not available on this platform, full memory information will be used')
+            tier = 'full'
+
+        self._tier = tier
+        self._interval = interval
+        # Per pid: number of samples, rss, private and proportional memory of the last precise measure
+        self._states: Dict[int, Tuple[int, int, int, Optional[int]]] = {}
+
+    @property
+    def tier(self) -> str:
+        return self._tier
+
+    @property
+    def columns(self) -> Dict[str, str]:
+        return {PSS_COLUMN: 'int64'} if self._tier == 'rollup' else {}
+
+    def collect(self, process: psutil.Process) -> dict:
+        count, baseline_rss, baseline_private, baseline_pss = self._states.get(process.pid, (0, None, None, None))
+
+        if self._tier == 'rss' or (baseline_rss is not None and count % self._interval != 0):
+            rss = int(process.memory_info().rss)
+            self._states[process.pid] = (count + 1, baseline_rss, baseline_private, baseline_pss)
+            if self._tier == 'rss':
+                return self._metrics(rss, 'rss')
+            # Private and proportional memory are estimated from the rss variation since the last precise measure
+            variation = rss - baseline_rss
+            return self._metrics(max(0, baseline_private + variation), ESTIMATED_TIER,
+                                 max(0, baseline_pss + variation) if baseline_pss is not None else None)
+
+        pss = None
+        if self._tier == 'rollup':
+            if isinstance(process, ProcfsProcess):
+                rss, private_memory, pss = process.smaps_rollup()
+            else:
+                rss, private_memory, pss = read_smaps_rollup(process.pid)
+        else:
+            memory = process.memory_full_info()
+            rss, private_memory = int(memory.rss), int(memory.uss)
+
+        self._states[process.pid] = (count + 1, rss, private_memory, pss)
+        return self._metrics(private_memory, self._tier, pss)
+
+    def retain(self, pids: Iterable[int]) -> None:
+        pids = set(pids)
+        for pid in [pid for pid in self._states if pid not in pids]:
+            del self._states[pid]
+
+    def _metrics(self, private_memory: int, tier: str, pss: Optional[int] = None) -> dict:
+        metrics = {'private_memory': private_memory, 'memory_tier': tier}
+        if self._tier == 'rollup':
+            metrics[PSS_COLUMN] = pss
+        return metrics
@@ -0,0 +1,102 @@
+import logging
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import psutil
+from psutil import NoSuchProcess
+
+from supplier.procfs_process import ProcfsProcess
+
+# Cost of a collection: low when read from the files already cached by oneshot, medium for an additional
+# file read per process, high when it scans the open files of the process or system wide tables
+COSTS = ['low', 'medium', 'high']
+
+
+def read_page_faults(pid: int) -> Tuple[int, int]:
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as stat:
+            content = stat.read()
+    except (FileNotFoundError, ProcessLookupError):
+        raise NoSuchProcess(pid)
+    fields = content[content.rindex(b')') + 2:].split()
+    return int(fields[7]), int(fields[9])  # minflt, majflt
+
+
+def collect_io(process: psutil.Process) -> dict:
+    io = process.io_counters()
+    return {
+        'io_read_count': int(io.read_count),
+        'io_write_count': int(io.write_count),
+        'io_read_bytes': int(io.read_bytes),
+        'io_write_bytes': int(io.write_bytes),
+    }
+
+
+def collect_ctx_switches(process: psutil.Process) -> dict:
+    ctx_switches = process.num_ctx_switches()
+    return {
+        'ctx_switches_voluntary': int(ctx_switches.voluntary),
+        'ctx_switches_involuntary': int(ctx_switches.involuntary),
+    }
+
+
+def collect_page_faults(process: psutil.Process) -> dict:
+    minor, major = process.page_faults() if isinstance(process, ProcfsProcess) else read_page_faults(process.pid)
+    return {'page_faults_minor': minor, 'page_faults_major': major}
+
+
+def collect_threads(process: psutil.Process) -> dict:
+    return {'num_threads': int(process.num_threads())}
+
+
+def collect_connections(process: psutil.Process) -> dict:
+    return {'num_connections': len(process.connections(kind='inet'))}
+
+
+@dataclass(frozen=True)
+class MetricCollector:
+    name: str
+    # Report columns and their dtype, the values are counters summed in the total of a group
+    columns: Dict[str, str]
+    cost: str
+    # sys.platform prefixes supporting the metric, all of them if not set
+    platforms: Optional[Tuple[str, ...]]
+    collect: Callable[[psutil.Process], dict]
+
+    @property
+    def is_supported(self) -> bool:
+        return self.platforms is None or sys.platform.startswith(self.platforms)
+
+
+COLLECTORS = {collector.name: collector for collector in [
+    MetricCollector('io', {'io_read_count': 'int64', 'io_write_count': 'int64', 'io_read_bytes': 'int64',
+                           'io_write_bytes': 'int64'}, 'medium', ('linux', 'win32', 'freebsd'), collect_io),
+    MetricCollector('ctx_switches', {'ctx_switches_voluntary': 'int64', 'ctx_switches_involuntary': 'int64'},
+                    'low', None, collect_ctx_switches),
+    MetricCollector('page_faults', {'page_faults_minor': 'int64', 'page_faults_major': 'int64'},
+                    'medium', ('linux',), collect_page_faults),
+    MetricCollector('threads', {'num_threads': 'int64'}, 'low', None, collect_threads),
+    MetricCollector('connections', {'num_connections': 'int64'}, 'high', None, collect_connections),
+]}
+
+
+def enabled_collectors(names: Iterable[str]) -> List[MetricCollector]:
+    # In the registry order, so the report columns do not depend on the order of the options
+    names = set(names)
+    collectors = []
+    for collector in COLLECTORS.values():
+        if collector.name not in names:
+            continue
+        if not collector.is_supported:
+            logging.warning(f'The {collector.name} metrics are not available on this platform, they are not collected')
+            continue
+        if collector.cost == 'high':
+            logging.warning(f'The {collector.name} metrics are expensive to collect, '
+                            f'prefer a longer sampling interval with them')
+        collectors.append(collector)
+    return collectors
+
+
+def collector_columns(collectors: Iterable[MetricCollector]) -> Dict[str, str]:
+    return {column: dtype for collector in collectors for column, dtype in collector.columns.items()}
@@ -0,0 +1,144 @@
+import logging
+import math
+import numbers
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple
+
+from supplier.console_renderer import ConsoleSnapshot
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+METRICS_PATH = '/metrics'
+PREFIX = 'process_monitor'
+# Name, type, unit, help and value of each metric family, a value of None is not exposed
+FAMILIES = [
+    ('cpu_percent', 'gauge', '', 'CPU usage of the last sample in percent of one CPU',
+     lambda snapshot: snapshot.sample['cpu_percent']),
+    ('cpu_percent_average', 'gauge', '', 'Average CPU usage since the start in percent of one CPU',
+     lambda snapshot: snapshot.averages['cpu_percent']),
+    ('private_memory_bytes', 'gauge', 'bytes', 'Private memory of the last sample',
+     lambda snapshot: snapshot.sample['private_memory']),
+    ('private_memory_average_bytes', 'gauge', 'bytes', 'Average private memory since the start',
+     lambda snapshot: snapshot.averages['private_memory']),
+    ('handles_fds', 'gauge', '', 'Open handles or file descriptors of the last sample',
+     lambda snapshot: snapshot.sample['handles_fds']),
+    ('handles_fds_average', 'gauge', '', 'Average open handles or file descriptors since the start',
+     lambda snapshot: snapshot.averages['handles_fds']),
+    ('lateness_seconds', 'gauge', 'seconds', 'Delay between the scheduled and actual time of the last sample',
+     lambda snapshot: snapshot.sample.get('lateness')),
+    ('memory_leak', 'gauge', '', 'Potential memory leak detected',
+     lambda snapshot: int(snapshot.leaking)),
+    ('samples', 'counter', '', 'Samples collected since the start',
+     lambda snapshot: snapshot.count),
+    ('restarts', 'counter', '', 'Restarts of the process since the start',
+     lambda snapshot: snapshot.sample.get('restarts')),
+    ('last_sample_timestamp_seconds', 'gauge', 'seconds', 'Time of the last sample since the epoch',
+     lambda snapshot: snapshot.timestamp.timestamp() if snapshot.timestamp is not None else None),
+]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value) -> str:
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+
+def format_metrics(snapshots: List[ConsoleSnapshot]) -> str:
+    lines = []
+    for name, kind, unit, description, value in FAMILIES:
+        values = [(snapshot.name, value(snapshot)) for snapshot in snapshots]
+        values = [(target, value) for target, value in values if value is not None]
+        if not values:
+            continue
+
+        family = f'{PREFIX}_{name}'
+        lines.append(f'# TYPE {family} {kind}')
+        if unit:
+            lines.append(f'# UNIT {family} {unit}')
+        lines.append(f'# HELP {family} {description}')
+        # Counter samples are suffixed with _total
+        sample_name = f'{family}_total' if kind == 'counter' else family
+        for target, value in values:
+            lines.append(f'{sample_name}{{target="{_escape(target)}"}} {_format_value(value)}')
+    lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self) -> None:
+        if self.path.split('?')[0] != METRICS_PATH:
+            self.send_error(404)
+            return
+
+        body = self.server.metrics.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logging.debug(f'Metrics request from {self.address_string()}: {format % args}')
+
+
+class MetricsServer:
+    # Serves the latest metrics of the monitored targets in the OpenMetrics text format.
+    # A scrape only reads the snapshots published by the samplers, it never collects the metrics itself,
+    # each snapshot is built once per sample and the text is only formatted again when a new sample has been published.
+
+    def __init__(self, host: str = '127.0.0.1', port: Optional[int] = None) -> None:
+        self._host = host
+        self._port = port
+        self._sources: List[Callable[[], Optional[ConsoleSnapshot]]] = []
+        self._lock = threading.Lock()
+        self._cache: Tuple[Optional[tuple], str] = (None, '')
+        self._server = None
+        self._thread = None
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        return self._server.server_address[:2] if self._server is not None else None
+
+    def add(self, source: Callable[[], Optional[ConsoleSnapshot]]) -> None:
+        self._sources.append(source)
+
+    def start(self) -> None:
+        if self._port is None:
+            return
+        try:
+            self._server = ThreadingHTTPServer((self._host, self._port), _MetricsHandler)
+        except OSError as error:
+            raise RuntimeError(f'The metrics endpoint cannot listen on {self._host}:{self._port}: {error}')
+        self._server.daemon_threads = True
+        self._server.metrics = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics', daemon=True)
+        self._thread.start()
+        host, port = self.address
+        logging.info(f'Serving the metrics on http://{host}:{port}{METRICS_PATH}')
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def render(self) -> str:
+        snapshots = [snapshot for snapshot in (source() for source in self._sources) if snapshot is not None]
+        key = tuple((snapshot.name, snapshot.count) for snapshot in snapshots)
+        with self._lock:
+            if self._cache[0] != key:
+                self._cache = (key, format_metrics(snapshots))
+            return self._cache[1]
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from model.configuration import Configuration
+from supplier.console_renderer import ConsoleRenderer
+from supplier.metrics_server import MetricsServer
+from supplier.process_monitoring import ProcessMonitoring
+
+
+class MonitoringEngine:
+
+    def __init__(self, configuration: Configuration) -> None:
+        self._configuration = configuration
+        self._monitorings = [ProcessMonitoring(configuration=target) for target in configuration.targets]
+        # A single console for all the targets
+        self._renderer = ConsoleRenderer(mode=configuration.console, refresh_interval=configuration.refresh_interval)
+        # A single metrics endpoint for all the targets
+        self._metrics_server = MetricsServer(host=configuration.metrics_host, port=configuration.metrics_port)
+        for monitoring in self._monitorings:
+            self._renderer.add(monitoring.snapshot)
+            self._metrics_server.add(monitoring.snapshot)
+
+    def run(self) -> None:
+        logging.info(f'Monitoring {len(self._monitorings)} targets with {self._configuration.max_workers} workers')
+        self._metrics_server.start()
+        self._renderer.start()
+        try:
+            asyncio.run(self._run())
+        finally:
+            self._renderer.stop()
+            self._metrics_server.stop()
+
+    async def _run(self) -> None:
+        self._stop_on_signal(asyncio.current_task())
+        # Collections are blocking system calls, they are run in a bounded pool while the event loop schedules them
+        with ThreadPoolExecutor(max_workers=self._configuration.max_workers,
+                                thread_name_prefix='collector') as executor:
+            try:
+                results = await asyncio.gather(
+                    *[self._monitor(monitoring, executor) for monitoring in self._monitorings],
+                    return_exceptions=True
+                )
+            except asyncio.CancelledError:
+                # The gather is only done once every target has been finalized
+                logging.warning('The monitoring has been stopped')
+                return
+
+        failures = 0
+        for target, result in zip(self._configuration.targets, results):
+            if isinstance(result, RuntimeError):
+                logging.error(f'Monitoring of {target.process_name} has stopped: {result}')
+            elif isinstance(result, Exception):
+                logging.error(f'Monitoring of {target.process_name} has failed', exc_info=result)
+            else:
+                continue
+            failures += 1
+
+        if failures == len(results):
+            raise RuntimeError('All the monitoring targets have failed')
+
+    def _stop_on_signal(self, task: asyncio.Task) -> None:
+        # A stopped daemon still writes the pending samples and summary of every target: SIGTERM cancels the run
+        # as Ctrl+C does, instead of raising SystemExit in the event loop and dropping the pending tasks
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+        except (NotImplementedError, RuntimeError):
+            # No signal handlers in the event loops of Windows nor outside of the main thread
+            logging.info('SIGTERM cannot be handled by the event loop, the default handler is kept')
+
+    async def _monitor(self, monitoring: ProcessMonitoring, executor: ThreadPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+
+        async def sample(lateness: float) -> None:
+            submitted = time.monotonic()
+
+            def scheduled_sample() -> None:
+                # The time spent waiting for a free worker is part of the lateness
+                monitoring.sample(lateness + time.monotonic() - submitted)
+
+            await loop.run_in_executor(executor, scheduled_sample)
+
+        async def process_exits(pids: List[int]) -> None:
+            await loop.run_in_executor(executor, monitoring.process_exits, pids)
+
+        await loop.run_in_executor(executor, monitoring.start)
+        try:
+            await monitoring.create_scheduler().run_async(sample, on_exit=process_exits)
+        finally:
+            # Also when the run is cancelled, e.g. stopped, so the pending samples and the summary are written.
+            # The finalization is shielded: a second cancellation must not drop it while it is queued.
+            finalization = loop.run_in_executor(executor, monitoring.finalize, self._renderer)
+            try:
+                await asyncio.shield(finalization)
+            except asyncio.CancelledError:
+                await finalization
+                raise
@@ -0,0 +1,101 @@
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import psutil
+from psutil import NoSuchProcess
+
+from supplier.process_resolver import ProcessResolver
+
+# Pid used in the report for the row aggregating all the processes of the group
+GROUP_TOTAL_PID = -1
+
+
+class ProcessGroup:
+
+    def __init__(self, process_name: str, include_descendants: bool,
+                 process_factory: Optional[Callable[[int], Any]] = None,
+                 resolver: Optional[ProcessResolver] = None) -> None:
+        self._process_name = process_name
+        self._include_descendants = include_descendants
+        self._resolver = resolver if resolver is not None else ProcessResolver()
+        # Creates the process handle used for the collection, the discovered psutil process is used if not set
+        self._process_factory = process_factory
+        self._root: Optional[psutil.Process] = None
+        self._processes: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._processes)
+
+    @property
+    def pids(self) -> List[int]:
+        return list(self._processes)
+
+    def refresh(self) -> None:
+        current = {process.pid: process for process in self._discover()}
+
+        for pid in [pid for pid in self._processes if pid not in current]:
+            logging.info(f'Process {self._process_name} with PID {pid} has exited')
+            self._remove(pid)
+
+        for pid, process in current.items():
+            if pid in self._processes:
+                continue
+            try:
+                if process.status() == psutil.STATUS_ZOMBIE:
+                    # Exited but not reaped yet by its parent, it would only report zeros
+                    continue
+                if self._process_factory is not None:
+                    process = self._process_factory(pid)
+                process.cpu_percent()  # to init cpu percent cache, the first call always returns 0
+            except NoSuchProcess:
+                continue
+            logging.info(f'Process {self._process_name} with PID {pid} has been added to the monitoring')
+            self._processes[pid] = process
+
+    def collect(self, collect_metrics: Callable[[psutil.Process], dict]) -> List[dict]:
+        samples = []
+        for pid, process in list(self._processes.items()):
+            try:
+                # Caching the process information retrieval for all the metrics of this process
+                with process.oneshot():
+                    samples.append({'pid': pid, **collect_metrics(process)})
+            except NoSuchProcess:
+                logging.info(f'Process {self._process_name} with PID {pid} has exited')
+                self._remove(pid)
+
+        return samples
+
+    def remove(self, pids: Iterable[int]) -> None:
+        # e.g. the processes reported by the exit watcher, before the next collection
+        for pid in pids:
+            if pid in self._processes:
+                logging.info(f'Process {self._process_name} with PID {pid} has exited')
+                self._remove(pid)
+
+    def close(self) -> None:
+        for pid in list(self._processes):
+            self._remove(pid)
+
+    def _remove(self, pid: int) -> None:
+        process = self._processes.pop(pid)
+        if hasattr(process, 'close'):
+            process.close()
+
+    def _discover(self) -> List[psutil.Process]:
+        if not self._include_descendants:
+            return self._resolver.resolve(self._process_name)
+
+        if self._root is None:
+            self._root = next(iter(self._resolver.resolve(self._process_name)), None)
+            if self._root is None:
+                return []
+
+        try:
+            return [self._root] + self._root.children(recursive=True)
+        except NoSuchProcess:
+            # The root has exited, we keep monitoring the remaining descendants until they exit
+            remaining = [process for process in self._processes.values() if process.is_running()]
+            if not remaining:
+                # The whole tree has exited, a restarted root is resolved on the next refresh
+                self._root = None
+            return remaining
@@ -1,15 +1,50 @@
+import json
 import logging
+import math
+import threading
 import time
-from datetime import timedelta, datetime
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
 
-import pandas as pd
 import psutil
-import schedule
 from psutil import NoSuchProcess
 
+from model.adaptive_interval import AdaptiveInterval
 from model.configuration import Configuration
-from utils.common_utils import is_running_on_windows, pretty_print_bytes
-from utils.date_utils import serialize_time
+from model.leak_detector import MemoryLeakDetector
+from model.rollup import ROLLUP_RESOLUTIONS, Rollup
+from model.running_statistics import RunningAggregates
+from model.sample_buffer import SampleBuffer, DEFAULT_COLUMNS
+from model.trend_detector import TrendDetector
+from supplier.console_renderer import ConsoleRenderer, ConsoleSnapshot
+from supplier.exit_watcher import ExitWatcher
+from supplier.memory_collector import ESTIMATED_TIER, MemoryCollector
+from supplier.metric_collectors import collector_columns, enabled_collectors
+from supplier.metrics_server import MetricsServer
+from supplier.process_group import ProcessGroup, GROUP_TOTAL_PID
+from supplier.process_resolver import ProcessResolver
+from supplier.procfs_process import ProcfsProcess, is_procfs_available
+from supplier.report_writer import CsvReportWriter, NpcolReportWriter, ReportWriter
+from supplier.sampling_scheduler import SamplingScheduler
+from supplier.self_instrumentation import SelfInstrumentation
+from supplier.thread_collector import ThreadCollector, thread_columns
+from utils.common_utils import is_running_on_windows, pretty_print_bytes, pretty_print_trend
+
+REPORT_COLUMNS = {**DEFAULT_COLUMNS, 'memory_tier': 'object', 'lateness': 'float64'}
+GROUP_REPORT_COLUMNS = {'timestamp': 'datetime64[us]', 'pid': 'int64', **REPORT_COLUMNS}
+REATTACH_REPORT_COLUMNS = {'timestamp': 'datetime64[us]', 'pid': 'int64', 'restarts': 'int64', **REPORT_COLUMNS}
+ROLLUP_METRICS = ['cpu_percent', 'private_memory', 'handles_fds']
+# Memory tier of the gap marker row written when the monitored process exits
+EXITED_MARKER = 'exited'
+# Memory tier of a group total summing members collected with different tiers, i.e. some of them estimated
+MIXED_TIERS = ESTIMATED_TIER
+# Maximum delay between two resolutions of an exited process (in seconds)
+REATTACH_MAX_BACKOFF = 60.0
+# Delay between two evaluations of the trends during the monitoring (in seconds)
+TREND_EVALUATION_PERIOD = 60.0
+# Metrics whose increasing trend is reported as a potential leak
+LEAK_METRICS = ['private_memory', 'handles_fds']
 
 
 class ProcessMonitoring:
@@ -17,105 +52,576 @@ class ProcessMonitoring:
     def __init__(self, configuration: Configuration) -> None:
         self._configuration = configuration
         self._process = None
+        self._group = None
+        # Delay between the scheduled time of the current sample and its actual collection (in seconds)
+        self._lateness = 0.0
+        # Snapshot of the last sample, built by the sampler and read by the console and metrics threads
+        self._snapshot = None
+        # The snapshot is only built when the console or the metrics endpoint reads it
+        self._publishes = configuration.console != 'quiet' or configuration.metrics_port is not None
         self._is_running_on_windows = is_running_on_windows()
-        self._dataframe = pd.DataFrame(columns=['timestamp', 'cpu_percent', 'private_memory', 'handles_fds'])
+        self._use_procfs = configuration.backend == 'procfs' and self._is_procfs_supported()
+        self._resolver = ProcessResolver(match=configuration.match)
+        # Duration of the process resolution at startup (in seconds)
+        self._resolution_time = 0.0
+        self._restarts = 0
+        # When the process has exited: monotonic time of the next resolution and the delay before the following one
+        self._reattach_at = None
+        self._reattach_backoff = configuration.sampling
+        # Monotonic time of the next discovery of the processes of a group
+        self._group_refresh_at = 0.0
+        self._exit_watcher = ExitWatcher()
+        # The samples, exits and finalization of a target may run on different worker threads of the engine
+        self._lock = threading.Lock()
+        # Only the enabled metrics are collected, the report has their columns
+        self._collectors = enabled_collectors(configuration.collectors)
+        self._thread_collector = ThreadCollector(top=configuration.top_threads) if configuration.top_threads else None
+        self._memory_collector = MemoryCollector(
+            tier=configuration.memory_tier,
+            interval=configuration.memory_tier_interval
+        )
+        self._samples = SampleBuffer(columns=self._report_columns())
+        self._writer = self._create_writer()
+        # In daemon mode, the samples are also rolled up per resolution, each one with its own report
+        self._rollups = {}
+        if configuration.daemon:
+            for resolution, seconds in ROLLUP_RESOLUTIONS.items():
+                rollup = Rollup(resolution=seconds, metrics=ROLLUP_METRICS)
+                samples = SampleBuffer(columns=rollup.columns, initial_capacity=1)
+                writer = self._create_writer(path=configuration.rollup_report_path(resolution), samples=samples)
+                self._rollups[resolution] = (rollup, samples, writer)
+        self._aggregates = RunningAggregates(metrics=ROLLUP_METRICS)
+        self._instrumentation = SelfInstrumentation() if configuration.instrumentation else None
+        # Summary of the overhead, once written next to the report
+        self._overhead = None
+        self._leak_detector = self._create_leak_detector()
+        self._adaptive_interval = self._create_adaptive_interval()
+        # Leak detection state of the previous sample, a new detection is an anomaly for the adaptive sampling
+        self._was_leaking = False
+        self._trend_detector = self._create_trend_detector()
+        # Last trends evaluated and elapsed time of their evaluation
+        self._trends = {}
+        self._trends_evaluated_at = None
+        if self._instrumentation is not None:
+            self._instrument()
 
     def run(self) -> None:
-        self._init()
+        self.start()
+        renderer = ConsoleRenderer(
+            mode=self._configuration.console,
+            refresh_interval=self._configuration.refresh_interval
+        )
+        renderer.add(self.snapshot)
+        metrics_server = MetricsServer(host=self._configuration.metrics_host, port=self._configuration.metrics_port)
+        metrics_server.add(self.snapshot)
         
         try:
-            logging.info(f'Scheduling the monitoring for {self._configuration.duration} '
-                         f'seconds with sampling every {self._configuration.sampling} seconds')
+            if self._configuration.daemon:
+                logging.info(f'Scheduling the monitoring until stopped with sampling every '
+                             f'{self._configuration.sampling} seconds')
+            else:
+                logging.info(f'Scheduling the monitoring for {self._configuration.duration} '
+                             f'seconds with sampling every {self._configuration.sampling} seconds')
             
-            schedule.every(
-                self._configuration.sampling
-            ).seconds.until(
-                timedelta(seconds=self._configuration.duration)
-            ).do(
-                self._process_metrics
-            )
-
-            while True:
-                if not schedule.jobs:
-                    break
-                
-                schedule.run_pending()
-                time.sleep(1)
+            metrics_server.start()
+            renderer.start()
+            self.create_scheduler().run(self.sample, on_exit=self.process_exits)
         finally:
-            self._persist()
+            renderer.stop()
+            metrics_server.stop()
+            self.finalize(renderer)
+
+    def snapshot(self) -> Optional[ConsoleSnapshot]:
+        # Read without the lock, the sampler replaces the whole snapshot and never modifies it
+        return self._snapshot
 
-    def _init(self) -> None:
+    def start(self) -> None:
         logging.info(f'Retrieve running process {self._configuration.process_name} information')
-        for process in psutil.process_iter():
-            if process.name() == self._configuration.process_name:
-                self._process = psutil.Process(process.pid)
-                self._process.cpu_percent()  # to init cpu percent cache to avoid 0 value.
-                                             # Utilization measured since the last call to cpu_percent
-                logging.info(f'Process has been found with PID {process.pid}')
+        if self._configuration.target_mode != 'first':
+            self._group = ProcessGroup(
+                process_name=self._configuration.process_name,
+                include_descendants=self._configuration.target_mode == 'tree',
+                process_factory=self._open_process if self._use_procfs else None,
+                resolver=self._resolver
+            )
+            self._group.refresh()
+            self._group_refresh_at = time.monotonic() + self._configuration.group_refresh
+            self._log_resolution()
+            if len(self._group) == 0:
+                raise RuntimeError(f'No running process {self._configuration.process_name} was found')
+            logging.info(f'Processes have been found with PIDs {self._group.pids}')
+            self._exit_watcher.update(self._group.pids)
+            return
+
+        processes = self._resolver.resolve(self._configuration.process_name)
+        self._log_resolution()
+        if not processes:
+            raise RuntimeError(f'No running process {self._configuration.process_name} was found')
+
+        self._process = self._open_process(processes[0].pid)
+        self._process.cpu_percent()  # to init cpu percent cache to avoid 0 value.
+                                     # Utilization measured since the last call to cpu_percent
+        logging.info(f'Process has been found with PID {processes[0].pid}')
+        self._exit_watcher.update([processes[0].pid])
+
+    def create_scheduler(self) -> SamplingScheduler:
+        return SamplingScheduler(
+            interval=self._configuration.sampling,
+            duration=self._configuration.monitoring_duration,
+            overrun_policy=self._configuration.overrun_policy,
+            exit_watcher=self._exit_watcher,
+            next_interval=self._next_interval if self._adaptive_interval is not None else None
+        )
+
+    def sample(self, lateness: float) -> None:
+        with self._lock:
+            self._lateness = lateness
+            self._process_metrics()
+            self._writer.write_pending(self._samples)
+
+    def process_exits(self, pids: List[int]) -> None:
+        # Exits reported by the exit watcher: the processes are detached without being sampled, until reaped
+        # by their parent they are zombies and their zero metrics would be stored as a sample
+        with self._lock:
+            if self._reattach_at is not None:
+                return
+
+            timestamp = datetime.now()
+            if self._group is not None:
+                self._group.remove(pids)
+                if len(self._group) == 0:
+                    self._group_exited(timestamp)
+                # An exited process is often replaced, e.g. a worker, it is looked for on the next sample
+                self._group_refresh_at = time.monotonic()
                 return
-        raise RuntimeError(f'No running process {self._configuration.process_name} was found')
+
+            if self._process is not None and self._process.pid in pids:
+                self._process_exited(timestamp)
+
+    def finalize(self, console: Optional[ConsoleRenderer] = None) -> None:
+        with self._lock:
+            self._persist()
+            self._close()
+        # Out of the lock, the console takes a last snapshot of the target before writing its summary
+        self._summarize(console)
+
+    def _report_columns(self) -> dict:
+        if self._configuration.target_mode != 'first':
+            columns = GROUP_REPORT_COLUMNS
+            if self._configuration.reattach:
+                columns = {**columns, 'restarts': 'int64'}
+        else:
+            columns = REATTACH_REPORT_COLUMNS if self._configuration.reattach else REPORT_COLUMNS
+        columns = {**columns, **self._memory_collector.columns, **collector_columns(self._collectors)}
+        if self._thread_collector is not None:
+            columns = {**columns, **thread_columns(self._configuration.top_threads)}
+        return columns
+
+    def _create_writer(self, path: Path = None, samples: SampleBuffer = None) -> ReportWriter:
+        samples = samples if samples is not None else self._samples
+        options = {
+            'path': path if path is not None else self._configuration.report_path,
+            'columns': samples.columns,
+            'flush_rows': self._configuration.flush_rows,
+            'flush_interval': self._configuration.flush_interval,
+            'rotate_bytes': int(self._configuration.rotate_size * 1024 ** 2) if self._configuration.rotate_size else None,
+        }
+        if self._configuration.daemon and path is None:
+            # The raw report is rotated every retention period and only the previous one is kept
+            options['rotate_interval'] = self._configuration.raw_retention
+            options['max_rotations'] = 1
+        if self._configuration.report_format == 'npcol':
+            return NpcolReportWriter(dtypes=samples.dtypes, **options)
+        return CsvReportWriter(**options)
+
+    def _create_leak_detector(self) -> MemoryLeakDetector:
+        leak_detector = MemoryLeakDetector(
+            window=self._configuration.leak_window_samples,
+            tolerance=self._configuration.leak_tolerance / 100,
+            duration=self._configuration.leak_window_duration
+        )
+        if self._instrumentation is not None:
+            leak_detector.update = self._instrumentation.wrap('leak', leak_detector.update)
+        return leak_detector
+
+    def _create_trend_detector(self) -> Optional[TrendDetector]:
+        if not self._configuration.trend_detection:
+            return None
+        return TrendDetector(metrics=ROLLUP_METRICS, window=self._configuration.trend_window)
+
+    def _instrument(self) -> None:
+        # The measured functions are only replaced on this instance, the sampling path is unchanged when disabled
+        instrumentation = self._instrumentation
+        self._collect_metrics = instrumentation.wrap('collect', self._collect_metrics)
+        self._aggregates.update = instrumentation.wrap('aggregate', self._aggregates.update)
+        self._publish = instrumentation.wrap('render', self._publish)
+        for writer in [self._writer] + [writer for _, _, writer in self._rollups.values()]:
+            writer.flush = instrumentation.wrap_persist(writer.flush)
+        self.sample = instrumentation.wrap_scheduled(self.sample)
+
+    def _create_adaptive_interval(self) -> Optional[AdaptiveInterval]:
+        if not self._configuration.adaptive_sampling:
+            return None
+        min_sampling, max_sampling = self._configuration.sampling_bounds
+        return AdaptiveInterval(initial=self._configuration.sampling, minimum=min_sampling, maximum=max_sampling)
+
+    def _next_interval(self) -> float:
+        return self._adaptive_interval.interval
+
+    def _process_exited(self, timestamp: datetime) -> None:
+        if self._configuration.reattach:
+            self._detach(timestamp, self._process.pid)
+            return
+        raise RuntimeError(f'Process {self._configuration.process_name} with pid {self._process.pid} '
+                           f'is not running, application will stop')
+
+    def _group_exited(self, timestamp: datetime) -> None:
+        if self._configuration.reattach:
+            self._detach(timestamp, GROUP_TOTAL_PID)
+            return
+        raise RuntimeError(f'No process {self._configuration.process_name} is running anymore, '
+                           f'application will stop')
+
+    def _log_resolution(self) -> None:
+        self._resolution_time = self._resolver.elapsed
+        logging.info(f'Process resolution by {self._configuration.match} took '
+                     f'{round(self._resolution_time * 1000, 1)} ms')
     
+    def _is_procfs_supported(self) -> bool:
+        if self._is_running_on_windows or not is_procfs_available():
+            logging.warning('The procfs backend is only available on Linux, psutil will be used')
+            return False
+        return True
+
+    def _open_process(self, pid: int):
+        return ProcfsProcess(pid) if self._use_procfs else psutil.Process(pid)
+
+    def _close(self) -> None:
+        if isinstance(self._process, ProcfsProcess):
+            self._process.close()
+        if self._group is not None:
+            self._group.close()
+        self._exit_watcher.close()
+
+    def _detach(self, timestamp: datetime, pid: int) -> None:
+        logging.warning(f'Process {self._configuration.process_name} with pid {pid} has exited, '
+                        f'waiting for it to restart')
+        # Gap marker, not part of the statistics, so the exit is visible in the report
+        marker = {
+            'timestamp': timestamp,
+            'pid': pid,
+            'restarts': self._restarts,
+            'cpu_percent': math.nan,
+            'private_memory': 0,
+            'handles_fds': 0,
+            'memory_tier': EXITED_MARKER,
+            'lateness': self._lateness,
+            **{column: 0 for column in self._memory_collector.columns},
+            **{column: 0 for column in collector_columns(self._collectors)},
+        }
+        if self._thread_collector is not None:
+            marker.update(self._thread_collector.to_columns([]))
+        self._samples.append(marker)
+        # The exit is written right away, the next samples may be a long time coming
+        self._writer.flush(self._samples)
+
+        if self._group is None:
+            if isinstance(self._process, ProcfsProcess):
+                self._process.close()
+            self._process = None
+            self._exit_watcher.update([])
+        self._reattach_at = time.monotonic()
+        self._reattach_backoff = self._configuration.sampling
+
+    def _reattach(self) -> None:
+        now = time.monotonic()
+        if now < self._reattach_at:
+            return
+
+        if self._group is not None:
+            self._group.refresh()
+            pids = self._group.pids
+        else:
+            processes = self._resolver.resolve(self._configuration.process_name)
+            pids = [processes[0].pid] if processes else []
+            if processes:
+                try:
+                    self._process = self._open_process(processes[0].pid)
+                    # The cpu percent baseline of the new process, the first sample is measured on a full interval
+                    self._process.cpu_percent()
+                except NoSuchProcess:
+                    self._process = None
+                    pids = []
+
+        if not pids:
+            # The process is resolved again less and less often, up to the maximum backoff
+            self._reattach_at = now + self._reattach_backoff
+            self._reattach_backoff = min(self._reattach_backoff * 2, REATTACH_MAX_BACKOFF)
+            return
+
+        self._restarts += 1
+        self._reattach_at = None
+        self._memory_collector.retain(pids)
+        if self._thread_collector is not None:
+            self._thread_collector.retain(pids)
+        self._exit_watcher.update(pids)
+        # The memory trend of the previous process is not relevant to the new one
+        self._leak_detector = self._create_leak_detector()
+        self._trend_detector = self._create_trend_detector()
+        self._trends, self._trends_evaluated_at = {}, None
+        logging.warning(f'Process {self._configuration.process_name} has restarted with PIDs {pids}, '
+                        f'restart {self._restarts}')
+
     def _process_metrics(self) -> None:
         logging.info('Retrieve process metrics')
 
         timestamp = datetime.now()
         
+        if self._reattach_at is not None:
+            self._reattach()
+            return
+
+        if self._group is not None:
+            self._process_group_metrics(timestamp)
+            return
+
         try:
-            cpu_percent = round(self._process.cpu_percent(), 2)
-            private_memory = int(self._process.memory_full_info().uss)
-            handles_fds = int(self._process.num_handles() if self._is_running_on_windows else self._process.num_fds())
+            with self._process.oneshot():
+                metrics = self._collect_metrics(self._process)
         except NoSuchProcess:
-            raise RuntimeError(f'Process {self._process.name} with pid {self._process.pid} '
-                               f'is not running, application will stop')
+            self._process_exited(timestamp)
+            return
+
+        sample = {
+            'timestamp': timestamp,
+            'pid': self._process.pid,
+            'restarts': self._restarts,
+            **metrics,
+            'lateness': self._lateness
+        }
+        self._store_sample(sample)
+        self._publish(sample)
+
+    def _process_group_metrics(self, timestamp: datetime) -> None:
+        members = len(self._group)
+        samples = self._group.collect(self._collect_metrics)
+        # New processes are added after the collection, so the first cpu percent is measured on a full interval
+        self._refresh_group(exited=len(samples) < members)
+        if not samples:
+            self._group_exited(timestamp)
+            return
+
+        for sample in samples:
+            self._samples.append({'timestamp': timestamp, **sample, 'restarts': self._restarts,
+                                  'lateness': self._lateness})
 
-        self._dataframe.loc[len(self._dataframe)] = {
+        total = {
             'timestamp': timestamp,
+            'pid': GROUP_TOTAL_PID,
+            'restarts': self._restarts,
+            'cpu_percent': round(sum(sample['cpu_percent'] for sample in samples), 2),
+            'private_memory': sum(sample['private_memory'] for sample in samples),
+            'handles_fds': sum(sample['handles_fds'] for sample in samples),
+            'memory_tier': self._group_tier(samples),
+            'lateness': self._lateness,
+            **{column: sum(sample[column] for sample in samples) for column in self._memory_collector.columns},
+            **{column: sum(sample[column] for sample in samples) for column in collector_columns(self._collectors)},
+        }
+        if self._thread_collector is not None:
+            total.update(self._thread_collector.to_columns(
+                self._thread_collector.busiest(sample['pid'] for sample in samples)))
+        self._store_sample(total)
+        self._publish(total, suffix=f' {len(samples)} processes')
+
+    def _refresh_group(self, exited: bool) -> None:
+        # The discovery scans all the processes, or walks the tree, far more expensive than sampling the known
+        # members: it is only run every group refresh interval, and on the sample following the exit of a member
+        now = time.monotonic()
+        if not exited and now < self._group_refresh_at:
+            return
+
+        self._group.refresh()
+        self._group_refresh_at = now + self._configuration.group_refresh
+        self._memory_collector.retain(self._group.pids)
+        if self._thread_collector is not None:
+            self._thread_collector.retain(self._group.pids)
+        self._exit_watcher.update(self._group.pids)
+
+    def _group_tier(self, samples: List[dict]) -> str:
+        tiers = {sample['memory_tier'] for sample in samples}
+        return tiers.pop() if len(tiers) == 1 else MIXED_TIERS
+
+    def _collect_metrics(self, process: psutil.Process) -> dict:
+        cpu_percent = round(process.cpu_percent(), 2)
+        memory = self._memory_collector.collect(process)
+        metrics = {
             'cpu_percent': cpu_percent,
-            'private_memory': private_memory,
-            'handles_fds': handles_fds,
+            'handles_fds': int(process.num_handles() if self._is_running_on_windows else process.num_fds()),
+            **memory,
         }
+        for collector in self._collectors:
+            metrics.update(collector.collect(process))
+        if self._thread_collector is not None:
+            metrics.update(self._thread_collector.to_columns(self._thread_collector.collect(process)))
+        return metrics
 
-        average_metrics = self._dataframe.mean()
-        
-        # First metric output, we show the header first
-        if (len(self._dataframe)) == 1:
-            print('+----------+-------------------------+-------------------------+-------------------------+')
-            print('+          |          CPU %          |          Memory         |       Handle / FDS      |')
-            print('+   Time   +------------+------------+------------+------------+------------+------------+')
-            print('+          |    AVG     |    CUR     |    AVG     |    CUR     |    AVG     |    CUR     |')
-            print('+----------+------------+------------+------------+------------+------------+------------+')
-       
-        # We combine average and current metrics to compile them into an ascii table row
-        metrics = [
-            round(average_metrics['cpu_percent'], 2),
-            cpu_percent,
-            pretty_print_bytes(average_metrics['private_memory']),
-            pretty_print_bytes(private_memory),
-            int(average_metrics['handles_fds']),
-            handles_fds
-        ]
-        output = '|' + serialize_time(timestamp).rjust(9, ' ') + ' |' \
-                 + ' |'.join([str(metric).rjust(11, ' ') for metric in metrics]) + ' |'
-        
-        if self._has_potential_memory_leak():
-            output += ' WARNING, potential memory leak detected'
-        
-        print(output)
+    def _publish(self, sample: dict, suffix: str = '') -> None:
+        # Built once per sample, the console renderer and the metrics endpoint format it at their own pace
+        if not self._publishes:
+            return
+        self._snapshot = ConsoleSnapshot(
+            name=self._configuration.process_name,
+            count=self._aggregates.count,
+            timestamp=sample['timestamp'],
+            averages=self._aggregates.means(),
+            sample=sample,
+            suffix=suffix,
+            leaking=self._has_potential_memory_leak(),
+            percentiles=self._aggregates.percentiles()
+        )
         
+    def _store_sample(self, sample: dict) -> None:
+        self._samples.append(sample)
+        weight = self._sample_weight()
+        self._aggregates.update(sample, weight)
+        timestamp = sample['timestamp']
+        self._leak_detector.update(
+            value=sample['private_memory'],
+            elapsed=timestamp.timestamp() if timestamp is not None else None
+        )
+        if timestamp is not None:
+            self._roll_up(timestamp, sample, weight)
+            if self._trend_detector is not None:
+                self._update_trends(sample, timestamp.timestamp())
+        if self._adaptive_interval is not None:
+            self._adapt_interval(sample)
+
+    def _update_trends(self, sample: dict, elapsed: float) -> None:
+        self._trend_detector.update(sample, elapsed)
+        if self._trends_evaluated_at is None:
+            self._trends_evaluated_at = elapsed
+        elif elapsed - self._trends_evaluated_at >= TREND_EVALUATION_PERIOD:
+            self._trends_evaluated_at = elapsed
+            self._evaluate_trends()
+
+    def _evaluate_trends(self) -> None:
+        previous = self._trends
+        self._trends = self._trend_detector.evaluate()
+        for metric in LEAK_METRICS:
+            trend = self._trends[metric]
+            was_increasing = previous.get(metric) is not None and previous[metric].direction == 'increasing'
+            if trend is not None and trend.direction == 'increasing' and not was_increasing:
+                logging.warning(f'Potential leak of {self._configuration.process_name}: '
+                                f'{pretty_print_trend(metric, trend)}')
+
+    def _sample_weight(self) -> float:
+        if self._adaptive_interval is None:
+            return 1
+        # The sample is weighted by the interval it covers, so the dense samples of an incident do not
+        # outweigh the sparse samples of the quiet periods
+        return self._adaptive_interval.interval / self._configuration.sampling
+
+    def _adapt_interval(self, sample: dict) -> None:
+        leaking = self._leak_detector.is_leaking
+        self._adaptive_interval.update(
+            cpu_percent=sample['cpu_percent'],
+            private_memory=sample['private_memory'],
+            anomaly=leaking and not self._was_leaking
+        )
+        self._was_leaking = leaking
+
+    def _roll_up(self, timestamp: datetime, sample: dict, weight: float = 1) -> None:
+        for rollup, samples, writer in self._rollups.values():
+            row = rollup.update(timestamp, sample, weight)
+            if row is not None:
+                # A bucket is complete, rollup reports are small so they are written right away
+                samples.append(row)
+                writer.flush(samples)
+
     def _has_potential_memory_leak(self) -> bool:
-        # We need at least 10 samples to detect a potential leak trend
-        if len(self._dataframe) >= 10:
-            memory_series = self._dataframe['private_memory']
-            # is_monotonic_increasing will return True if all values are equals or increasing,
-            # we add an additional check to skip if values stay the same for more than 33%
-            return memory_series.is_monotonic_increasing and memory_series.nunique() > (len(self._dataframe) * 2/3)
-           
-        return False
+        return self._leak_detector.is_leaking
 
     def _persist(self) -> None:
-        logging.info(f'Persist results to {self._configuration.csv_report_path}')
+        logging.info(f'Persist results to {self._writer.path}')
         
-        self._dataframe.to_csv(
-            path_or_buf=self._configuration.csv_report_path,
-            index=False
-        )
+        self._writer.flush(self._samples)
+        self._writer.close()
+
+        for rollup, samples, writer in self._rollups.values():
+            row = rollup.flush()
+            if row is not None:
+                samples.append(row)
+            writer.flush(samples)
+            writer.close()
+
+        if self._aggregates.count:
+            self._persist_sketches()
+
+        if self._instrumentation is not None:
+            path = self._configuration.overhead_report_path
+            logging.info(f'Persist monitoring overhead to {path}')
+            self._overhead = self._instrumentation.write(path)
+
+    def _persist_sketches(self) -> None:
+        # The percentiles sketches are kept to be merged with the ones of other runs, see load_sketches
+        path = self._configuration.sketches_report_path
+        logging.info(f'Persist percentiles sketches to {path}')
+        sketches = {metric: self._aggregates.sketch(metric).to_dict() for metric in self._aggregates.metrics}
+        path.write_text(json.dumps(sketches))
+
+    def _summarize(self, console: Optional[ConsoleRenderer] = None) -> None:
+        if self._aggregates.count == 0:
+            return
+
+        cpu = self._aggregates['cpu_percent']
+        memory = self._aggregates['private_memory']
+        handles_fds = self._aggregates['handles_fds']
+        cpu_p50, cpu_p95, cpu_p99 = self._aggregates.sketch('cpu_percent').percentiles()
+        memory_p50, memory_p95, memory_p99 = self._aggregates.sketch('private_memory').percentiles()
+        handles_fds_p50, handles_fds_p95, handles_fds_p99 = self._aggregates.sketch('handles_fds').percentiles()
+
+        summary = [
+            f'Summary of {self._aggregates.count} samples for {self._configuration.process_name}',
+            f'CPU %:        avg {round(cpu.mean, 2)}, min {cpu.minimum}, max {cpu.maximum}, '
+            f'std {round(cpu.std, 2)}, p50 {round(cpu_p50, 2)}, p95 {round(cpu_p95, 2)}, p99 {round(cpu_p99, 2)}',
+            f'Memory:       avg {pretty_print_bytes(memory.mean)}, min {pretty_print_bytes(memory.minimum)}, '
+            f'max {pretty_print_bytes(memory.maximum)}, p50 {pretty_print_bytes(memory_p50)}, '
+            f'p95 {pretty_print_bytes(memory_p95)}, p99 {pretty_print_bytes(memory_p99)}',
+            f'Handle / FDS: avg {int(handles_fds.mean)}, min {int(handles_fds.minimum)}, '
+            f'max {int(handles_fds.maximum)}, p50 {round(handles_fds_p50)}, p95 {round(handles_fds_p95)}, '
+            f'p99 {round(handles_fds_p99)}',
+            f'Memory trend: {"+" if self._leak_detector.slope >= 0 else "-"}'
+            f'{pretty_print_bytes(abs(self._leak_detector.slope) * 3600)} per hour '
+            f'(confidence {round(self._leak_detector.confidence, 2)})',
+            f'Resolution:   {round(self._resolution_time * 1000, 1)} ms by {self._configuration.match}',
+        ]
+        if self._configuration.reattach:
+            summary.append(f'Restarts:     {self._restarts}')
+        if self._trend_detector is not None:
+            self._evaluate_trends()
+            trends = ', '.join(pretty_print_trend(metric, trend) for metric, trend in self._trends.items())
+            summary.append(f'Trends:       {trends}')
+        if self._adaptive_interval is not None:
+            summary.append(f'Sampling:     adaptive from {self._adaptive_interval.minimum} to '
+                           f'{self._adaptive_interval.maximum} s, shortened {self._adaptive_interval.shrinks} times')
+        if self._overhead is not None:
+            summary += self._overhead_summary()
+        for line in summary:
+            logging.info(line)
+        if console is not None:
+            console.write(summary)
+        else:
+            for line in summary:
+                print(line)
+
+    def _overhead_summary(self) -> List[str]:
+        overhead = self._overhead
+        stages = ', '.join(f'{stage} {statistics["mean_ms"]} ms' for stage, statistics in overhead['stages'].items()
+                           if statistics['count'])
+        lateness = overhead['lateness']
+        return [
+            f'Overhead:     {overhead["busy_percent"]} % of the time, mean per call {stages}',
+            f'Jitter:       avg {lateness["mean_ms"]} ms, max {lateness["max_ms"]} ms, std {lateness["std_ms"]} ms',
+            f'Monitor:      CPU {overhead["cpu_percent"]} %, memory {pretty_print_bytes(overhead["rss_bytes"])}, '
+            f'peak {pretty_print_bytes(overhead["peak_rss_bytes"])}',
+        ]
@@ -0,0 +1,94 @@
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Set
+
+import psutil
+from psutil import NoSuchProcess, STATUS_ZOMBIE
+
+from model.configuration import MATCH_MODES
+
+
+class ProcessResolver:
+    # Finds the processes matching a pattern: exact name, name regex, command line regex, pid or pidfile
+
+    def __init__(self, match: str = 'name') -> None:
+        if match not in MATCH_MODES:
+            raise RuntimeError(f'Unknown match mode {match}, expected name, regex, cmdline, pid or pidfile.')
+
+        self._match = match
+        # Duration of the last resolution (in seconds)
+        self.elapsed = 0.0
+        # The monitoring itself and the shells or wrappers which started it, e.g. matched by their command line.
+        # Retrieved on the first lookup of the processes, the explicit pid and pidfile matches do not need them.
+        self._excluded_pids = None
+
+    def resolve(self, pattern: str) -> List[psutil.Process]:
+        start = time.perf_counter()
+        try:
+            if self._match == 'pid':
+                return self._resolve_pid(pattern)
+            if self._match == 'pidfile':
+                return self._resolve_pidfile(Path(pattern))
+            return self._resolve_index(pattern)
+        finally:
+            self.elapsed = time.perf_counter() - start
+            logging.debug(f'Processes matching {self._match} {pattern} resolved in {self.elapsed * 1000:.1f} ms')
+
+    def _resolve_index(self, pattern: str) -> List[psutil.Process]:
+        index = self._build_index()
+        if self._match == 'name':
+            processes = index.get(pattern, [])
+        else:
+            expression = re.compile(pattern)
+            # The regex is evaluated once per distinct name or command line, not once per process
+            matches = expression.fullmatch if self._match == 'regex' else expression.search
+            processes = [process for key, processes in index.items() if matches(key) for process in processes]
+
+        return sorted(processes, key=lambda process: process.pid)
+
+    def _build_index(self) -> Dict[str, List[psutil.Process]]:
+        # Only the matched attribute and the status are retrieved, in bulk, the command line being far more expensive
+        attribute = 'cmdline' if self._match == 'cmdline' else 'name'
+        if self._excluded_pids is None:
+            self._excluded_pids = self._monitoring_pids()
+        index = defaultdict(list)
+        for process in psutil.process_iter(attrs=[attribute, 'status']):
+            if process.pid in self._excluded_pids or process.info['status'] == STATUS_ZOMBIE:
+                # Exited but not reaped yet by its parent, its exit would be signaled again right away
+                continue
+            value = process.info[attribute]
+            if value is None:
+                # Access denied or zombie process
+                continue
+            index[' '.join(value) if attribute == 'cmdline' else value].append(process)
+        return index
+
+    def _monitoring_pids(self) -> Set[int]:
+        pids = {os.getpid()}
+        try:
+            pids.update(parent.pid for parent in psutil.Process().parents())
+        except psutil.Error:
+            logging.warning('The parents of the monitoring cannot be retrieved, they may be matched')
+        return pids
+
+    def _resolve_pid(self, pattern: str) -> List[psutil.Process]:
+        try:
+            process = psutil.Process(int(pattern))
+            return [] if process.status() == STATUS_ZOMBIE else [process]
+        except ValueError:
+            raise RuntimeError(f'Invalid pid {pattern}')
+        except NoSuchProcess:
+            return []
+
+    def _resolve_pidfile(self, path: Path) -> List[psutil.Process]:
+        try:
+            content = path.read_text().strip()
+        except FileNotFoundError:
+            return []
+        except OSError as error:
+            raise RuntimeError(f'Pidfile {path} cannot be read: {error}')
+        return self._resolve_pid(content)
@@ -0,0 +1,196 @@
+import os
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+from psutil import AccessDenied, NoSuchProcess
+
+pmem = namedtuple('pmem', ['rss', 'vms'])
+pthread = namedtuple('pthread', ['id', 'user_time', 'system_time'])
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+# Number of thread stat files kept open, the others are opened on each read to stay below the open files limit
+MAX_THREAD_FDS = 256
+
+
+def parse_smaps_rollup(content: bytes) -> Tuple[int, int, int]:
+    # rss, uss and pss
+    values = {}
+    for line in content.splitlines():
+        key, _, value = line.partition(b':')
+        if key in (b'Rss', b'Pss', b'Private_Clean', b'Private_Dirty', b'Private_Hugetlb'):
+            values[key] = int(value.split()[0]) * 1024
+
+    uss = values.get(b'Private_Clean', 0) + values.get(b'Private_Dirty', 0) + values.get(b'Private_Hugetlb', 0)
+    return values.get(b'Rss', 0), uss, values.get(b'Pss', 0)
+
+
+def is_procfs_available() -> bool:
+    return os.path.isdir('/proc/self/fd') and os.path.exists('/proc/self/statm')
+
+
+class ProcfsProcess:
+    # Linux only sampling backend: the /proc files of the process are kept open and re-read
+    # with pread into a reused buffer, avoiding the open/close and object creation of psutil on each sample
+
+    def __init__(self, pid: int) -> None:
+        self.pid = pid
+        # Used for the metrics and information not read from /proc
+        self._process = psutil.Process(pid)
+        self._buffer = bytearray(4096)
+        # Everything released by close() is set before opening the files, as a failed open closes the others
+        self._fds = {}
+        self._thread_fds: Dict[str, int] = {}
+        self._fd_directory = f'/proc/{pid}/fd'
+        self._task_directory = f'/proc/{pid}/task'
+        self._stat_fd = self._open('stat')
+        self._statm_fd = self._open('statm')
+        # Only readable with ptrace access to the process, e.g. not for the process of another user: the memory is then
+        # read by psutil, which raises AccessDenied as with the psutil backend
+        self._smaps_rollup_fd = self._open('smaps_rollup', optional=True) \
+            if os.path.exists(f'/proc/{pid}/smaps_rollup') else None
+        self._last_cpu_time: Optional[float] = None
+        self._last_time: Optional[float] = None
+
+    def name(self) -> str:
+        return self._process.name()
+
+    def is_running(self) -> bool:
+        return self._process.is_running()
+
+    def oneshot(self) -> nullcontext:
+        # Every metric is read from its own file, there is nothing to cache
+        return nullcontext()
+
+    def cpu_percent(self) -> float:
+        # Same semantic as psutil: utilization since the last call, the first call returns 0
+        fields = self._read(self._stat_fd)
+        fields = fields[fields.rindex(b')') + 2:].split()
+        cpu_time = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS  # utime + stime
+        now = time.monotonic()
+
+        last_cpu_time, last_time = self._last_cpu_time, self._last_time
+        self._last_cpu_time, self._last_time = cpu_time, now
+        if last_time is None or now <= last_time:
+            return 0.0
+        return (cpu_time - last_cpu_time) / (now - last_time) * 100
+
+    def memory_info(self) -> pmem:
+        fields = self._read(self._statm_fd).split()
+        return pmem(rss=int(fields[1]) * PAGE_SIZE, vms=int(fields[0]) * PAGE_SIZE)
+
+    def memory_full_info(self):
+        return self._process.memory_full_info()
+
+    def page_faults(self) -> Tuple[int, int]:
+        fields = self._read(self._stat_fd)
+        fields = fields[fields.rindex(b')') + 2:].split()
+        return int(fields[7]), int(fields[9])  # minflt, majflt
+
+    def num_threads(self) -> int:
+        fields = self._read(self._stat_fd)
+        return int(fields[fields.rindex(b')') + 2:].split()[17])
+
+    def num_ctx_switches(self):
+        return self._process.num_ctx_switches()
+
+    def io_counters(self):
+        return self._process.io_counters()
+
+    def connections(self, kind: str = 'inet') -> list:
+        return self._process.connections(kind=kind)
+
+    def threads(self) -> List[pthread]:
+        # Same as psutil, but the stat files of the threads are kept open between the samples
+        try:
+            tids = os.listdir(self._task_directory)
+        except (FileNotFoundError, ProcessLookupError):
+            raise NoSuchProcess(self.pid)
+        except PermissionError:
+            raise AccessDenied(self.pid)
+
+        thread_fds = self._thread_fds
+        kept_fds = {}
+        threads = []
+        for tid in tids:
+            fd = thread_fds.pop(tid, None)
+            try:
+                if fd is None:
+                    fd = os.open(f'{self._task_directory}/{tid}/stat', os.O_RDONLY)
+                size = os.preadv(fd, [self._buffer], 0)
+            except (FileNotFoundError, ProcessLookupError):
+                # The thread has exited since the listing
+                size = 0
+            if size == 0:
+                if fd is not None:
+                    os.close(fd)
+                continue
+
+            content = memoryview(self._buffer)[:size].tobytes()
+            fields = content[content.rindex(b')') + 2:].split()
+            threads.append(pthread(int(tid), int(fields[11]) / CLOCK_TICKS, int(fields[12]) / CLOCK_TICKS))
+            if len(kept_fds) < MAX_THREAD_FDS:
+                kept_fds[tid] = fd
+            else:
+                os.close(fd)
+
+        # The files of the exited threads are closed
+        for fd in thread_fds.values():
+            os.close(fd)
+        self._thread_fds = kept_fds
+        return threads
+
+    def smaps_rollup(self) -> Tuple[int, int, int]:
+        if self._smaps_rollup_fd is None:
+            memory = self._process.memory_full_info()
+            return int(memory.rss), int(memory.uss), int(memory.pss)
+
+        return parse_smaps_rollup(self._read(self._smaps_rollup_fd))
+
+    def num_fds(self) -> int:
+        try:
+            # Since Linux 6.2 the size of the fd directory is the number of open file descriptors
+            size = os.stat(self._fd_directory).st_size
+            if size > 0:
+                return size
+            with os.scandir(self._fd_directory) as entries:
+                return sum(1 for _ in entries)
+        except (FileNotFoundError, ProcessLookupError):
+            raise NoSuchProcess(self.pid)
+        except PermissionError:
+            raise AccessDenied(self.pid)
+
+    def close(self) -> None:
+        for fd in [*self._fds.values(), *self._thread_fds.values()]:
+            os.close(fd)
+        self._fds.clear()
+        self._thread_fds.clear()
+
+    def _open(self, name: str, optional: bool = False) -> Optional[int]:
+        try:
+            fd = os.open(f'/proc/{self.pid}/{name}', os.O_RDONLY)
+        except (FileNotFoundError, ProcessLookupError):
+            self.close()
+            raise NoSuchProcess(self.pid)
+        except PermissionError:
+            if optional:
+                return None
+            # e.g. procfs mounted with hidepid
+            self.close()
+            raise AccessDenied(self.pid)
+        self._fds[name] = fd
+        return fd
+
+    def _read(self, fd: int) -> bytes:
+        try:
+            size = os.preadv(fd, [self._buffer], 0)
+        except ProcessLookupError:
+            raise NoSuchProcess(self.pid)
+        if size == len(self._buffer):
+            # The file is bigger than the buffer, we grow it and read it again
+            self._buffer = bytearray(len(self._buffer) * 2)
+            return self._read(fd)
+        return memoryview(self._buffer)[:size].tobytes()
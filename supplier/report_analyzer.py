@@ -0,0 +1,224 @@
+import logging
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from model.leak_detector import MemoryLeakDetector
+from model.quantile_sketch import QuantileSketch
+from model.rollup import ROLLUP_RESOLUTIONS
+from model.running_statistics import MetricStatistics
+from model.trend_detector import TrendDetector, TrendResult
+from supplier.process_group import GROUP_TOTAL_PID
+from utils.common_utils import pretty_print_bytes, pretty_print_trend
+from utils.report_utils import load_npcol_columns
+
+ANALYZED_METRICS = ['cpu_percent', 'private_memory', 'handles_fds']
+REPORT_SUFFIXES = ['.csv', '.npcol']
+DEFAULT_CHUNK_ROWS = 1_000_000
+# Rollup reports, e.g. python3.11_20240210170000_1m.csv or its rotation python3.11_20240210170000_1m.1.csv
+ROLLUP_REPORT_PATTERN = re.compile(
+    rf'_({"|".join(ROLLUP_RESOLUTIONS)})(\.\d+)?({"|".join(re.escape(suffix) for suffix in REPORT_SUFFIXES)})$'
+)
+
+
+@dataclass
+class ReportAnalysis:
+    name: str
+    reports: int = 0
+    count: int = 0
+    start: Optional[np.datetime64] = None
+    end: Optional[np.datetime64] = None
+    statistics: Dict[str, MetricStatistics] = field(
+        default_factory=lambda: {metric: MetricStatistics() for metric in ANALYZED_METRICS})
+    sketches: Dict[str, QuantileSketch] = field(
+        default_factory=lambda: {metric: QuantileSketch() for metric in ANALYZED_METRICS})
+    # Memory trend of a single report, the order of the samples of several reports is unknown
+    leaking: Optional[bool] = None
+    slope: Optional[float] = None
+    confidence: Optional[float] = None
+    # Mann-Kendall and Theil-Sen trends of each metric, of a single report as well
+    trends: Optional[Dict[str, Optional[TrendResult]]] = None
+
+    def merge(self, other: 'ReportAnalysis') -> None:
+        self.reports += other.reports
+        self.count += other.count
+        starts = [start for start in [self.start, other.start] if start is not None]
+        ends = [end for end in [self.end, other.end] if end is not None]
+        self.start = min(starts) if starts else None
+        self.end = max(ends) if ends else None
+        for metric in ANALYZED_METRICS:
+            self.statistics[metric].merge(other.statistics[metric])
+            self.sketches[metric].merge(other.sketches[metric])
+
+    def summary(self) -> List[str]:
+        cpu = self.statistics['cpu_percent']
+        memory = self.statistics['private_memory']
+        handles_fds = self.statistics['handles_fds']
+        cpu_p50, cpu_p95, cpu_p99 = self.sketches['cpu_percent'].percentiles()
+        memory_p50, memory_p95, memory_p99 = self.sketches['private_memory'].percentiles()
+        handles_fds_p50, handles_fds_p95, handles_fds_p99 = self.sketches['handles_fds'].percentiles()
+
+        summary = [f'Summary of {self.count} samples in {self.reports} reports for {self.name} '
+                   f'from {self.start} to {self.end}']
+        if self.count == 0:
+            return summary
+        summary += [
+            f'CPU %:        avg {round(cpu.mean, 2)}, min {cpu.minimum}, max {cpu.maximum}, '
+            f'std {round(cpu.std, 2)}, p50 {round(cpu_p50, 2)}, p95 {round(cpu_p95, 2)}, p99 {round(cpu_p99, 2)}',
+            f'Memory:       avg {pretty_print_bytes(memory.mean)}, min {pretty_print_bytes(memory.minimum)}, '
+            f'max {pretty_print_bytes(memory.maximum)}, p50 {pretty_print_bytes(memory_p50)}, '
+            f'p95 {pretty_print_bytes(memory_p95)}, p99 {pretty_print_bytes(memory_p99)}',
+            f'Handle / FDS: avg {int(handles_fds.mean)}, min {int(handles_fds.minimum)}, '
+            f'max {int(handles_fds.maximum)}, p50 {round(handles_fds_p50)}, p95 {round(handles_fds_p95)}, '
+            f'p99 {round(handles_fds_p99)}',
+        ]
+        if self.leaking is not None:
+            summary.append(
+                f'Memory trend: {"+" if self.slope >= 0 else "-"}{pretty_print_bytes(abs(self.slope) * 3600)} '
+                f'per hour (confidence {round(self.confidence, 2)})'
+                f'{", WARNING, potential memory leak detected" if self.leaking else ""}'
+            )
+        if self.trends is not None:
+            summary.append(f'Trends:       '
+                           f'{", ".join(pretty_print_trend(metric, trend) for metric, trend in self.trends.items())}')
+        return summary
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'reports': self.reports,
+            'count': self.count,
+            'start': str(self.start) if self.start is not None else None,
+            'end': str(self.end) if self.end is not None else None,
+            'metrics': {
+                metric: {
+                    'mean': self.statistics[metric].mean if self.count else None,
+                    'min': self.statistics[metric].minimum if self.count else None,
+                    'max': self.statistics[metric].maximum if self.count else None,
+                    'std': self.statistics[metric].std if self.count > 1 else None,
+                    **{f'p{percentile}': value if self.count else None for percentile, value
+                       in zip([50, 95, 99], self.sketches[metric].percentiles())},
+                }
+                for metric in ANALYZED_METRICS
+            },
+            'leaking': self.leaking,
+            'slope': self.slope,
+            'confidence': self.confidence,
+            'trends': {metric: trend.to_dict() if trend is not None else None for metric, trend in self.trends.items()}
+            if self.trends is not None else None,
+        }
+
+
+def find_reports(paths: List[Path]) -> List[Path]:
+    # Directories are searched for the samples reports, the rollups and sidecar files are not samples
+    reports = []
+    for path in paths:
+        if not path.exists():
+            raise RuntimeError(f'Report {path} does not exist')
+        if path.is_dir() and path.suffix != '.npcol':
+            reports += sorted(report for report in path.iterdir()
+                              if report.suffix in REPORT_SUFFIXES
+                              and ROLLUP_REPORT_PATTERN.search(report.name) is None)
+        else:
+            reports.append(path)
+    return reports
+
+
+def read_chunks(path: Path, chunk_rows: int) -> Iterator[Dict[str, np.ndarray]]:
+    # Only a chunk of the report is in memory at once, npcol columns are memory mapped and sliced
+    names = ['timestamp', 'pid', *ANALYZED_METRICS]
+    if path.is_dir():
+        try:
+            columns = load_npcol_columns(path, names=names)
+        except (OSError, ValueError, KeyError) as error:
+            raise RuntimeError(f'Report {path} cannot be read: {error}')
+        rows = len(columns['timestamp']) if 'timestamp' in columns else 0
+        for start in range(0, rows, chunk_rows):
+            yield {name: values[start:start + chunk_rows] for name, values in columns.items()}
+        return
+
+    try:
+        with pd.read_csv(path, usecols=lambda name: name in names, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                columns = {name: chunk[name].to_numpy() for name in chunk.columns}
+                columns['timestamp'] = pd.to_datetime(chunk['timestamp'], format='ISO8601') \
+                    .to_numpy(dtype='datetime64[us]')
+                yield columns
+    except (OSError, ValueError, pd.errors.ParserError) as error:
+        raise RuntimeError(f'Report {path} cannot be read: {error}')
+
+
+def analyze_report(path: Path, chunk_rows: int = DEFAULT_CHUNK_ROWS, leak_tolerance: float = 1.0) -> ReportAnalysis:
+    analysis = ReportAnalysis(name=path.name, reports=1)
+    leak_detector = MemoryLeakDetector(tolerance=leak_tolerance / 100)
+    trend_detector = TrendDetector(metrics=ANALYZED_METRICS)
+    is_group = None
+
+    for columns in read_chunks(path, chunk_rows):
+        missing = set(ANALYZED_METRICS + ['timestamp']) - set(columns)
+        if missing:
+            raise RuntimeError(f'Report {path} is not a samples report, columns {sorted(missing)} are missing')
+
+        # Group reports are analyzed on the total of the processes, as during the monitoring
+        if is_group is None and len(columns['timestamp']) > 0:
+            is_group = 'pid' in columns and bool((columns['pid'] == GROUP_TOTAL_PID).any())
+        selected = ~np.isnan(columns['cpu_percent'].astype(np.float64))  # Gap markers of the exited processes
+        if is_group:
+            selected &= columns['pid'] == GROUP_TOTAL_PID
+        if not selected.any():
+            continue
+
+        timestamps = columns['timestamp'][selected]
+        analysis.count += len(timestamps)
+        analysis.start = timestamps[0] if analysis.start is None else analysis.start
+        analysis.end = timestamps[-1]
+        elapsed = timestamps.astype('datetime64[us]').astype(np.int64) / 1e6
+        values = {metric: columns[metric][selected].astype(np.float64) for metric in ANALYZED_METRICS}
+        for metric in ANALYZED_METRICS:
+            analysis.statistics[metric].update_batch(values[metric])
+            analysis.sketches[metric].update_batch(values[metric])
+        leak_detector.update_many(columns['private_memory'][selected], elapsed=elapsed)
+        trend_detector.update_batch(elapsed, values)
+
+    analysis.leaking = leak_detector.is_leaking
+    analysis.slope = leak_detector.slope
+    analysis.confidence = leak_detector.confidence
+    analysis.trends = trend_detector.evaluate()
+    return analysis
+
+
+def analyze_reports(paths: List[Path], workers: int = 1, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                    leak_tolerance: float = 1.0) -> List[ReportAnalysis]:
+    # The reports are analyzed in parallel processes, the chunks of a report are read sequentially
+    # A report which cannot be analyzed is skipped, the other ones are still analyzed
+    analyses = []
+    if workers == 1 or len(paths) == 1:
+        for path in paths:
+            try:
+                analyses.append(analyze_report(path, chunk_rows, leak_tolerance))
+            except RuntimeError as error:
+                logging.error(f'Report {path} has been skipped: {error}')
+        return analyses
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        futures = [executor.submit(analyze_report, path, chunk_rows, leak_tolerance) for path in paths]
+        for path, future in zip(paths, futures):
+            try:
+                analyses.append(future.result())
+            except RuntimeError as error:
+                logging.error(f'Report {path} has been skipped: {error}')
+                continue
+            logging.info(f'Report {path} has been analyzed')
+    return analyses
+
+
+def merge_analyses(name: str, analyses: List[ReportAnalysis]) -> ReportAnalysis:
+    total = ReportAnalysis(name=name)
+    for analysis in analyses:
+        total.merge(analysis)
+    return total
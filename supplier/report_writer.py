@@ -0,0 +1,227 @@
+import csv
+import io
+import json
+import logging
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from model.sample_buffer import SampleBuffer
+
+
+class ReportWriter(ABC):
+    # Batching and rotation of a report, the formats implement how the samples are written
+
+    def __init__(self, path: Path, columns: List[str], flush_rows: int = 1000, flush_interval: float = 10.0,
+                 rotate_bytes: Optional[int] = None, rotate_interval: Optional[float] = None,
+                 max_rotations: Optional[int] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self._path = path
+        self._columns = columns
+        self._flush_rows = flush_rows
+        self._flush_interval = flush_interval
+        self._rotate_bytes = rotate_bytes
+        self._rotate_interval = rotate_interval
+        # Number of rotated reports kept, the older ones are deleted
+        self._max_rotations = max_rotations
+        self._clock = clock
+        self._last_flush = clock()
+        self._last_rotation = self._last_flush
+        self._rotations = 0
+        self.rows = 0
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def write_pending(self, samples: SampleBuffer) -> None:
+        # Samples are written by batches, so the report survives a crash without writing on every sample
+        if len(samples) >= self._flush_rows or self._clock() - self._last_flush >= self._flush_interval:
+            self.flush(samples)
+
+    def flush(self, samples: SampleBuffer) -> None:
+        self._last_flush = self._clock()
+        if len(samples) == 0:
+            return
+
+        if self._should_rotate():
+            self._rotate()
+
+        self._write(samples)
+        self.rows += len(samples)
+        samples.clear()
+
+    @abstractmethod
+    def close(self) -> None:
+        # Writes what is still needed for a complete report, e.g. the header of an empty one
+        ...
+
+    @abstractmethod
+    def _size(self) -> int:
+        # Size of the current report on the disk, for the rotation
+        ...
+
+    @abstractmethod
+    def _write(self, samples: SampleBuffer) -> None:
+        # Appends the whole batch to the current report
+        ...
+
+    @abstractmethod
+    def _close_file(self) -> None:
+        # Releases the current report before it is rotated or at the end
+        ...
+
+    def _rotated_path(self, index: int) -> Path:
+        return self._path.with_name(f'{self._path.stem}.{index}{self._path.suffix}')
+
+    def _should_rotate(self) -> bool:
+        if self._rotate_interval is not None and self._clock() - self._last_rotation >= self._rotate_interval:
+            return self._path.exists()
+        return self._rotate_bytes is not None and self._size() >= self._rotate_bytes
+
+    def _rotate(self) -> None:
+        self._rotations += 1
+        self._last_rotation = self._clock()
+        rotated_path = self._rotated_path(self._rotations)
+        logging.info(f'Rotate report {self._path} to {rotated_path}')
+        self._close_file()
+        # The rename is atomic, the report is always either complete or in the rotated file
+        os.replace(self._path, rotated_path)
+
+        if self._max_rotations is not None and self._rotations > self._max_rotations:
+            expired_path = self._rotated_path(self._rotations - self._max_rotations)
+            logging.info(f'Delete expired report {expired_path}')
+            if expired_path.is_dir():
+                shutil.rmtree(expired_path)
+            else:
+                expired_path.unlink(missing_ok=True)
+
+
+class CsvReportWriter(ReportWriter):
+
+    def __init__(self, path: Path, columns: List[str], **kwargs) -> None:
+        super().__init__(path, columns, **kwargs)
+        self._file = None
+
+    def close(self) -> None:
+        # The report is created even without any sample
+        self._open()
+        self._close_file()
+
+    def _open(self) -> io.TextIOWrapper:
+        if self._file is None:
+            is_new = not self._path.exists() or self._path.stat().st_size == 0
+            self._file = open(self._path, 'a', newline='')
+            if is_new:
+                csv.writer(self._file).writerow(self._columns)
+                self._file.flush()
+        return self._file
+
+    def _size(self) -> int:
+        return self._path.stat().st_size if self._path.exists() else 0
+
+    def _write(self, samples: SampleBuffer) -> None:
+        columns = []
+        for name in self._columns:
+            values = samples.column(name)
+            if values.dtype.kind == 'f' and np.isnan(values).any():
+                # Missing values are written as empty fields, as pandas does
+                values = np.where(np.isnan(values), None, values)
+            columns.append(values.tolist())
+
+        content = io.StringIO()
+        csv.writer(content).writerows(zip(*columns))
+
+        # The whole batch is written at once and flushed to the system
+        report_file = self._open()
+        report_file.write(content.getvalue())
+        report_file.flush()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class NpcolReportWriter(ReportWriter):
+    # Binary columnar report: a directory with one raw little-endian file per column and a schema.json,
+    # see README. Object columns are stored as uint8 codes of the categories listed in the schema.
+
+    def __init__(self, path: Path, columns: List[str], dtypes: Dict[str, str], **kwargs) -> None:
+        super().__init__(path, columns, **kwargs)
+        self._dtypes = {name: np.dtype(dtypes[name]) for name in columns}
+        self._files = {}
+        self._categories: Dict[str, List[str]] = {
+            name: [] for name, dtype in self._dtypes.items() if dtype.kind == 'O'
+        }
+        self._file_rows = 0
+
+    def close(self) -> None:
+        self._open()
+        self._close_file()
+
+    def _open(self) -> dict:
+        if not self._files:
+            self._path.mkdir(exist_ok=True)
+            self._write_schema()
+            self._files = {name: open(self._path.joinpath(f'{name}.bin'), 'ab') for name in self._columns}
+        return self._files
+
+    def _size(self) -> int:
+        return sum(path.stat().st_size for path in self._path.iterdir()) if self._path.exists() else 0
+
+    def _write(self, samples: SampleBuffer) -> None:
+        files = self._open()
+        for name in self._columns:
+            files[name].write(self._encode(name, samples.column(name)).tobytes())
+            files[name].flush()
+
+        # The schema is updated once the columns are written, the loader ignores the rows not listed in it
+        self._file_rows += len(samples)
+        self._write_schema()
+
+    def _encode(self, name: str, values: np.ndarray) -> np.ndarray:
+        dtype = self._dtypes[name]
+        if dtype.kind == 'O':
+            categories = self._categories[name]
+            codes = np.empty(len(values), dtype='<u1')
+            for index, value in enumerate(values):
+                value = '' if value is None else str(value)
+                if value not in categories:
+                    if len(categories) == 256:
+                        raise RuntimeError(f'Column {name} has too many distinct values to be stored as categories')
+                    categories.append(value)
+                codes[index] = categories.index(value)
+            return codes
+        if dtype.kind == 'M':
+            return values.astype('datetime64[us]').view('<i8')
+        return values.astype(dtype.newbyteorder('<'))
+
+    def _write_schema(self) -> None:
+        schema = {
+            'version': 1,
+            'rows': self._file_rows,
+            'columns': [
+                {
+                    'name': name,
+                    'dtype': 'category' if dtype.kind == 'O' else 'datetime64[us]' if dtype.kind == 'M'
+                    else dtype.newbyteorder('<').str,
+                    **({'categories': self._categories[name]} if dtype.kind == 'O' else {})
+                }
+                for name, dtype in self._dtypes.items()
+            ]
+        }
+        schema_path = self._path.joinpath('schema.json')
+        temporary_path = schema_path.with_suffix('.tmp')
+        temporary_path.write_text(json.dumps(schema))
+        os.replace(temporary_path, schema_path)
+
+    def _close_file(self) -> None:
+        for column_file in self._files.values():
+            column_file.close()
+        self._files = {}
+        self._file_rows = 0
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Awaitable, Callable, Iterator, List, Optional
+
+from model.configuration import OVERRUN_POLICIES
+from supplier.exit_watcher import ExitWatcher
+
+
+class SamplingScheduler:
+
+    def __init__(self, interval: float, duration: Optional[float], overrun_policy: str = 'skip',
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep,
+                 exit_watcher: Optional[ExitWatcher] = None,
+                 next_interval: Optional[Callable[[], float]] = None) -> None:
+        if overrun_policy not in OVERRUN_POLICIES:
+            raise RuntimeError(f'Unknown overrun policy {overrun_policy}, expected skip or catch-up.')
+
+        self._interval = interval
+        self._duration = duration
+        self._overrun_policy = overrun_policy
+        self._clock = clock
+        self._sleep = sleep
+        # Wakes the scheduler up as soon as a target exits, instead of at the next deadline
+        self._exit_watcher = exit_watcher
+        # Adaptive sampling: interval until the next deadline, asked once the job of the previous one is done
+        self._next_interval = next_interval
+        self.skipped = 0
+
+    def run(self, job: Callable[[float], None], on_exit: Optional[Callable[[List[int]], None]] = None) -> None:
+        for deadline in self._deadlines():
+            now = self._clock()
+            while now < deadline:
+                exited = self._wait(deadline - now)
+                if exited and on_exit is not None:
+                    # The exited targets are handled right away without being sampled, they are zombies
+                    # reporting zeros until reaped. The deadline is still kept for the others.
+                    on_exit(exited)
+                now = self._clock()
+                if not exited:
+                    break
+
+            job(now - deadline)
+
+    async def run_async(self, job: Callable[[float], Awaitable[None]],
+                        on_exit: Optional[Callable[[List[int]], Awaitable[None]]] = None) -> None:
+        for deadline in self._deadlines():
+            now = self._clock()
+            while now < deadline:
+                exited = await self._wait_async(deadline - now)
+                if exited and on_exit is not None:
+                    await on_exit(exited)
+                now = self._clock()
+                if not exited:
+                    break
+
+            await job(now - deadline)
+
+    def _wait(self, delay: float) -> List[int]:
+        if self._exit_watcher is not None:
+            return self._exit_watcher.wait(delay)
+        self._sleep(delay)
+        return []
+
+    async def _wait_async(self, delay: float) -> List[int]:
+        if self._exit_watcher is not None:
+            return await self._exit_watcher.wait_async(delay)
+        await asyncio.sleep(delay)
+        return []
+
+    def _deadlines(self) -> Iterator[float]:
+        start = self._clock()
+        end = start + self._duration if self._duration is not None else math.inf
+        if self._next_interval is not None:
+            yield from self._adaptive_deadlines(start, end)
+            return
+
+        # Deadlines are absolute, computed from the start, so the delays do not add up over time
+        index = 1
+
+        while start + index * self._interval <= end:
+            yield start + index * self._interval
+            # Resumed once the job of the previous deadline is done
+            index = self._next_index(start, index + 1)
+
+    def _adaptive_deadlines(self, start: float, end: float) -> Iterator[float]:
+        # Each deadline is computed from the previous one, not from the end of the job, so there is still no drift
+        deadline = start + self._interval
+        while deadline <= end:
+            yield deadline
+            interval = self._next_interval()
+            deadline += interval
+            now = self._clock()
+            if now > deadline and self._overrun_policy == 'skip':
+                missed = math.ceil((now - deadline) / interval)
+                self.skipped += missed
+                logging.warning(f'Sampling overrun, {missed} sample(s) skipped')
+                deadline += missed * interval
+
+    def _next_index(self, start: float, index: int) -> int:
+        now = self._clock()
+        if now <= start + index * self._interval or self._overrun_policy == 'catch-up':
+            # With catch-up, late samples are taken immediately one after the other
+            return index
+
+        # The collection took longer than the interval, the missed deadlines are skipped
+        missed = math.ceil((now - start) / self._interval) - index
+        self.skipped += missed
+        logging.warning(f'Sampling overrun, {missed} sample(s) skipped')
+        return index + missed
@@ -0,0 +1,126 @@
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import psutil
+
+from model.running_statistics import MetricStatistics
+
+STAGES = ['collect', 'aggregate', 'leak', 'render', 'persist']
+
+
+def _milliseconds(value: float) -> float:
+    # NaN is not valid JSON
+    return None if math.isnan(value) else round(value * 1000, 3)
+
+
+class SelfInstrumentation:
+    # Measures the monitoring itself: duration of each stage, lateness of the samples, CPU and memory used.
+    # The stages are timed by wrapping the functions once, so nothing is added to the sampling path when disabled.
+
+    def __init__(self) -> None:
+        self._stages = {stage: MetricStatistics() for stage in STAGES}
+        self._lateness = MetricStatistics()
+        # The render stage is timed from the console and metrics threads while the sampler times the others
+        self._lock = threading.Lock()
+        self._process = psutil.Process(os.getpid())
+        self._start = time.monotonic()
+        self._start_cpu = time.process_time()
+        self._rss = 0
+        self._peak_rss = 0
+
+    def __getitem__(self, stage: str) -> MetricStatistics:
+        return self._stages[stage]
+
+    @property
+    def lateness(self) -> MetricStatistics:
+        return self._lateness
+
+    def wrap(self, stage: str, function: Callable) -> Callable:
+        statistics = self._stages[stage]
+        perf_counter = time.perf_counter
+        lock = self._lock
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                with lock:
+                    statistics.update(elapsed)
+
+        return timed
+
+    def wrap_persist(self, function: Callable) -> Callable:
+        # The memory of the monitor is measured along with the reports writes, not on every sample
+        timed = self.wrap('persist', function)
+
+        def persist(*args, **kwargs):
+            try:
+                return timed(*args, **kwargs)
+            finally:
+                self.sample_resources()
+
+        return persist
+
+    def wrap_scheduled(self, function: Callable[[float], None]) -> Callable[[float], None]:
+        lateness = self._lateness
+        lock = self._lock
+
+        def scheduled(delay: float) -> None:
+            with lock:
+                lateness.update(delay)
+            function(delay)
+
+        return scheduled
+
+    def sample_resources(self) -> None:
+        self._rss = self._process.memory_info().rss
+        self._peak_rss = max(self._peak_rss, self._rss)
+
+    def summary(self) -> dict:
+        self.sample_resources()
+        with self._lock:
+            return self._summary()
+
+    def _summary(self) -> dict:
+        elapsed = time.monotonic() - self._start
+        cpu_time = time.process_time() - self._start_cpu
+        busy = sum(statistics.mean * statistics.count for statistics in self._stages.values())
+
+        return {
+            'duration_s': round(elapsed, 6),
+            'stages': {
+                stage: {
+                    'count': statistics.count,
+                    'mean_ms': _milliseconds(statistics.mean) if statistics.count else None,
+                    'max_ms': _milliseconds(statistics.maximum),
+                    'std_ms': _milliseconds(statistics.std),
+                    'total_s': round(statistics.mean * statistics.count, 6),
+                }
+                for stage, statistics in self._stages.items()
+            },
+            'lateness': {
+                'count': self._lateness.count,
+                'mean_ms': _milliseconds(self._lateness.mean) if self._lateness.count else None,
+                'max_ms': _milliseconds(self._lateness.maximum),
+                'std_ms': _milliseconds(self._lateness.std),
+            },
+            # The stages time relative to the monitoring duration
+            'busy_percent': round(busy / elapsed * 100, 4) if elapsed else None,
+            # CPU and memory of the whole application, shared by all its targets
+            'cpu_time_s': round(cpu_time, 6),
+            'cpu_percent': round(cpu_time / elapsed * 100, 4) if elapsed else None,
+            'rss_bytes': self._rss,
+            'peak_rss_bytes': self._peak_rss,
+        }
+
+    def write(self, path: Path) -> Dict:
+        summary = self.summary()
+        path.write_text(json.dumps(summary, indent=2))
+        return summary
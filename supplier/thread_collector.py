@@ -0,0 +1,85 @@
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+import psutil
+
+# Thread id of a rank without thread, e.g. on the first sample of a process, its CPU usage is empty
+MISSING_TID = -1
+
+
+def thread_columns(top: int) -> Dict[str, str]:
+    # Thread id and CPU usage of the busiest threads of a sample, ranked from 1
+    columns = {}
+    for rank in range(1, top + 1):
+        columns[f'thread_{rank}_tid'] = 'int64'
+        columns[f'thread_{rank}_cpu_percent'] = 'float64'
+    return columns
+
+
+class ThreadCollector:
+    # Per thread CPU usage, from the CPU times of the threads diffed between two samples.
+    # The state of a process is a pair of arrays sorted by thread id, replaced on each sample,
+    # so the threads which have exited are evicted and the diff is vectorized whatever the number of threads.
+
+    def __init__(self, top: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self._top = top
+        self._clock = clock
+        # Per pid: time of the last sample, thread ids and their CPU times
+        self._states: Dict[int, Tuple[float, np.ndarray, np.ndarray]] = {}
+        # Per pid: busiest threads of the last sample
+        self._latest: Dict[int, List[Tuple[int, float]]] = {}
+
+    def collect(self, process: psutil.Process) -> List[Tuple[int, float]]:
+        threads = process.threads()
+        now = self._clock()
+        count = len(threads)
+        tids = np.fromiter((thread.id for thread in threads), dtype=np.int64, count=count)
+        cpu_times = np.fromiter((thread.user_time + thread.system_time for thread in threads), dtype=np.float64,
+                                count=count)
+        order = np.argsort(tids)
+        tids, cpu_times = tids[order], cpu_times[order]
+
+        previous = self._states.get(process.pid)
+        self._states[process.pid] = (now, tids, cpu_times)
+        if previous is None or now <= previous[0] or count == 0:
+            # As for cpu_percent, the first sample has no reference
+            self._latest[process.pid] = []
+            return []
+
+        last_time, last_tids, last_cpu_times = previous
+        if len(last_tids):
+            positions = np.minimum(np.searchsorted(last_tids, tids), len(last_tids) - 1)
+            known = last_tids[positions] == tids
+            # A thread started since the last sample has used all its CPU time in the interval
+            deltas = np.where(known, cpu_times - last_cpu_times[positions], cpu_times)
+        else:
+            deltas = cpu_times
+        percents = np.maximum(deltas, 0.0) / (now - last_time) * 100
+
+        top = min(self._top, count)
+        indexes = np.argpartition(-percents, top - 1)[:top]
+        indexes = indexes[np.argsort(-percents[indexes], kind='stable')]
+        busiest = [(int(tids[index]), round(float(percents[index]), 2)) for index in indexes]
+        self._latest[process.pid] = busiest
+        return busiest
+
+    def busiest(self, pids: Iterable[int]) -> List[Tuple[int, float]]:
+        # Busiest threads of several processes, e.g. for the total of a group
+        threads = [thread for pid in pids for thread in self._latest.get(pid, [])]
+        return sorted(threads, key=lambda thread: thread[1], reverse=True)[:self._top]
+
+    def to_columns(self, threads: List[Tuple[int, float]]) -> dict:
+        columns = {}
+        for rank in range(1, self._top + 1):
+            tid, cpu_percent = threads[rank - 1] if rank <= len(threads) else (MISSING_TID, math.nan)
+            columns[f'thread_{rank}_tid'] = tid
+            columns[f'thread_{rank}_cpu_percent'] = cpu_percent
+        return columns
+
+    def retain(self, pids: Iterable[int]) -> None:
+        pids = set(pids)
+        for pid in [pid for pid in self._states if pid not in pids]:
+            del self._states[pid]
+            self._latest.pop(pid, None)
@@ -0,0 +1,77 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from benchmarks.compare import compare, load_results
+from benchmarks.run_benchmarks import bench_history, bench_persist, bench_process_metrics, bench_startup, bench_trends, \
+    latency
+
+
+class TestRunBenchmarks(unittest.TestCase):
+
+    def test_latency(self) -> None:
+        metrics = latency([index / 1e6 for index in range(1, 101)])
+
+        self.assertEqual(100, metrics['count'])
+        self.assertAlmostEqual(50.5, metrics['mean_us'])
+        self.assertAlmostEqual(95, metrics['p95_us'])
+        self.assertAlmostEqual(100, metrics['max_us'])
+
+    def test_bench_process_metrics_with_mocked_process(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            results = bench_process_metrics(Path(directory), samples=20)
+
+        self.assertEqual(1, len(results))
+        self.assertEqual({'process': 'mocked', 'backend': 'psutil', 'memory_tier': 'full'}, results[0]['parameters'])
+        self.assertEqual(20, results[0]['metrics']['count'])
+
+    def test_bench_history(self) -> None:
+        results = bench_history([100], operations=10)
+
+        self.assertEqual([None, 1000], [result['parameters']['leak_window'] for result in results])
+
+    def test_bench_trends(self) -> None:
+        results = bench_trends([100, 2000], operations=2)
+
+        self.assertEqual([100, 2000], [result['parameters']['size'] for result in results])
+        self.assertTrue(all(result['metrics']['evaluate_median_ms'] > 0 for result in results))
+
+    def test_bench_startup(self) -> None:
+        results = bench_startup(runs=1)
+
+        metrics = {result['parameters']['imports']: result['metrics'] for result in results}
+        self.assertEqual(0, metrics['monitoring']['pandas_loaded'])
+        self.assertEqual(1, metrics['monitoring_with_pandas']['pandas_loaded'])
+        self.assertLess(metrics['monitoring']['rss_bytes'], metrics['monitoring_with_pandas']['rss_bytes'])
+
+    def test_bench_persist(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            results = bench_persist(Path(directory), [100])
+
+        self.assertEqual(['csv', 'npcol'], [result['parameters']['report_format'] for result in results])
+        self.assertTrue(all(result['metrics']['report_bytes'] > 0 for result in results))
+
+
+class TestCompare(unittest.TestCase):
+
+    def test_compare(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath('results.json')
+            path.write_text(json.dumps({'results': [
+                {'name': 'persist', 'parameters': {'rows': 10}, 'metrics': {'duration_s': 2.0}},
+                {'name': 'memory', 'parameters': {'samples': 10}, 'metrics': {'rss_bytes': 100}},
+            ]}))
+            baseline = load_results(path)
+
+        current = {('persist', '{"rows": 10}'): {'duration_s': 1.5}, ('persist', '{"rows": 20}'): {'duration_s': 3}}
+
+        self.assertEqual([('persist', '{"rows": 10}', 'duration_s', 2.0, 1.5, -25.0)], compare(baseline, current))
+
+    def test_load_invalid_results(self) -> None:
+        with self.assertRaises(RuntimeError):
+            load_results(Path('missing.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import math
+import unittest
+
+from model.adaptive_interval import AdaptiveInterval
+
+
+class TestAdaptiveInterval(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._interval = AdaptiveInterval(initial=1.0, minimum=0.25, maximum=4.0)
+
+    def test_first_sample_keeps_interval(self) -> None:
+        self.assertEqual(1.0, self._interval.update(cpu_percent=50.0, private_memory=1000))
+
+    def test_relaxes_when_stable(self) -> None:
+        intervals = [self._interval.update(cpu_percent=5.0, private_memory=1000) for _ in range(12)]
+
+        self.assertEqual([1.0, 1.25, 1.5625], intervals[:3])
+        self.assertEqual(4.0, intervals[-1])
+        self.assertEqual(0, self._interval.shrinks)
+
+    def test_shrinks_on_cpu_change(self) -> None:
+        self._interval.update(cpu_percent=5.0, private_memory=1000)
+
+        self.assertEqual(0.5, self._interval.update(cpu_percent=50.0, private_memory=1000))
+        self.assertEqual(0.25, self._interval.update(cpu_percent=5.0, private_memory=1000))
+        self.assertEqual(0.25, self._interval.update(cpu_percent=80.0, private_memory=1000))
+        self.assertEqual(2, self._interval.shrinks)
+
+    def test_shrinks_on_memory_change(self) -> None:
+        self._interval.update(cpu_percent=5.0, private_memory=1000)
+
+        self.assertEqual(1.25, self._interval.update(cpu_percent=5.0, private_memory=1040))
+        self.assertEqual(0.625, self._interval.update(cpu_percent=5.0, private_memory=1200))
+
+    def test_anomaly_goes_to_minimum(self) -> None:
+        self._interval.update(cpu_percent=5.0, private_memory=1000)
+
+        self.assertEqual(0.25, self._interval.update(cpu_percent=5.0, private_memory=1000, anomaly=True))
+        self.assertEqual(1, self._interval.shrinks)
+
+    def test_nan_cpu_is_not_volatile(self) -> None:
+        self._interval.update(cpu_percent=math.nan, private_memory=1000)
+
+        self.assertEqual(1.25, self._interval.update(cpu_percent=90.0, private_memory=1000))
+
+    def test_invalid_bounds(self) -> None:
+        with self.assertRaises(RuntimeError):
+            AdaptiveInterval(initial=1.0, minimum=2.0, maximum=4.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -55,6 +55,313 @@ class TestConfiguration(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             configuration.validate()
     
+    def test_validate_with_too_small_sampling(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=3,
+            sampling=0.005,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True)
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+    def test_validate_with_unknown_overrun_policy(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=3,
+            sampling=0.5,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True),
+            overrun_policy='wait'
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+    def test_validate_with_too_small_leak_window(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=60,
+            sampling=2,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True),
+            leak_window=10
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+    def test_validate_with_invalid_leak_tolerance(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=60,
+            sampling=2,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True),
+            leak_tolerance=100
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+    def test_validate_with_unknown_target_mode(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=60,
+            sampling=2,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True),
+            target_mode='some'
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+    def test_validate_daemon_without_duration(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=None,
+            sampling=5,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True),
+            daemon=True
+        )
+
+        configuration.validate()
+        self.assertIsNone(configuration.monitoring_duration)
+
+        configuration.raw_retention = 1
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+    def test_validate_without_duration(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=None,
+            sampling=5,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True)
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+    def test_validate_with_invalid_match(self) -> None:
+        configuration = Configuration(
+            process_name='python(',
+            duration=3,
+            sampling=1,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True),
+            match='regex'
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+        configuration.match = 'pid'
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+        configuration.match = 'user'
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+        configuration.process_name = '1234'
+        configuration.match = 'pid'
+        configuration.reattach = True
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+    def test_validate_with_invalid_console(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=3,
+            sampling=1,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True),
+            console='curses'
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+        configuration.console = 'live'
+        configuration.refresh_interval = 0
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+    def test_validate_with_invalid_metrics_port(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=3,
+            sampling=1,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True),
+            metrics_port=70000
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+    def test_validate_with_negative_top_threads(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=3,
+            sampling=1,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True),
+            top_threads=-1
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+    def test_validate_with_unknown_collector(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=3,
+            sampling=1,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True),
+            collectors=['io', 'gpu']
+        )
+
+        with self.assertRaisesRegex(RuntimeError, 'Unknown metrics gpu'):
+            configuration.validate()
+
+    def test_validate_with_invalid_adaptive_sampling(self) -> None:
+        for min_sampling, max_sampling in [(0.001, None), (2, None), (None, 0.5)]:
+            configuration = Configuration(
+                process_name='pycharm',
+                duration=3,
+                sampling=1,
+                reports_directory=self.mock_report_path(True, True),
+                logs_directory=self.mock_logs_path(True, True),
+                adaptive_sampling=True,
+                min_sampling=min_sampling,
+                max_sampling=max_sampling
+            )
+
+            with self.assertRaises(RuntimeError):
+                configuration.validate()
+
+    def test_validate_with_negative_group_refresh(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=60,
+            sampling=1,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True),
+            target_mode='all',
+            group_refresh=-1
+        )
+
+        with self.assertRaisesRegex(RuntimeError, 'The group refresh interval should be 0 second or more.'):
+            configuration.validate()
+
+    def test_validate_with_short_trend_window(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=60,
+            sampling=1,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True),
+            trend_detection=True,
+            trend_window=5
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+    def test_sampling_bounds(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=3600,
+            sampling=2,
+            reports_directory=None,
+            logs_directory=None
+        )
+
+        self.assertEqual((0.5, 8), configuration.sampling_bounds)
+        configuration.sampling = 0.02
+        configuration.max_sampling = 1.0
+        self.assertEqual((0.01, 1.0), configuration.sampling_bounds)
+
+    def test_leak_window_samples(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=3600,
+            sampling=4,
+            reports_directory=None,
+            logs_directory=None,
+            leak_window=600
+        )
+
+        self.assertEqual(150, configuration.leak_window_samples)
+        self.assertIsNone(configuration.leak_window_duration)
+
+    def test_leak_window_with_adaptive_sampling(self) -> None:
+        configuration = Configuration(
+            process_name='pycharm',
+            duration=3600,
+            sampling=4,
+            reports_directory=None,
+            logs_directory=None,
+            leak_window=600,
+            adaptive_sampling=True
+        )
+
+        self.assertEqual(600, configuration.leak_window_samples)
+        self.assertEqual(600, configuration.leak_window_duration)
+
+    def test_validate_with_targets(self) -> None:
+        reports_path = self.mock_report_path(True, True)
+        logs_path = self.mock_logs_path(True, True)
+        target = Configuration(
+            process_name='pycharm',
+            duration=3,
+            sampling=1,
+            reports_directory=reports_path,
+            logs_directory=logs_path
+        )
+        configuration = Configuration(
+            process_name='targets',
+            duration=None,
+            sampling=5,
+            reports_directory=reports_path,
+            logs_directory=logs_path,
+            targets=[target, Configuration(**{**target.__dict__, 'process_name': 'chrome', 'sampling': 4})]
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
+        configuration.targets[1].sampling = 2
+        configuration.validate()
+
+    def test_validate_with_duplicated_targets(self) -> None:
+        target = Configuration(
+            process_name='pycharm',
+            duration=3,
+            sampling=1,
+            reports_directory=self.mock_report_path(True, True),
+            logs_directory=self.mock_logs_path(True, True)
+        )
+        configuration = Configuration(
+            process_name='targets',
+            duration=None,
+            sampling=5,
+            reports_directory=None,
+            logs_directory=self.mock_logs_path(True, True),
+            targets=[target, target]
+        )
+
+        with self.assertRaises(RuntimeError):
+            configuration.validate()
+
     def test_validate_with_invalid_logs_directory(self) -> None:
         reports_path = self.mock_report_path(True, True)
         logs_path = self.mock_logs_path(False, False)
@@ -126,4 +433,17 @@ class TestConfiguration(unittest.TestCase):
             reference_datetime=datetime(2024, 2, 9, 16, 0)
         )
 
-        self.assertEqual(Path('dir/subfolder/pycharm_20240209160000.csv'), configuration.csv_report_path)
\ No newline at end of file
+        self.assertEqual(Path('dir/subfolder/pycharm_20240209160000.csv'), configuration.csv_report_path)
+
+    def test_report_path_with_pidfile(self) -> None:
+        configuration = Configuration(
+            process_name='/run/nginx.pid',
+            duration=None,
+            sampling=None,
+            reports_directory=Path('dir'),
+            logs_directory=None,
+            reference_datetime=datetime(2024, 2, 9, 16, 0),
+            match='pidfile'
+        )
+
+        self.assertEqual(Path('dir/run_nginx.pid_20240209160000.csv'), configuration.csv_report_path)
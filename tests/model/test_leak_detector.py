@@ -0,0 +1,121 @@
+import unittest
+
+import numpy as np
+
+from model.leak_detector import MemoryLeakDetector
+
+
+class TestMemoryLeakDetector(unittest.TestCase):
+
+    def feed(self, detector: MemoryLeakDetector, values: list) -> MemoryLeakDetector:
+        for value in values:
+            detector.update(value)
+        return detector
+
+    def test_without_samples(self) -> None:
+        detector = MemoryLeakDetector()
+
+        self.assertFalse(detector.is_leaking)
+        self.assertEqual(0, detector.distinct_count)
+        self.assertEqual(0.0, detector.slope)
+        self.assertEqual(0.0, detector.confidence)
+
+    def test_increase_trend(self) -> None:
+        detector = self.feed(MemoryLeakDetector(), [1000, 2000, 2000, 2000, 3000, 4000, 5000, 6000, 7000, 8000, 9000, 9000])
+
+        self.assertTrue(detector.is_leaking)
+        self.assertEqual(12, detector.run_length)
+        self.assertEqual(9, detector.distinct_count)
+
+    def test_dip_resets_run(self) -> None:
+        detector = self.feed(MemoryLeakDetector(), [1000, 2000, 3000, 2990, 4000])
+
+        self.assertEqual(2, detector.run_length)
+        self.assertEqual(2, detector.distinct_count)
+
+    def test_dip_within_tolerance(self) -> None:
+        detector = self.feed(MemoryLeakDetector(tolerance=0.01), [1000, 2000, 3000, 2990, 4000])
+
+        self.assertEqual(5, detector.run_length)
+        self.assertEqual(4, detector.distinct_count)
+
+    def test_window_ignores_older_samples(self) -> None:
+        values = [5000, 4000, 3000, 2000, 1000] + list(range(1000, 11000, 1000))
+        full_detector = self.feed(MemoryLeakDetector(), values)
+        window_detector = self.feed(MemoryLeakDetector(window=10), values)
+
+        self.assertFalse(full_detector.is_leaking)
+        self.assertTrue(window_detector.is_leaking)
+        self.assertEqual(10, window_detector.sample_count)
+        self.assertEqual(10, window_detector.distinct_count)
+        self.assertAlmostEqual(1000.0, window_detector.slope)
+        self.assertAlmostEqual(1.0, window_detector.confidence)
+
+    def test_window_with_constant_values(self) -> None:
+        detector = self.feed(MemoryLeakDetector(window=10), list(range(1000, 6000, 1000)) + [6000] * 10)
+
+        self.assertFalse(detector.is_leaking)
+        self.assertEqual(1, detector.distinct_count)
+        self.assertAlmostEqual(0.0, detector.slope)
+
+    def test_window_with_duration(self) -> None:
+        # A stable memory sampled every 4 seconds, then a leak sampled every second
+        detector = MemoryLeakDetector(window=40, duration=10)
+        for index in range(10):
+            detector.update(1000, elapsed=index * 4)
+        for index in range(1, 11):
+            detector.update(1000 + index * 100, elapsed=36 + index)
+
+        self.assertTrue(detector.is_leaking)
+        self.assertEqual(11, detector.sample_count)
+        self.assertEqual(11, detector.distinct_count)
+        self.assertAlmostEqual(100.0, detector.slope)
+
+    def test_window_with_duration_and_long_intervals(self) -> None:
+        detector = MemoryLeakDetector(window=40, duration=10)
+        for index in range(20):
+            detector.update(1000 + index * 100, elapsed=index * 4)
+
+        self.assertFalse(detector.is_leaking)
+        self.assertEqual(3, detector.sample_count)
+
+    def test_window_on_long_run(self) -> None:
+        # The sums of the window stay exact after many sliding updates with large timestamps and values
+        detector = MemoryLeakDetector(window=60)
+        for index in range(100_000):
+            detector.update(2e9 + 1000.0 * index + (index % 7) * 3.0, elapsed=1.7e9 + index * 10.0)
+
+        indexes = np.arange(100_000 - 60, 100_000, dtype=np.float64)
+        slope, _ = np.polyfit(indexes * 10.0, 1000.0 * indexes + (indexes % 7) * 3.0, 1)
+        self.assertAlmostEqual(slope, detector.slope, places=9)
+        self.assertLessEqual(detector.confidence, 1.0)
+
+    def test_window_smaller_than_min_samples(self) -> None:
+        with self.assertRaises(RuntimeError):
+            MemoryLeakDetector(min_samples=10, window=5)
+
+    def test_slope_with_elapsed_time(self) -> None:
+        detector = MemoryLeakDetector()
+        for index, value in enumerate([1000, 1500, 1900, 2600, 3000]):
+            detector.update(value, elapsed=1707580800 + index * 2)
+
+        self.assertAlmostEqual(255.0, detector.slope)
+        self.assertGreater(detector.confidence, 0.95)
+
+    def test_update_many(self) -> None:
+        values = [1000, 2000, 3000, 2990, 4000, 5000, 5000, 6000, 7000, 8000, 9000, 10000, 11000]
+        elapsed = [1707580800 + index * 2 for index in range(len(values))]
+
+        for window in [None, 10]:
+            expected = MemoryLeakDetector(window=window, tolerance=0.001)
+            for value, x in zip(values, elapsed):
+                expected.update(value, elapsed=x)
+            detector = MemoryLeakDetector(window=window, tolerance=0.001)
+            detector.update_many(np.array(values[:5]), elapsed=np.array(elapsed[:5]))
+            detector.update_many(np.array(values[5:]), elapsed=np.array(elapsed[5:]))
+
+            self.assertEqual(expected.is_leaking, detector.is_leaking)
+            self.assertEqual(expected.run_length, detector.run_length)
+            self.assertEqual(expected.distinct_count, detector.distinct_count)
+            self.assertAlmostEqual(expected.slope, detector.slope)
+            self.assertAlmostEqual(expected.confidence, detector.confidence)
@@ -0,0 +1,113 @@
+import json
+import math
+import random
+import unittest
+
+import numpy as np
+
+from model.quantile_sketch import QuantileSketch
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def assert_relative_accuracy(self, expected: float, actual: float, accuracy: float = 0.01) -> None:
+        self.assertLessEqual(abs(actual - expected), expected * accuracy + 1e-12)
+
+    def test_quantiles_within_relative_accuracy(self) -> None:
+        generator = random.Random(42)
+        values = [generator.lognormvariate(3, 2) for _ in range(10000)]
+        sketch = QuantileSketch()
+        for value in values:
+            sketch.update(value)
+
+        for quantile in [0.0, 0.5, 0.95, 0.99, 1.0]:
+            self.assert_relative_accuracy(np.quantile(values, quantile, method='inverted_cdf'),
+                                          sketch.quantile(quantile))
+
+    def test_quantiles_with_zeros_and_nan(self) -> None:
+        sketch = QuantileSketch()
+        for value in [0.0] * 90 + [50.0] * 9 + [100.0, math.nan]:
+            sketch.update(value)
+
+        self.assertEqual(100, sketch.count)
+        p50, p95, p99 = sketch.percentiles()
+        self.assertEqual(0.0, p50)
+        self.assert_relative_accuracy(50.0, p95)
+        self.assert_relative_accuracy(50.0, p99)
+        self.assertEqual(100.0, sketch.quantile(1.0))
+
+    def test_quantile_without_values(self) -> None:
+        self.assertTrue(math.isnan(QuantileSketch().quantile(0.5)))
+
+    def test_bounded_memory(self) -> None:
+        sketch = QuantileSketch(max_buckets=64)
+        for exponent in range(1000):
+            sketch.update(1.1 ** exponent)
+
+        self.assertEqual(64, len(sketch._buckets))
+        self.assertEqual(1000, sketch.count)
+        # The lowest buckets are collapsed, the high quantiles keep their accuracy
+        self.assert_relative_accuracy(1.1 ** 989, sketch.quantile(0.99))
+
+    def test_merge(self) -> None:
+        first, second, whole = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for value in range(1, 1001):
+            (first if value % 2 else second).update(value)
+            whole.update(value)
+
+        first.merge(second)
+
+        self.assertEqual(whole.count, first.count)
+        self.assertEqual(whole.percentiles(), first.percentiles())
+        self.assertEqual((1, 1000), (first.minimum, first.maximum))
+
+    def test_update_batch(self) -> None:
+        values = [0.0, 0.5, 3.0, 3.0, 250.0, math.nan]
+        expected = QuantileSketch()
+        for value in values:
+            expected.update(value)
+
+        sketch = QuantileSketch()
+        sketch.update_batch(np.array(values))
+
+        self.assertEqual(expected.to_dict(), sketch.to_dict())
+
+    def test_weighted_quantiles(self) -> None:
+        sketch = QuantileSketch()
+        # 10 seconds idle sampled every 5 seconds, then a spike of 1 second sampled every 0.1 second
+        for value, weight in [(0.0, 5.0), (0.0, 5.0)] + [(100.0, 0.1)] * 10:
+            sketch.update(value, weight)
+
+        self.assertEqual(12, sketch.count)
+        self.assertAlmostEqual(11.0, sketch.weight)
+        self.assertEqual(0.0, sketch.quantile(0.9))
+        self.assert_relative_accuracy(100.0, sketch.quantile(0.95))
+
+    def test_merge_with_different_accuracy(self) -> None:
+        with self.assertRaises(RuntimeError):
+            QuantileSketch().merge(QuantileSketch(relative_accuracy=0.02))
+
+    def test_serialization(self) -> None:
+        sketch = QuantileSketch()
+        for value in [0.0, 1.5, 20.0, 300.0]:
+            sketch.update(value)
+
+        loaded = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+        self.assertEqual(sketch.count, loaded.count)
+        self.assertEqual(sketch.percentiles([25, 50, 75, 100]), loaded.percentiles([25, 50, 75, 100]))
+
+    def test_deserialization_without_weight(self) -> None:
+        content = QuantileSketch().to_dict()
+        content.update({'count': 2, 'zero_count': 2, 'minimum': 0.0, 'maximum': 0.0})
+        del content['weight']
+
+        self.assertEqual(2, QuantileSketch.from_dict(content).weight)
+
+    def test_invalid_accuracy(self) -> None:
+        with self.assertRaises(RuntimeError):
+            QuantileSketch(relative_accuracy=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
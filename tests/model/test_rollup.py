@@ -0,0 +1,70 @@
+import unittest
+from datetime import datetime
+
+from model.rollup import Rollup
+
+
+class TestRollup(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._rollup = Rollup(resolution=60, metrics=['cpu_percent', 'private_memory'])
+
+    def test_columns(self) -> None:
+        self.assertEqual(
+            ['timestamp', 'count',
+             'cpu_percent_min', 'cpu_percent_mean', 'cpu_percent_max', 'cpu_percent_last',
+             'private_memory_min', 'private_memory_mean', 'private_memory_max', 'private_memory_last'],
+            list(self._rollup.columns)
+        )
+
+    def test_update_within_bucket(self) -> None:
+        self.assertIsNone(self._rollup.update(datetime(2024, 2, 10, 17, 0, 5), {'cpu_percent': 2.0, 'private_memory': 300}))
+        self.assertIsNone(self._rollup.update(datetime(2024, 2, 10, 17, 0, 35), {'cpu_percent': 6.0, 'private_memory': 100}))
+
+    def test_update_completes_bucket(self) -> None:
+        self._rollup.update(datetime(2024, 2, 10, 17, 0, 5), {'cpu_percent': 2.0, 'private_memory': 300})
+        self._rollup.update(datetime(2024, 2, 10, 17, 0, 35), {'cpu_percent': 6.0, 'private_memory': 100})
+        self._rollup.update(datetime(2024, 2, 10, 17, 0, 55), {'cpu_percent': 4.0, 'private_memory': 200})
+
+        row = self._rollup.update(datetime(2024, 2, 10, 17, 1, 5), {'cpu_percent': 8.0, 'private_memory': 400})
+
+        self.assertEqual({
+            'timestamp': datetime(2024, 2, 10, 17, 0),
+            'count': 3,
+            'cpu_percent_min': 2.0,
+            'cpu_percent_mean': 4.0,
+            'cpu_percent_max': 6.0,
+            'cpu_percent_last': 4.0,
+            'private_memory_min': 100,
+            'private_memory_mean': 200,
+            'private_memory_max': 300,
+            'private_memory_last': 200,
+        }, row)
+
+    def test_flush(self) -> None:
+        self._rollup.update(datetime(2024, 2, 10, 17, 0, 5), {'cpu_percent': 2.0, 'private_memory': 300})
+        self._rollup.update(datetime(2024, 2, 10, 17, 1, 5), {'cpu_percent': 8.0, 'private_memory': 400})
+
+        row = self._rollup.flush()
+
+        self.assertEqual(datetime(2024, 2, 10, 17, 1), row['timestamp'])
+        self.assertEqual(1, row['count'])
+        self.assertEqual(8.0, row['cpu_percent_last'])
+        self.assertIsNone(self._rollup.flush())
+
+    def test_weighted_mean(self) -> None:
+        self._rollup.update(datetime(2024, 2, 10, 17, 0, 5), {'cpu_percent': 2.0, 'private_memory': 300}, weight=4.0)
+        self._rollup.update(datetime(2024, 2, 10, 17, 0, 6), {'cpu_percent': 12.0, 'private_memory': 100}, weight=1.0)
+
+        row = self._rollup.flush()
+
+        self.assertEqual(2, row['count'])
+        self.assertEqual(4.0, row['cpu_percent_mean'])
+        self.assertEqual(260.0, row['private_memory_mean'])
+
+    def test_flush_without_samples(self) -> None:
+        self.assertIsNone(self._rollup.flush())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import math
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from model.running_statistics import MetricStatistics, RunningAggregates
+
+
+class TestMetricStatistics(unittest.TestCase):
+
+    def test_update(self) -> None:
+        statistics = MetricStatistics()
+        for value in [4.0, 7.0, 13.0, 16.0]:
+            statistics.update(value)
+
+        self.assertEqual(4, statistics.count)
+        self.assertAlmostEqual(10.0, statistics.mean)
+        self.assertAlmostEqual(30.0, statistics.variance)
+        self.assertAlmostEqual(math.sqrt(30.0), statistics.std)
+        self.assertEqual(4.0, statistics.minimum)
+        self.assertEqual(16.0, statistics.maximum)
+
+    def test_without_values(self) -> None:
+        statistics = MetricStatistics()
+
+        self.assertEqual(0, statistics.count)
+        self.assertTrue(math.isnan(statistics.minimum))
+        self.assertTrue(math.isnan(statistics.maximum))
+        self.assertTrue(math.isnan(statistics.variance))
+
+    def test_single_value(self) -> None:
+        statistics = MetricStatistics()
+        statistics.update(3.0)
+
+        self.assertEqual(3.0, statistics.mean)
+        self.assertEqual(3.0, statistics.minimum)
+        self.assertEqual(3.0, statistics.maximum)
+        self.assertTrue(math.isnan(statistics.variance))
+
+    def test_update_batch_and_merge(self) -> None:
+        values = [4.0, 7.0, 13.0, 16.0, 2.0, 9.5]
+        expected = MetricStatistics()
+        for value in values:
+            expected.update(value)
+
+        statistics = MetricStatistics()
+        statistics.update_batch(np.array(values[:4]))
+        other = MetricStatistics()
+        other.update_batch(np.array(values[4:]))
+        statistics.merge(other)
+        statistics.merge(MetricStatistics())
+
+        self.assertEqual(6, statistics.count)
+        self.assertAlmostEqual(expected.mean, statistics.mean)
+        self.assertAlmostEqual(expected.variance, statistics.variance)
+        self.assertEqual(2.0, statistics.minimum)
+        self.assertEqual(16.0, statistics.maximum)
+
+    def test_weighted_update_and_merge(self) -> None:
+        values = np.array([4.0, 7.0, 13.0, 16.0, 2.0])
+        weights = np.array([0.25, 0.25, 2.0, 4.0, 1.0])
+        statistics, other = MetricStatistics(), MetricStatistics()
+        for index, (value, weight) in enumerate(zip(values, weights)):
+            (statistics if index < 3 else other).update(value, weight)
+        statistics.merge(other)
+
+        mean = np.average(values, weights=weights)
+        variance = (weights * (values - mean) ** 2).sum() / (weights.sum() - (weights ** 2).sum() / weights.sum())
+        self.assertEqual(5, statistics.count)
+        self.assertAlmostEqual(mean, statistics.mean)
+        self.assertAlmostEqual(variance, statistics.variance)
+        self.assertEqual(2.0, statistics.minimum)
+
+
+class TestRunningAggregates(unittest.TestCase):
+
+    def test_same_results_as_dataframe(self) -> None:
+        dataframe = pd.DataFrame(
+            columns=['cpu_percent', 'private_memory', 'handles_fds'],
+            data=[
+                (10.00, 10485760, 100),
+                (20.00, 20971520, 200),
+                (30.00, 31457280, 300),
+                (10.55, 20971520, 30),
+                (0.0, 1000, 0),
+            ]
+        )
+        aggregates = RunningAggregates(metrics=dataframe.columns)
+        for _, row in dataframe.iterrows():
+            aggregates.update(row)
+
+        self.assertEqual(len(dataframe), aggregates.count)
+        for metric in dataframe.columns:
+            self.assertAlmostEqual(dataframe[metric].mean(), aggregates[metric].mean)
+            self.assertAlmostEqual(dataframe[metric].var(), aggregates[metric].variance, delta=1e-3)
+            self.assertEqual(dataframe[metric].min(), aggregates[metric].minimum)
+            self.assertEqual(dataframe[metric].max(), aggregates[metric].maximum)
+
+    def test_means(self) -> None:
+        aggregates = RunningAggregates(metrics=['a', 'b'])
+        aggregates.update({'a': 1.0, 'b': 10.0})
+        aggregates.update({'a': 3.0, 'b': 20.0})
+
+        self.assertEqual({'a': 2.0, 'b': 15.0}, aggregates.means())
+        self.assertEqual(['a', 'b'], aggregates.metrics)
+
+    def test_weighted_update(self) -> None:
+        aggregates = RunningAggregates(metrics=['a'])
+        aggregates.update({'a': 1.0}, weight=3.0)
+        aggregates.update({'a': 5.0}, weight=1.0)
+
+        self.assertEqual(2, aggregates.count)
+        self.assertEqual({'a': 2.0}, aggregates.means())
+        self.assertEqual([1.0, 1.0, 5.0], aggregates.percentiles([50, 75, 99])['a'])
@@ -0,0 +1,81 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from pandas._testing import assert_frame_equal
+
+from model.sample_buffer import SampleBuffer
+
+
+class TestSampleBuffer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._buffer = SampleBuffer(initial_capacity=2)
+
+    def append(self, count: int) -> None:
+        for index in range(count):
+            self._buffer.append({
+                'timestamp': datetime(2024, 2, 10, 17, 0, index),
+                'cpu_percent': index * 1.5,
+                'private_memory': index * 1024,
+                'handles_fds': index,
+            })
+
+    def test_init_with_invalid_capacity(self) -> None:
+        with self.assertRaises(RuntimeError):
+            SampleBuffer(initial_capacity=0)
+
+    def test_append_grows_capacity(self) -> None:
+        self.append(5)
+
+        self.assertEqual(5, len(self._buffer))
+        self.assertEqual(8, self._buffer.capacity)
+        np.testing.assert_array_equal(np.array([0, 1, 2, 3, 4]), self._buffer.column('handles_fds'))
+
+    def test_column_is_read_only(self) -> None:
+        self.append(1)
+
+        with self.assertRaises(ValueError):
+            self._buffer.column('cpu_percent')[0] = 10.0
+
+    def test_last(self) -> None:
+        self.append(3)
+
+        last = self._buffer.last()
+
+        self.assertEqual(np.datetime64(datetime(2024, 2, 10, 17, 0, 2), 'us'), last['timestamp'])
+        self.assertEqual(3.0, last['cpu_percent'])
+        self.assertEqual(2048, last['private_memory'])
+        self.assertEqual(2, last['handles_fds'])
+
+    def test_last_with_empty_buffer(self) -> None:
+        with self.assertRaises(RuntimeError):
+            self._buffer.last()
+
+    def test_clear(self) -> None:
+        self.append(3)
+
+        self._buffer.clear()
+
+        self.assertEqual(0, len(self._buffer))
+        self.assertEqual(0, len(self._buffer.to_dataframe()))
+
+    def test_to_dataframe(self) -> None:
+        self.append(2)
+
+        dataframe = pd.DataFrame({
+            'timestamp': np.array([datetime(2024, 2, 10, 17, 0, 0), datetime(2024, 2, 10, 17, 0, 1)],
+                                  dtype='datetime64[us]'),
+            'cpu_percent': np.array([0.0, 1.5]),
+            'private_memory': np.array([0, 1024], dtype='int64'),
+            'handles_fds': np.array([0, 1], dtype='int64'),
+        })
+        assert_frame_equal(dataframe, self._buffer.to_dataframe())
+
+    def test_custom_columns(self) -> None:
+        buffer = SampleBuffer(columns={'value': 'float32'})
+        buffer.append({'value': 1.5})
+
+        self.assertEqual(['value'], buffer.columns)
+        self.assertEqual(np.float32, buffer.column('value').dtype)
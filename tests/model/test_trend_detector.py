@@ -0,0 +1,113 @@
+import math
+import unittest
+from itertools import combinations
+
+import numpy as np
+
+from model.trend_detector import TrendDetector, downsample, trend_tests
+
+
+class TestTrendTests(unittest.TestCase):
+
+    def test_same_as_definition(self) -> None:
+        generator = np.random.default_rng(42)
+        elapsed = np.cumsum(generator.uniform(0.5, 1.5, 40))
+        values = generator.normal(0, 1, 40) + elapsed * 0.05
+
+        trend = trend_tests(elapsed, values[np.newaxis])[0]
+
+        pairs = list(combinations(range(40), 2))
+        self.assertEqual(sum(int(np.sign(values[j] - values[i])) for i, j in pairs), trend.s)
+        self.assertAlmostEqual(np.median([(values[j] - values[i]) / (elapsed[j] - elapsed[i]) for i, j in pairs]),
+                               trend.slope)
+        self.assertAlmostEqual(trend.s / len(pairs), trend.tau)
+        variance = 40 * 39 * 85 / 18
+        self.assertAlmostEqual(math.erfc(abs(trend.s - 1) / math.sqrt(variance) / math.sqrt(2)), trend.p_value)
+
+    def test_directions(self) -> None:
+        generator = np.random.default_rng(42)
+        elapsed = np.arange(1000, dtype=np.float64)
+        values = np.vstack([
+            1000 + elapsed * 2 + generator.normal(0, 50, 1000),
+            1000 - elapsed + generator.normal(0, 50, 1000),
+            generator.normal(50, 10, 1000),
+            np.full(1000, 8.0),
+        ])
+
+        increasing, decreasing, noise, constant = trend_tests(elapsed, values)
+
+        self.assertEqual('increasing', increasing.direction)
+        self.assertAlmostEqual(7200, increasing.slope_per_hour, delta=200)
+        self.assertEqual('decreasing', decreasing.direction)
+        self.assertEqual('stable', noise.direction)
+        self.assertEqual(('stable', 0, 0.0), (constant.direction, constant.s, constant.slope))
+
+    def test_robust_to_spikes(self) -> None:
+        # Handles leaking one per minute with a few spikes, e.g. a burst of connections
+        elapsed = np.arange(0, 3600, 5, dtype=np.float64)
+        values = 100 + elapsed // 60
+        values[::50] += 500
+
+        trend = trend_tests(elapsed, values[np.newaxis])[0]
+
+        self.assertEqual('increasing', trend.direction)
+        self.assertAlmostEqual(60, trend.slope_per_hour, delta=1)
+
+    def test_not_enough_points(self) -> None:
+        self.assertEqual([None, None], trend_tests(np.arange(5.0), np.zeros((2, 5))))
+
+    def test_downsample(self) -> None:
+        elapsed, values = downsample(np.arange(10.0), np.arange(20.0).reshape(2, 10), max_points=4)
+
+        # Blocks of 3 values, the oldest one is dropped
+        self.assertEqual([2.0, 5.0, 8.0], elapsed.tolist())
+        self.assertEqual([[2.0, 5.0, 8.0], [12.0, 15.0, 18.0]], values.tolist())
+
+
+class TestTrendDetector(unittest.TestCase):
+
+    def test_bounded_points(self) -> None:
+        detector = TrendDetector(metrics=['a'], capacity=64)
+        for index in range(1000):
+            detector.update({'a': index * 2.0}, float(index))
+
+        self.assertEqual(1000, detector.count)
+        self.assertEqual(16, detector.stride)
+        trend = detector.evaluate()['a']
+        self.assertEqual('increasing', trend.direction)
+        self.assertAlmostEqual(2.0, trend.slope)
+
+    def test_update_batch_same_as_update(self) -> None:
+        detector, batch_detector = TrendDetector(metrics=['a'], capacity=64), TrendDetector(metrics=['a'], capacity=64)
+        values = np.random.default_rng(42).normal(0, 1, 1000)
+        for index, value in enumerate(values):
+            detector.update({'a': value}, float(index))
+
+        for start, end in [(0, 7), (7, 600), (600, 1000)]:
+            batch_detector.update_batch(np.arange(start, end, dtype=np.float64), {'a': values[start:end]})
+
+        self.assertEqual(detector.count, batch_detector.count)
+        self.assertEqual(detector.stride, batch_detector.stride)
+        self.assertEqual(detector.evaluate(), batch_detector.evaluate())
+
+    def test_window(self) -> None:
+        detector = TrendDetector(metrics=['a'], window=100, capacity=64)
+        # Growing, then stable for the last 200 seconds
+        for index in range(1000):
+            detector.update({'a': float(min(index, 800))}, float(index))
+
+        trend = detector.evaluate()['a']
+
+        self.assertEqual('stable', trend.direction)
+        self.assertLessEqual(trend.points, 64)
+
+    def test_without_samples(self) -> None:
+        self.assertEqual({'a': None}, TrendDetector(metrics=['a']).evaluate())
+
+    def test_invalid_capacity(self) -> None:
+        with self.assertRaises(RuntimeError):
+            TrendDetector(metrics=['a'], capacity=8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch, MagicMock, call
+
+from supplier.console_renderer import ConsoleRenderer, ConsoleSnapshot, HEADER, format_row
+
+
+def build_snapshot(count: int, name: str = 'pycharm', leaking: bool = False) -> ConsoleSnapshot:
+    return ConsoleSnapshot(
+        name=name,
+        count=count,
+        timestamp=datetime(2024, 2, 10, 17, 20, 40),
+        averages={'cpu_percent': 20.0, 'private_memory': 20971520, 'handles_fds': 200},
+        sample={'cpu_percent': 30.0, 'private_memory': 31457280, 'handles_fds': 300},
+        leaking=leaking,
+        percentiles={'cpu_percent': [20.0, 29.5, 30.0]}
+    )
+
+
+class TestConsoleRenderer(unittest.TestCase):
+
+    def test_format_row(self) -> None:
+        self.assertEqual(
+            '| 17:20:40 |       20.0 |       30.0 |    20.0 MB |    30.0 MB |        200 |        300 |',
+            format_row(build_snapshot(1))
+        )
+        self.assertEqual(
+            '| 17:20:40 |       20.0 |       30.0 |    20.0 MB |    30.0 MB |        200 |        300 | '
+            'WARNING, potential memory leak detected',
+            format_row(build_snapshot(1, leaking=True))
+        )
+
+    @patch('builtins.print')
+    def test_render_rows(self, mock_print) -> None:
+        snapshots = [None, build_snapshot(1), build_snapshot(1), build_snapshot(3)]
+        renderer = ConsoleRenderer()
+        renderer.add(MagicMock(side_effect=snapshots))
+
+        for _ in snapshots:
+            renderer.render()
+
+        row = format_row(build_snapshot(1))
+        self.assertEqual([call(line) for line in HEADER] + [call(row), call(row)], mock_print.call_args_list)
+
+    @patch('builtins.print')
+    def test_render_rows_with_several_targets(self, mock_print) -> None:
+        renderer = ConsoleRenderer()
+        renderer.add(MagicMock(return_value=build_snapshot(1, name='gunicorn')))
+        renderer.add(MagicMock(return_value=build_snapshot(1, name='postgres')))
+
+        renderer.render()
+
+        mock_print.assert_called_with(f'{format_row(build_snapshot(1))} postgres')
+        self.assertEqual(len(HEADER) + 2, mock_print.call_count)
+
+    @patch('supplier.console_renderer.sys')
+    @patch('builtins.print')
+    def test_render_live(self, mock_print, mock_sys) -> None:
+        mock_sys.stdout.isatty = MagicMock(return_value=True)
+        renderer = ConsoleRenderer(mode='live')
+        renderer.add(MagicMock(return_value=build_snapshot(1, name='gunicorn')))
+        renderer.add(MagicMock(return_value=None))
+
+        renderer.render()
+        renderer.render()
+
+        first_output, second_output = [arguments.args[0] for arguments in mock_print.call_args_list]
+        lines = first_output.split('\n')
+        self.assertEqual(len(HEADER) + 1, len(lines))
+        self.assertEqual(f'| gunicorn       {format_row(build_snapshot(1), with_percentiles=True)}\x1b[K', lines[-1])
+        self.assertTrue(lines[-1].endswith('|       20.0 |       29.5 |       30.0 |\x1b[K'))
+        self.assertEqual(len(lines[-2]), len(lines[-1]))
+        self.assertEqual(f'\x1b[{len(lines)}F{first_output}', second_output)
+
+    @patch('builtins.print')
+    def test_write_after_the_pending_rows(self, mock_print) -> None:
+        renderer = ConsoleRenderer()
+        renderer.add(MagicMock(return_value=build_snapshot(2)))
+
+        renderer.write(['Summary of 2 samples for pycharm'])
+
+        self.assertEqual([call(line) for line in HEADER] + [call(format_row(build_snapshot(2))),
+                                                             call('Summary of 2 samples for pycharm')],
+                         mock_print.call_args_list)
+
+    @patch('supplier.console_renderer.sys')
+    @patch('builtins.print')
+    def test_write_in_live_mode(self, mock_print, mock_sys) -> None:
+        mock_sys.stdout.isatty = MagicMock(return_value=True)
+        renderer = ConsoleRenderer(mode='live')
+        renderer.add(MagicMock(return_value=build_snapshot(1)))
+
+        renderer.write(['Summary of 1 samples for pycharm'])
+        renderer.render()
+
+        # The table is drawn again below the summary instead of moving the cursor up over it
+        table, summary, next_table = [arguments.args[0] for arguments in mock_print.call_args_list]
+        self.assertEqual('Summary of 1 samples for pycharm', summary)
+        self.assertEqual(table, next_table)
+
+    @patch('builtins.print')
+    def test_write_in_quiet_mode(self, mock_print) -> None:
+        source = MagicMock(return_value=build_snapshot(1))
+        renderer = ConsoleRenderer(mode='quiet')
+        renderer.add(source)
+
+        renderer.write(['Summary of 1 samples for pycharm'])
+
+        source.assert_not_called()
+        mock_print.assert_called_once_with('Summary of 1 samples for pycharm')
+
+    @patch('supplier.console_renderer.sys')
+    def test_live_without_terminal(self, mock_sys) -> None:
+        mock_sys.stdout.isatty = MagicMock(return_value=False)
+
+        self.assertEqual('rows', ConsoleRenderer(mode='live')._mode)
+
+    @patch('builtins.print')
+    def test_quiet(self, mock_print) -> None:
+        source = MagicMock(return_value=build_snapshot(1))
+        renderer = ConsoleRenderer(mode='quiet')
+        renderer.add(source)
+
+        renderer.start()
+        renderer.stop()
+
+        source.assert_not_called()
+        mock_print.assert_not_called()
+
+    @patch('builtins.print')
+    def test_start_and_stop(self, mock_print) -> None:
+        renderer = ConsoleRenderer(refresh_interval=0.01)
+        renderer.add(MagicMock(return_value=build_snapshot(1)))
+
+        renderer.start()
+        renderer.stop()
+
+        # The last sample is rendered once, even when the thread has not rendered it yet
+        mock_print.assert_called_with(format_row(build_snapshot(1)))
+        self.assertEqual(len(HEADER) + 1, mock_print.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
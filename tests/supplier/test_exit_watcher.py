@@ -0,0 +1,75 @@
+import asyncio
+import subprocess
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+from supplier.exit_watcher import ExitWatcher, is_pidfd_available
+
+
+@unittest.skipUnless(is_pidfd_available(), 'pidfd is only available on Linux')
+class TestExitWatcher(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._child = subprocess.Popen([sys.executable, '-c', 'import sys; sys.stdin.read()'], stdin=subprocess.PIPE)
+        self._watcher = ExitWatcher()
+        self._watcher.update([self._child.pid])
+
+    def tearDown(self) -> None:
+        self._watcher.close()
+        self._child.kill()
+        self._child.wait()
+        self._child.stdin.close()
+
+    def test_wait_timeout(self) -> None:
+        start = time.monotonic()
+
+        self.assertFalse(self._watcher.wait(0.05))
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual([self._child.pid], self._watcher.pids)
+
+    def test_wait_woken_up_by_exit(self) -> None:
+        self._child.stdin.close()
+        start = time.monotonic()
+
+        self.assertEqual([self._child.pid], self._watcher.wait(30))
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertEqual([], self._watcher.pids)
+
+    def test_wait_async_woken_up_by_exit(self) -> None:
+        async def wait() -> tuple:
+            timeout = await self._watcher.wait_async(0.05)
+            self._child.stdin.close()
+            return timeout, await self._watcher.wait_async(30)
+
+        self.assertEqual(([], [self._child.pid]), asyncio.run(wait()))
+        self.assertEqual([], self._watcher.pids)
+
+    def test_update(self) -> None:
+        self._watcher.update([])
+
+        self.assertEqual([], self._watcher.pids)
+
+    def test_watch_exited_process(self) -> None:
+        self._child.kill()
+        self._child.wait()
+
+        watcher = ExitWatcher()
+        watcher.update([self._child.pid])
+        self.assertEqual([], watcher.pids)
+        watcher.close()
+
+    @patch('supplier.exit_watcher.time')
+    def test_wait_without_pidfd(self, mock_time) -> None:
+        with patch('supplier.exit_watcher.is_pidfd_available', return_value=False):
+            watcher = ExitWatcher()
+        watcher.update([self._child.pid])
+
+        self.assertFalse(watcher.wait(2))
+        mock_time.sleep.assert_called_once_with(2)
+        watcher.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import unittest
+from unittest.mock import patch, MagicMock, mock_open
+
+from psutil import NoSuchProcess
+
+from supplier.memory_collector import MemoryCollector, PSS_COLUMN, read_smaps_rollup
+
+SMAPS_ROLLUP = b'''55d0c6a00000-7ffd2b5fe000 ---p 00000000 00:00 0                          [rollup]
+Rss:               20480 kB
+Pss:               12288 kB
+Pss_Anon:           8192 kB
+Shared_Clean:       4096 kB
+Shared_Dirty:          0 kB
+Private_Clean:      2048 kB
+Private_Dirty:     14336 kB
+Private_Hugetlb:       0 kB
+Swap:                  0 kB
+'''
+
+
+def mock_process(pid: int, rss: list, uss: list) -> MagicMock:
+    process = MagicMock()
+    process.pid = pid
+    process.memory_info = MagicMock(side_effect=[MagicMock(rss=value) for value in rss])
+    process.memory_full_info = MagicMock(side_effect=[MagicMock(rss=value, uss=uss[index])
+                                                      for index, value in enumerate(rss)])
+    return process
+
+
+class TestMemoryCollector(unittest.TestCase):
+
+    # region read_smaps_rollup
+    @patch('builtins.open', new_callable=mock_open, read_data=SMAPS_ROLLUP)
+    def test_read_smaps_rollup(self, mock_file) -> None:
+        self.assertEqual((20971520, 16777216, 12582912), read_smaps_rollup(1234))
+        mock_file.assert_called_once_with('/proc/1234/smaps_rollup', 'rb')
+
+    @patch('builtins.open', side_effect=FileNotFoundError)
+    def test_read_smaps_rollup_with_process_not_running(self, _) -> None:
+        with self.assertRaises(NoSuchProcess):
+            read_smaps_rollup(1234)
+
+    @unittest.skipUnless(os.path.exists('/proc/self/smaps_rollup'), 'smaps_rollup is not available')
+    def test_read_smaps_rollup_of_current_process(self) -> None:
+        rss, uss, pss = read_smaps_rollup(os.getpid())
+
+        self.assertGreater(uss, 0)
+        self.assertLessEqual(uss, pss)
+        self.assertLessEqual(pss, rss)
+    # endregion
+
+    # region collect
+    def test_collect_full(self) -> None:
+        process = mock_process(10, rss=[3000, 4000], uss=[1000, 2000])
+        collector = MemoryCollector(tier='full')
+
+        self.assertEqual({'private_memory': 1000, 'memory_tier': 'full'}, collector.collect(process))
+        self.assertEqual({'private_memory': 2000, 'memory_tier': 'full'}, collector.collect(process))
+        self.assertEqual({}, collector.columns)
+        process.memory_info.assert_not_called()
+
+    def test_collect_rss(self) -> None:
+        process = mock_process(10, rss=[3000, 4000], uss=[1000, 2000])
+        collector = MemoryCollector(tier='rss', interval=2)
+
+        self.assertEqual({'private_memory': 3000, 'memory_tier': 'rss'}, collector.collect(process))
+        self.assertEqual({'private_memory': 4000, 'memory_tier': 'rss'}, collector.collect(process))
+        process.memory_full_info.assert_not_called()
+
+    @patch('supplier.memory_collector.os.path.exists', MagicMock(return_value=True))
+    @patch('supplier.memory_collector.read_smaps_rollup', MagicMock(return_value=(3000, 1000, 1500)))
+    def test_collect_rollup(self) -> None:
+        process = mock_process(10, rss=[], uss=[])
+        collector = MemoryCollector(tier='rollup')
+
+        self.assertEqual({'private_memory': 1000, 'memory_tier': 'rollup', PSS_COLUMN: 1500}, collector.collect(process))
+        self.assertEqual({PSS_COLUMN: 'int64'}, collector.columns)
+        process.memory_full_info.assert_not_called()
+
+    @patch('supplier.memory_collector.os.path.exists', MagicMock(return_value=True))
+    @patch('supplier.memory_collector.read_smaps_rollup', MagicMock(return_value=(3000, 1000, 1500)))
+    def test_collect_rollup_with_interval(self) -> None:
+        process = mock_process(10, rss=[3500, 2000], uss=[0, 0])
+        collector = MemoryCollector(tier='rollup', interval=3)
+
+        collector.collect(process)
+
+        # Both estimated from the rss variation since the last rollup
+        self.assertEqual({'private_memory': 1500, 'memory_tier': 'estimated', PSS_COLUMN: 2000},
+                         collector.collect(process))
+        self.assertEqual({'private_memory': 0, 'memory_tier': 'estimated', PSS_COLUMN: 500},
+                         collector.collect(process))
+
+    @patch('supplier.memory_collector.os.path.exists', MagicMock(return_value=False))
+    def test_collect_rollup_not_available(self) -> None:
+        collector = MemoryCollector(tier='rollup')
+
+        self.assertEqual('full', collector.tier)
+
+    def test_collect_with_interval(self) -> None:
+        process = MagicMock()
+        process.pid = 10
+        process.memory_full_info = MagicMock(side_effect=[MagicMock(rss=3000, uss=1000),
+                                                          MagicMock(rss=9000, uss=5000)])
+        process.memory_info = MagicMock(side_effect=[MagicMock(rss=3500), MagicMock(rss=2000)])
+        collector = MemoryCollector(tier='full', interval=3)
+
+        self.assertEqual({'private_memory': 1000, 'memory_tier': 'full'}, collector.collect(process))
+        # Estimated from the rss variation since the last full measure
+        self.assertEqual({'private_memory': 1500, 'memory_tier': 'estimated'}, collector.collect(process))
+        self.assertEqual({'private_memory': 0, 'memory_tier': 'estimated'}, collector.collect(process))
+        self.assertEqual({'private_memory': 5000, 'memory_tier': 'full'}, collector.collect(process))
+
+    def test_retain(self) -> None:
+        process_a = mock_process(10, rss=[3000, 4000], uss=[1000, 2000])
+        process_b = mock_process(11, rss=[3000], uss=[1000])
+        collector = MemoryCollector(tier='full', interval=2)
+        collector.collect(process_a)
+        collector.collect(process_b)
+
+        collector.retain([11])
+
+        # Without state, the next measure of the process is a precise one
+        self.assertEqual({'private_memory': 2000, 'memory_tier': 'full'}, collector.collect(process_a))
+    # endregion
@@ -0,0 +1,65 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+import psutil
+from psutil import NoSuchProcess
+
+from model.configuration import METRIC_COLLECTORS
+from supplier.metric_collectors import COLLECTORS, collector_columns, enabled_collectors, read_page_faults
+
+
+class TestMetricCollectors(unittest.TestCase):
+
+    def test_registry_same_as_configuration(self) -> None:
+        self.assertEqual(METRIC_COLLECTORS, list(COLLECTORS))
+
+    def test_collect_columns(self) -> None:
+        process = MagicMock(pid=1234)
+        process.io_counters.return_value = MagicMock(read_count=1, write_count=2, read_bytes=3, write_bytes=4)
+        process.num_ctx_switches.return_value = MagicMock(voluntary=5, involuntary=6)
+        process.num_threads.return_value = 7
+        process.connections.return_value = [MagicMock(), MagicMock()]
+
+        with patch('supplier.metric_collectors.read_page_faults', return_value=(8, 9)):
+            for collector in COLLECTORS.values():
+                metrics = collector.collect(process)
+
+                self.assertEqual(list(collector.columns), list(metrics))
+
+        process.connections.assert_called_once_with(kind='inet')
+
+    @patch('supplier.metric_collectors.sys')
+    def test_enabled_collectors(self, mock_sys) -> None:
+        mock_sys.platform = 'darwin'
+
+        with self.assertLogs(level='WARNING') as logs:
+            collectors = enabled_collectors(['connections', 'threads', 'io', 'page_faults'])
+
+        # Registry order, without the metrics not available on the platform
+        self.assertEqual(['threads', 'connections'], [collector.name for collector in collectors])
+        self.assertEqual({'num_threads': 'int64', 'num_connections': 'int64'}, collector_columns(collectors))
+        self.assertEqual(3, len(logs.records))
+
+    def test_no_enabled_collectors(self) -> None:
+        self.assertEqual([], enabled_collectors([]))
+
+    @unittest.skipUnless(os.path.exists('/proc/self/stat'), 'procfs is only available on Linux')
+    def test_read_page_faults(self) -> None:
+        minor, major = read_page_faults(os.getpid())
+
+        self.assertGreater(minor, 0)
+        self.assertGreaterEqual(major, 0)
+        with self.assertRaises(NoSuchProcess):
+            read_page_faults(2 ** 22 + 1)
+
+    def test_collect_current_process(self) -> None:
+        process = psutil.Process()
+
+        metrics = COLLECTORS['threads'].collect(process)
+
+        self.assertEqual(process.num_threads(), metrics['num_threads'])
+
+
+if __name__ == '__main__':
+    unittest.main()
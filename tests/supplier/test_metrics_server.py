@@ -0,0 +1,126 @@
+import math
+import unittest
+import urllib.error
+import urllib.request
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from supplier.console_renderer import ConsoleSnapshot
+from supplier.metrics_server import CONTENT_TYPE, MetricsServer, format_metrics
+
+
+def build_snapshot(count: int, name: str = 'pycharm', **sample) -> ConsoleSnapshot:
+    return ConsoleSnapshot(
+        name=name,
+        count=count,
+        timestamp=datetime(2024, 2, 10, 17, 20, 40),
+        averages={'cpu_percent': 20.0, 'private_memory': 20971520.0, 'handles_fds': 200.0},
+        sample={'cpu_percent': 30.0, 'private_memory': 31457280, 'handles_fds': 300, 'lateness': 0.001, **sample},
+        leaking=True
+    )
+
+
+class TestMetricsServer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._server = MetricsServer(port=0)
+
+    def tearDown(self) -> None:
+        self._server.stop()
+
+    def scrape(self, path: str = '/metrics'):
+        host, port = self._server.address
+        return urllib.request.urlopen(f'http://{host}:{port}{path}', timeout=5)
+
+    def test_format_metrics(self) -> None:
+        text = format_metrics([build_snapshot(3), build_snapshot(5, name='my "app"', restarts=2)])
+        lines = text.split('\n')
+
+        self.assertEqual([
+            '# TYPE process_monitor_cpu_percent gauge',
+            '# HELP process_monitor_cpu_percent CPU usage of the last sample in percent of one CPU',
+            'process_monitor_cpu_percent{target="pycharm"} 30.0',
+            'process_monitor_cpu_percent{target="my \\"app\\""} 30.0',
+        ], lines[:4])
+        self.assertIn('# UNIT process_monitor_private_memory_bytes bytes', lines)
+        self.assertIn('process_monitor_private_memory_average_bytes{target="pycharm"} 20971520.0', lines)
+        self.assertIn('process_monitor_memory_leak{target="pycharm"} 1', lines)
+        self.assertIn('process_monitor_samples_total{target="pycharm"} 3', lines)
+        self.assertIn(f'process_monitor_last_sample_timestamp_seconds{{target="pycharm"}} '
+                      f'{datetime(2024, 2, 10, 17, 20, 40).timestamp()}', lines)
+        # Only the targets with a value are exposed
+        self.assertEqual(['process_monitor_restarts_total{target="my \\"app\\""} 2'],
+                         [line for line in lines if line.startswith('process_monitor_restarts_total')])
+        self.assertEqual(['# EOF', ''], lines[-2:])
+
+    def test_format_metrics_with_nan(self) -> None:
+        snapshot = build_snapshot(1)
+        snapshot.averages['cpu_percent'] = math.nan
+
+        self.assertIn('process_monitor_cpu_percent_average{target="pycharm"} NaN', format_metrics([snapshot]))
+
+    def test_format_metrics_without_snapshot(self) -> None:
+        self.assertEqual('# EOF\n', format_metrics([]))
+
+    def test_render_is_cached_until_new_sample(self) -> None:
+        source = MagicMock(side_effect=[build_snapshot(1), build_snapshot(1, cpu_percent=50.0),
+                                        build_snapshot(2, cpu_percent=50.0)])
+        self._server.add(source)
+
+        with patch('supplier.metrics_server.format_metrics', wraps=format_metrics) as mock_format_metrics:
+            first = self._server.render()
+            second = self._server.render()
+            third = self._server.render()
+
+        self.assertIs(first, second)
+        self.assertIn('process_monitor_cpu_percent{target="pycharm"} 50.0', third)
+        self.assertEqual(2, mock_format_metrics.call_count)
+
+    def test_scrape(self) -> None:
+        source = MagicMock(return_value=build_snapshot(1))
+        self._server.add(source)
+        self._server.add(MagicMock(return_value=None))
+        self._server.start()
+
+        with self.scrape() as response:
+            body = response.read().decode()
+
+        self.assertEqual(200, response.status)
+        self.assertEqual(CONTENT_TYPE, response.headers['Content-Type'])
+        self.assertEqual(format_metrics([build_snapshot(1)]), body)
+
+    def test_scrape_unknown_path(self) -> None:
+        self._server.start()
+
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            self.scrape('/')
+
+        self.assertEqual(404, context.exception.code)
+
+    def test_stop(self) -> None:
+        self._server.start()
+        address = self._server.address
+
+        self._server.stop()
+
+        self.assertIsNone(self._server.address)
+        with self.assertRaises(urllib.error.URLError):
+            urllib.request.urlopen(f'http://{address[0]}:{address[1]}/metrics', timeout=5)
+
+    def test_disabled(self) -> None:
+        server = MetricsServer()
+
+        server.start()
+
+        self.assertIsNone(server.address)
+        server.stop()
+
+    def test_port_in_use(self) -> None:
+        self._server.start()
+
+        with self.assertRaises(RuntimeError):
+            MetricsServer(port=self._server.address[1]).start()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import signal
+import threading
+import unittest
+from contextlib import suppress
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+from model.configuration import Configuration
+from supplier.monitoring_engine import MonitoringEngine
+from supplier.sampling_scheduler import SamplingScheduler
+
+
+class TestMonitoringEngine(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._configuration = Configuration(
+            process_name='fleet',
+            duration=0.2,
+            sampling=0.05,
+            reports_directory=Path('output/reports'),
+            logs_directory=Path('output/logs'),
+            reference_datetime=datetime(2024, 2, 10, 17, 1, 2),
+            max_workers=2
+        )
+        self._configuration.targets = [
+            Configuration(process_name='gunicorn', duration=0.2, sampling=0.05, reports_directory=Path('.'),
+                          logs_directory=Path('.')),
+            Configuration(process_name='postgres', duration=0.1, sampling=0.05, reports_directory=Path('.'),
+                          logs_directory=Path('.')),
+        ]
+
+    @patch('supplier.monitoring_engine.ProcessMonitoring')
+    def test_run(self, mock_process_monitoring) -> None:
+        # Mock
+        monitorings = {}
+
+        def create_monitoring(configuration: Configuration) -> MagicMock:
+            monitoring = MagicMock()
+            monitoring.snapshot = MagicMock(return_value=None)
+            monitoring.create_scheduler = MagicMock(return_value=SamplingScheduler(
+                interval=configuration.sampling,
+                duration=configuration.duration,
+                overrun_policy='catch-up'
+            ))
+            monitorings[configuration.process_name] = monitoring
+            return monitoring
+
+        mock_process_monitoring.side_effect = create_monitoring
+
+        # Run
+        engine = MonitoringEngine(configuration=self._configuration)
+        engine.run()
+
+        # Assert
+        for name, samples in [('gunicorn', 4), ('postgres', 2)]:
+            monitoring = monitorings[name]
+            monitoring.start.assert_called_once_with()
+            monitoring.finalize.assert_called_once_with(engine._renderer)
+            self.assertEqual(samples, monitoring.sample.call_count)
+            for call in monitoring.sample.call_args_list:
+                self.assertGreaterEqual(call.args[0], 0.0)
+
+    @patch('supplier.monitoring_engine.ProcessMonitoring')
+    def test_run_with_failing_target(self, mock_process_monitoring) -> None:
+        # Mock
+        failing = MagicMock()
+        failing.start = MagicMock(side_effect=RuntimeError('No running process gunicorn was found'))
+        failing.snapshot = MagicMock(return_value=None)
+        working = MagicMock()
+        working.snapshot = MagicMock(return_value=None)
+        working.create_scheduler = MagicMock(return_value=MagicMock(run_async=MagicMock(return_value=_done())))
+        mock_process_monitoring.side_effect = [failing, working]
+
+        # Run
+        with self.assertLogs(level='ERROR') as logs:
+            engine = MonitoringEngine(configuration=self._configuration)
+            engine.run()
+
+        # Assert
+        self.assertIn('Monitoring of gunicorn has stopped: No running process gunicorn was found', logs.output[0])
+        failing.finalize.assert_not_called()
+        working.finalize.assert_called_once_with(engine._renderer)
+
+    @patch('supplier.monitoring_engine.ProcessMonitoring')
+    def test_run_cancelled(self, mock_process_monitoring) -> None:
+        # Mock
+        async def run_until_cancelled(*args, **kwargs) -> None:
+            await asyncio.Event().wait()
+
+        monitoring = MagicMock()
+        monitoring.snapshot = MagicMock(return_value=None)
+        monitoring.create_scheduler = MagicMock(return_value=MagicMock(run_async=run_until_cancelled))
+        mock_process_monitoring.return_value = monitoring
+        engine = MonitoringEngine(configuration=self._configuration)
+
+        async def run_and_cancel() -> None:
+            task = asyncio.ensure_future(engine._run())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+        # Run
+        asyncio.run(run_and_cancel())
+
+        # Assert
+        self.assertEqual(2, monitoring.start.call_count)
+        self.assertEqual(2, monitoring.finalize.call_count)
+
+    @unittest.skipIf(os.name == 'nt', 'the event loops of Windows do not handle signals')
+    @patch('supplier.monitoring_engine.ProcessMonitoring')
+    def test_run_stopped_by_sigterm(self, mock_process_monitoring) -> None:
+        # Mock
+        async def run_until_cancelled(*args, **kwargs) -> None:
+            await asyncio.Event().wait()
+
+        monitoring = MagicMock()
+        monitoring.snapshot = MagicMock(return_value=None)
+        monitoring.create_scheduler = MagicMock(return_value=MagicMock(run_async=run_until_cancelled))
+        mock_process_monitoring.return_value = monitoring
+        timer = threading.Timer(0.2, os.kill, args=(os.getpid(), signal.SIGTERM))
+
+        # Run
+        timer.start()
+        with self.assertLogs(level='WARNING') as logs:
+            MonitoringEngine(configuration=self._configuration).run()
+
+        # Assert
+        self.assertEqual(2, monitoring.finalize.call_count)
+        self.assertIn('The monitoring has been stopped', logs.output[-1])
+        self.assertEqual(signal.SIG_DFL, signal.getsignal(signal.SIGTERM))
+
+    @patch('supplier.monitoring_engine.ProcessMonitoring')
+    def test_run_with_all_targets_failing(self, mock_process_monitoring) -> None:
+        # Mock
+        mock_process_monitoring.return_value.start = MagicMock(side_effect=RuntimeError('Not found'))
+        mock_process_monitoring.return_value.snapshot = MagicMock(return_value=None)
+
+        # Run
+        with self.assertRaisesRegex(RuntimeError, 'All the monitoring targets have failed'):
+            with self.assertLogs(level='ERROR'):
+                MonitoringEngine(configuration=self._configuration).run()
+
+
+async def _done() -> None:
+    return None
@@ -0,0 +1,172 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+import psutil
+from psutil import NoSuchProcess
+
+from supplier.process_group import ProcessGroup
+
+
+def mock_process(pid: int, name: str) -> MagicMock:
+    process = MagicMock()
+    process.pid = pid
+    process.info = {'name': name, 'status': 'sleeping'}
+    return process
+
+
+class TestProcessGroup(unittest.TestCase):
+
+    # region refresh
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_refresh_all_matching_processes(self, mock_psutil) -> None:
+        worker_a = mock_process(10, 'gunicorn')
+        worker_b = mock_process(11, 'gunicorn')
+        other = mock_process(12, 'bash')
+        mock_psutil.process_iter = MagicMock(return_value=[worker_a, other, worker_b])
+
+        group = ProcessGroup(process_name='gunicorn', include_descendants=False)
+        group.refresh()
+
+        self.assertEqual([10, 11], group.pids)
+        mock_psutil.process_iter.assert_called_once_with(attrs=['name', 'status'])
+        worker_a.cpu_percent.assert_called_once_with()
+        worker_b.cpu_percent.assert_called_once_with()
+        other.cpu_percent.assert_not_called()
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_refresh_adds_new_and_drops_exited_processes(self, mock_psutil) -> None:
+        worker_a = mock_process(10, 'gunicorn')
+        worker_b = mock_process(11, 'gunicorn')
+        worker_c = mock_process(12, 'gunicorn')
+        mock_psutil.process_iter = MagicMock(side_effect=[[worker_a, worker_b], [worker_b, worker_c]])
+
+        group = ProcessGroup(process_name='gunicorn', include_descendants=False)
+        group.refresh()
+        group.refresh()
+
+        self.assertEqual([11, 12], group.pids)
+        # The cpu percent cache is only initialized once per process
+        worker_b.cpu_percent.assert_called_once_with()
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_refresh_process_tree(self, mock_psutil) -> None:
+        root = mock_process(10, 'postgres')
+        child_a = mock_process(20, 'postgres')
+        child_b = mock_process(21, 'postgres')
+        root.children = MagicMock(side_effect=[[child_a], [child_a, child_b]])
+        mock_psutil.process_iter = MagicMock(return_value=[mock_process(1, 'init'), root])
+
+        group = ProcessGroup(process_name='postgres', include_descendants=True)
+        group.refresh()
+        self.assertEqual([10, 20], group.pids)
+
+        group.refresh()
+        self.assertEqual([10, 20, 21], group.pids)
+        mock_psutil.process_iter.assert_called_once()
+        root.children.assert_called_with(recursive=True)
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_refresh_process_tree_with_exited_root(self, mock_psutil) -> None:
+        root = mock_process(10, 'postgres')
+        child_a = mock_process(20, 'postgres')
+        child_a.is_running = MagicMock(return_value=True)
+        child_b = mock_process(21, 'postgres')
+        child_b.is_running = MagicMock(return_value=False)
+        root.children = MagicMock(side_effect=[[child_a, child_b], NoSuchProcess(10)])
+        root.is_running = MagicMock(return_value=False)
+        mock_psutil.process_iter = MagicMock(return_value=[root])
+
+        group = ProcessGroup(process_name='postgres', include_descendants=True)
+        group.refresh()
+        group.refresh()
+
+        self.assertEqual([20], group.pids)
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_refresh_process_tree_with_restarted_root(self, mock_psutil) -> None:
+        root = mock_process(10, 'postgres')
+        root.children = MagicMock(side_effect=[[], NoSuchProcess(10)])
+        root.is_running = MagicMock(return_value=False)
+        restarted_root = mock_process(30, 'postgres')
+        restarted_root.children = MagicMock(return_value=[])
+        mock_psutil.process_iter = MagicMock(side_effect=[[root], [restarted_root]])
+
+        group = ProcessGroup(process_name='postgres', include_descendants=True)
+        group.refresh()
+        self.assertEqual([10], group.pids)
+
+        group.refresh()
+        self.assertEqual(0, len(group))
+
+        group.refresh()
+        self.assertEqual([30], group.pids)
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_refresh_with_process_factory(self, mock_psutil) -> None:
+        worker_a = mock_process(10, 'gunicorn')
+        worker_b = mock_process(11, 'gunicorn')
+        mock_psutil.process_iter = MagicMock(side_effect=[[worker_a, worker_b], [worker_b]])
+        handles = {10: MagicMock(), 11: MagicMock()}
+        process_factory = MagicMock(side_effect=lambda pid: handles[pid])
+
+        group = ProcessGroup(process_name='gunicorn', include_descendants=False, process_factory=process_factory)
+        group.refresh()
+        group.refresh()
+        group.close()
+
+        self.assertEqual(0, len(group))
+        handles[10].cpu_percent.assert_called_once_with()
+        handles[10].close.assert_called_once_with()
+        handles[11].close.assert_called_once_with()
+        worker_a.cpu_percent.assert_not_called()
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_refresh_skips_zombie_processes(self, mock_psutil) -> None:
+        worker_a = mock_process(10, 'gunicorn')
+        zombie = mock_process(11, 'gunicorn')
+        zombie.status = MagicMock(return_value=psutil.STATUS_ZOMBIE)
+        mock_psutil.process_iter = MagicMock(return_value=[worker_a, zombie])
+
+        group = ProcessGroup(process_name='gunicorn', include_descendants=False)
+        group.refresh()
+
+        self.assertEqual([10], group.pids)
+        zombie.cpu_percent.assert_not_called()
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_remove(self, mock_psutil) -> None:
+        mock_psutil.process_iter = MagicMock(return_value=[mock_process(10, 'gunicorn'), mock_process(11, 'gunicorn')])
+        group = ProcessGroup(process_name='gunicorn', include_descendants=False)
+        group.refresh()
+
+        group.remove([11, 12])
+
+        self.assertEqual([10], group.pids)
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_refresh_without_matching_process(self, mock_psutil) -> None:
+        mock_psutil.process_iter = MagicMock(return_value=[mock_process(1, 'init')])
+
+        group = ProcessGroup(process_name='postgres', include_descendants=True)
+        group.refresh()
+
+        self.assertEqual(0, len(group))
+    # endregion
+
+    # region collect
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_collect(self, mock_psutil) -> None:
+        worker_a = mock_process(10, 'gunicorn')
+        worker_b = mock_process(11, 'gunicorn')
+        mock_psutil.process_iter = MagicMock(return_value=[worker_a, worker_b])
+        collect_metrics = MagicMock(side_effect=[{'cpu_percent': 1.0}, NoSuchProcess(11)])
+
+        group = ProcessGroup(process_name='gunicorn', include_descendants=False)
+        group.refresh()
+        samples = group.collect(collect_metrics)
+
+        self.assertEqual([{'pid': 10, 'cpu_percent': 1.0}], samples)
+        self.assertEqual([10], group.pids)
+        worker_a.oneshot.assert_called_once_with()
+        worker_b.oneshot.assert_called_once_with()
+    # endregion
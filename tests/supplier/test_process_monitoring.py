@@ -1,21 +1,46 @@
-import copy
+import subprocess
+import tempfile
 import unittest
 from datetime import timedelta, datetime
 from pathlib import Path
 from unittest.mock import patch, MagicMock, call, PropertyMock
 
-import numpy as np
 import pandas as pd
 import psutil
 from pandas._testing import assert_frame_equal
 from psutil import NoSuchProcess
 
 from model.configuration import Configuration
+from supplier.console_renderer import ConsoleRenderer
 from supplier.process_monitoring import ProcessMonitoring
+from supplier.report_writer import CsvReportWriter, NpcolReportWriter
+from supplier.self_instrumentation import STAGES
+from tests.supplier.test_process_resolver import wait_for_zombie
+from utils.report_utils import load_sketches
+
+COLUMNS = ['timestamp', 'cpu_percent', 'private_memory', 'handles_fds', 'memory_tier', 'lateness']
+
+
+def build_dataframe(rows: list) -> pd.DataFrame:
+    return pd.DataFrame(columns=COLUMNS, data=[(*row, 'full', 0.0) for row in rows]).astype({
+        'timestamp': 'datetime64[us]',
+        'cpu_percent': 'float64',
+        'private_memory': 'int64',
+        'handles_fds': 'int64',
+    })
 
 
 class TestProcessMonitoring(unittest.TestCase):
     
+    def render(self) -> None:
+        renderer = ConsoleRenderer()
+        renderer.add(self._process_monitoring.snapshot)
+        renderer.render()
+
+    def append_samples(self, rows: list) -> None:
+        for row in rows:
+            self._process_monitoring._store_sample(dict(zip(COLUMNS, (*row, 'full', 0.0))))
+
     def setUp(self) -> None:
         self._configuration = Configuration(
             process_name='pycharm',
@@ -33,7 +58,7 @@ class TestProcessMonitoring(unittest.TestCase):
         self._configuration.sampling = 2
         self._configuration.duration = 7
         
-        self._process_monitoring._init = MagicMock()
+        self._process_monitoring.start = MagicMock()
         self._process_monitoring._process_metrics = MagicMock()
         self._process_monitoring._persist = MagicMock()
  
@@ -41,7 +66,7 @@ class TestProcessMonitoring(unittest.TestCase):
         self._process_monitoring.run()
         
         # Assert
-        self._process_monitoring._init.assert_called_once()
+        self._process_monitoring.start.assert_called_once()
         self._process_monitoring._process_metrics.assert_has_calls(calls=[
             call(),
             call(),
@@ -54,7 +79,7 @@ class TestProcessMonitoring(unittest.TestCase):
         self._configuration.sampling = 2
         self._configuration.duration = 7
     
-        self._process_monitoring._init = MagicMock()
+        self._process_monitoring.start = MagicMock()
         self._process_monitoring._process_metrics = MagicMock(side_effect=[None, RuntimeError('An error occurred')])
         self._process_monitoring._persist = MagicMock()
     
@@ -63,7 +88,7 @@ class TestProcessMonitoring(unittest.TestCase):
             self._process_monitoring.run()
     
         # Assert
-        self._process_monitoring._init.assert_called_once()
+        self._process_monitoring.start.assert_called_once()
         self._process_monitoring._process_metrics.assert_has_calls(calls=[
             call(),
             call()
@@ -71,56 +96,140 @@ class TestProcessMonitoring(unittest.TestCase):
         self._process_monitoring._persist.assert_called_once()
     # endregion run
 
-    # region _init
+    # region start
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
     @patch('supplier.process_monitoring.psutil', wrapper=psutil)
-    def test_init(self, mock_psutil) -> None:
+    def test_init(self, mock_psutil, mock_resolver_psutil) -> None:
         # Mock
         process_a_mock = MagicMock()
-        process_a_mock.name = MagicMock(return_value='process_a')
+        process_a_mock.info = {'name': 'process_a', 'status': 'sleeping'}
 
         process_b_mock = MagicMock()
-        process_b_mock.name = MagicMock(return_value='process_b')
+        process_b_mock.info = {'name': 'process_b', 'status': 'sleeping'}
         
         process_pycharm_mock = MagicMock()
-        process_pycharm_mock.name = MagicMock(return_value='pycharm')
+        process_pycharm_mock.info = {'name': 'pycharm', 'status': 'sleeping'}
         process_pycharm_mock.pid = 1234
         
         process_mock = MagicMock()
         process_mock.cpu_percent = MagicMock()
         
-        mock_psutil.process_iter = MagicMock(return_value=[process_a_mock, process_b_mock, process_pycharm_mock])
+        mock_resolver_psutil.process_iter = MagicMock(
+            return_value=[process_a_mock, process_b_mock, process_pycharm_mock]
+        )
         mock_psutil.Process = MagicMock(return_value=process_mock)
         
         # Run
-        self._process_monitoring._init()
+        self._process_monitoring.start()
         
         # Assert
         self.assertEqual(process_mock, self._process_monitoring._process)
-        mock_psutil.process_iter.assert_called_once()
+        mock_resolver_psutil.process_iter.assert_called_once_with(attrs=['name', 'status'])
         mock_psutil.Process.assert_called_once_with(process_pycharm_mock.pid)
         process_mock.cpu_percent.assert_called_once()
+        process_a_mock.name.assert_not_called()
 
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
     @patch('supplier.process_monitoring.psutil', wrapper=psutil)
-    def test_init_with_process_not_found(self, mock_psutil) -> None:
+    def test_init_with_process_not_found(self, mock_psutil, mock_resolver_psutil) -> None:
         # Mock
         process_a_mock = MagicMock()
-        process_a_mock.name = MagicMock(return_value='process_a')
+        process_a_mock.info = {'name': 'process_a', 'status': 'sleeping'}
     
         process_b_mock = MagicMock()
-        process_b_mock.name = MagicMock(return_value='process_b')
+        process_b_mock.info = {'name': 'process_b', 'status': 'sleeping'}
     
-        mock_psutil.process_iter = MagicMock(return_value=[process_a_mock, process_b_mock])
+        mock_resolver_psutil.process_iter = MagicMock(return_value=[process_a_mock, process_b_mock])
         mock_psutil.Process = MagicMock()
     
         # Run
         with self.assertRaisesRegex(RuntimeError, 'No running process pycharm was found'):
-            self._process_monitoring._init()
+            self._process_monitoring.start()
     
         # Assert
         self.assertIsNone(self._process_monitoring._process)
-        mock_psutil.process_iter.assert_called_once()
+        mock_resolver_psutil.process_iter.assert_called_once()
+        mock_psutil.Process.assert_not_called()
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    @patch('supplier.process_monitoring.psutil', wrapper=psutil)
+    def test_init_with_pid(self, mock_psutil, mock_resolver_psutil) -> None:
+        # Mock
+        self._configuration.process_name = '1234'
+        self._configuration.match = 'pid'
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        mock_resolver_psutil.Process = MagicMock(return_value=MagicMock(pid=1234))
+
+        # Run
+        self._process_monitoring.start()
+
+        # Assert
+        mock_resolver_psutil.process_iter.assert_not_called()
+        mock_resolver_psutil.Process.assert_called_once_with(1234)
+        mock_psutil.Process.assert_called_once_with(1234)
+
+    @patch('supplier.process_monitoring.is_procfs_available', MagicMock(return_value=True))
+    @patch('supplier.process_monitoring.is_running_on_windows', MagicMock(return_value=False))
+    @patch('supplier.process_monitoring.ProcfsProcess')
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    @patch('supplier.process_monitoring.psutil', wrapper=psutil)
+    def test_init_with_procfs_backend(self, mock_psutil, mock_resolver_psutil, mock_procfs_process) -> None:
+        # Mock
+        self._configuration.backend = 'procfs'
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+
+        process_pycharm_mock = MagicMock()
+        process_pycharm_mock.info = {'name': 'pycharm', 'status': 'sleeping'}
+        process_pycharm_mock.pid = 1234
+        mock_resolver_psutil.process_iter = MagicMock(return_value=[process_pycharm_mock])
+
+        # Run
+        self._process_monitoring.start()
+
+        # Assert
+        self.assertEqual(mock_procfs_process.return_value, self._process_monitoring._process)
+        mock_procfs_process.assert_called_once_with(1234)
+        mock_procfs_process.return_value.cpu_percent.assert_called_once_with()
         mock_psutil.Process.assert_not_called()
-    # endregion _init
+
+    @patch('supplier.process_monitoring.is_running_on_windows', MagicMock(return_value=True))
+    def test_procfs_backend_on_windows(self) -> None:
+        self._configuration.backend = 'procfs'
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+
+        self.assertFalse(self._process_monitoring._use_procfs)
+
+    @patch('supplier.process_monitoring.ProcessGroup')
+    def test_init_with_all_mode(self, mock_process_group) -> None:
+        # Mock
+        self._configuration.target_mode = 'all'
+        mock_process_group.return_value.__len__ = MagicMock(return_value=2)
+
+        # Run
+        self._process_monitoring.start()
+
+        # Assert
+        mock_process_group.assert_called_once_with(process_name='pycharm', include_descendants=False,
+                                                   process_factory=None,
+                                                   resolver=self._process_monitoring._resolver)
+        mock_process_group.return_value.refresh.assert_called_once_with()
+        self.assertEqual(mock_process_group.return_value, self._process_monitoring._group)
+
+    @patch('supplier.process_monitoring.ProcessGroup')
+    def test_init_with_tree_mode_and_process_not_found(self, mock_process_group) -> None:
+        # Mock
+        self._configuration.target_mode = 'tree'
+        mock_process_group.return_value.__len__ = MagicMock(return_value=0)
+
+        # Run
+        with self.assertRaisesRegex(RuntimeError, 'No running process pycharm was found'):
+            self._process_monitoring.start()
+
+        # Assert
+        mock_process_group.assert_called_once_with(process_name='pycharm', include_descendants=True,
+                                                   process_factory=None,
+                                                   resolver=self._process_monitoring._resolver)
+    # endregion start
 
     # region _process_metrics
     @patch('supplier.process_monitoring.datetime', wrapper=datetime)
@@ -141,13 +250,11 @@ class TestProcessMonitoring(unittest.TestCase):
         
         # Run
         self._process_monitoring._process_metrics()
+        self.render()
         
         # Assert
-        dataframe = pd.DataFrame(
-            columns=['timestamp', 'cpu_percent', 'private_memory', 'handles_fds'],
-            data=np.array([(now, 10.55, 20971520, 30)])  # 20971520 is 20 MB
-        )
-        assert_frame_equal(dataframe, self._process_monitoring._dataframe, check_dtype=False)
+        dataframe = build_dataframe([(now, 10.55, 20971520, 30)])  # 20971520 is 20 MB
+        assert_frame_equal(dataframe, self._process_monitoring._samples.to_dataframe())
         
         mock_print.assert_has_calls(calls=[
             call('+----------+-------------------------+-------------------------+-------------------------+'),
@@ -170,16 +277,13 @@ class TestProcessMonitoring(unittest.TestCase):
         now = datetime(2024, 2, 10, 17, 20, 40)
         mock_datetime.now = MagicMock(return_value=now)
         
-        dataframe = pd.DataFrame(
-            columns=['timestamp', 'cpu_percent', 'private_memory', 'handles_fds'],
-            data=np.array([
-                (now - timedelta(seconds=10), 10.00, 10485760, 100),  # 10485760 is 10 MB
-                (now - timedelta(seconds=5), 20.00, 20971520, 200),  # 20971520 is 20 MB
-            ])
-        )
+        rows = [
+            (now - timedelta(seconds=10), 10.00, 10485760, 100),  # 10485760 is 10 MB
+            (now - timedelta(seconds=5), 20.00, 20971520, 200),  # 20971520 is 20 MB
+        ]
     
         self._process_monitoring._is_running_on_windows = False
-        self._process_monitoring._dataframe = copy.deepcopy(dataframe)
+        self.append_samples(rows)
     
         self._process_monitoring._process = MagicMock()
         self._process_monitoring._process.cpu_percent = MagicMock(return_value=30.00)
@@ -190,12 +294,13 @@ class TestProcessMonitoring(unittest.TestCase):
     
         # Run
         self._process_monitoring._process_metrics()
+        self.render()
     
         # Assert
-        dataframe.loc[2] = [now, 30.00, 31457280, 300]  # 31457280 is 30 MB
-        assert_frame_equal(dataframe, self._process_monitoring._dataframe, check_dtype=False)
+        dataframe = build_dataframe(rows + [(now, 30.00, 31457280, 300)])  # 31457280 is 30 MB
+        assert_frame_equal(dataframe, self._process_monitoring._samples.to_dataframe())
         
-        mock_print.assert_called_once_with(
+        mock_print.assert_called_with(
             '| 17:20:40 |       20.0 |       30.0 |    20.0 MB |    30.0 MB |        200 |        300 |'
         )
 
@@ -222,13 +327,11 @@ class TestProcessMonitoring(unittest.TestCase):
     
         # Run
         self._process_monitoring._process_metrics()
+        self.render()
     
         # Assert
-        dataframe = pd.DataFrame(
-            columns=['timestamp', 'cpu_percent', 'private_memory', 'handles_fds'],
-            data=np.array([(now, 10.55, 20971520, 30)])  # 20971520 is 20 MB
-        )
-        assert_frame_equal(dataframe, self._process_monitoring._dataframe, check_dtype=False)
+        dataframe = build_dataframe([(now, 10.55, 20971520, 30)])  # 20971520 is 20 MB
+        assert_frame_equal(dataframe, self._process_monitoring._samples.to_dataframe())
     
         mock_print.assert_has_calls(calls=[
             call('+----------+-------------------------+-------------------------+-------------------------+'),
@@ -257,7 +360,7 @@ class TestProcessMonitoring(unittest.TestCase):
             self._process_monitoring._process_metrics()
     
         # Assert
-        self.assertEqual(0, len(self._process_monitoring._dataframe))
+        self.assertEqual(0, len(self._process_monitoring._samples))
         mock_print.assert_not_called()
 
     @patch('supplier.process_monitoring.datetime', wrapper=datetime)
@@ -267,16 +370,13 @@ class TestProcessMonitoring(unittest.TestCase):
         now = datetime(2024, 2, 10, 17, 20, 40)
         mock_datetime.now = MagicMock(return_value=now)
     
-        dataframe = pd.DataFrame(
-            columns=['timestamp', 'cpu_percent', 'private_memory', 'handles_fds'],
-            data=np.array([
-                (now - timedelta(seconds=10), 10.00, 10485760, 100),  # 10485760 is 10 MB
-                (now - timedelta(seconds=5), 20.00, 20971520, 200),  # 20971520 is 20 MB
-            ])
-        )
+        rows = [
+            (now - timedelta(seconds=10), 10.00, 10485760, 100),  # 10485760 is 10 MB
+            (now - timedelta(seconds=5), 20.00, 20971520, 200),  # 20971520 is 20 MB
+        ]
     
         self._process_monitoring._is_running_on_windows = False
-        self._process_monitoring._dataframe = copy.deepcopy(dataframe)
+        self.append_samples(rows)
         self._process_monitoring._has_potential_memory_leak = MagicMock(return_value=True)
     
         self._process_monitoring._process = MagicMock()
@@ -289,12 +389,13 @@ class TestProcessMonitoring(unittest.TestCase):
     
         # Run
         self._process_monitoring._process_metrics()
+        self.render()
     
         # Assert
-        dataframe.loc[2] = [now, 30.00, 31457280, 300]  # 31457280 is 30 MB
-        assert_frame_equal(dataframe, self._process_monitoring._dataframe, check_dtype=False)
+        dataframe = build_dataframe(rows + [(now, 30.00, 31457280, 300)])  # 31457280 is 30 MB
+        assert_frame_equal(dataframe, self._process_monitoring._samples.to_dataframe())
     
-        mock_print.assert_called_once_with(
+        mock_print.assert_called_with(
             '| 17:20:40 |       20.0 |       30.0 |    20.0 MB |    30.0 MB |        200 |        300 | WARNING, potential memory leak detected'
         )
     
@@ -302,119 +403,899 @@ class TestProcessMonitoring(unittest.TestCase):
         self._process_monitoring._process.memory_full_info.assert_called_once_with()
         self._process_monitoring._process.num_fds.assert_called_once_with()
         self._process_monitoring._process.num_handles.assert_not_called()
+
+    @patch('supplier.process_monitoring.datetime', wrapper=datetime)
+    @patch('builtins.print')
+    def test_process_group_metrics(self, mock_print, mock_datetime) -> None:
+        # Mock
+        now = datetime(2024, 2, 10, 17, 20, 40)
+        mock_datetime.now = MagicMock(return_value=now)
+
+        self._configuration.target_mode = 'all'
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        self._process_monitoring._group = MagicMock()
+        self._process_monitoring._group.collect = MagicMock(return_value=[
+            {'pid': 10, 'cpu_percent': 10.25, 'private_memory': 10485760, 'handles_fds': 10, 'memory_tier': 'full'},
+            {'pid': 11, 'cpu_percent': 20.5, 'private_memory': 20971520, 'handles_fds': 20, 'memory_tier': 'full'},
+        ])
+
+        # Run
+        self._process_monitoring.sample(lateness=0.25)
+        self.render()
+
+        # Assert
+        dataframe = pd.DataFrame(
+            columns=['timestamp', 'pid', 'cpu_percent', 'private_memory', 'handles_fds', 'memory_tier', 'lateness'],
+            data=[
+                (now, 10, 10.25, 10485760, 10, 'full', 0.25),
+                (now, 11, 20.5, 20971520, 20, 'full', 0.25),
+                (now, -1, 30.75, 31457280, 30, 'full', 0.25),
+            ]
+        ).astype({'timestamp': 'datetime64[us]'})
+        assert_frame_equal(dataframe, self._process_monitoring._samples.to_dataframe())
+        self.assertEqual(1, self._process_monitoring._aggregates.count)
+
+        mock_print.assert_called_with(
+            '| 17:20:40 |      30.75 |      30.75 |    30.0 MB |    30.0 MB |         30 |         30 | 2 processes'
+        )
+        self._process_monitoring._group.collect.assert_called_once_with(self._process_monitoring._collect_metrics)
+        self._process_monitoring._group.refresh.assert_called_once_with()
+
+    @patch('supplier.process_monitoring.time')
+    @patch('builtins.print')
+    def test_process_group_refresh_interval(self, mock_print, mock_time) -> None:
+        # Mock
+        self._configuration.target_mode = 'all'
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        self._process_monitoring._group = MagicMock()
+        self._process_monitoring._group.__len__ = MagicMock(return_value=2)
+        members = [
+            {'pid': 10, 'cpu_percent': 1.0, 'private_memory': 1024, 'handles_fds': 1, 'memory_tier': 'full'},
+            {'pid': 11, 'cpu_percent': 1.0, 'private_memory': 1024, 'handles_fds': 1, 'memory_tier': 'full'},
+        ]
+        # The member 11 exits during the fourth sample
+        self._process_monitoring._group.collect = MagicMock(side_effect=[members, members, members, members[:1]])
+
+        # Run
+        for now in [100.0, 105.0, 111.0, 112.0]:
+            mock_time.monotonic = MagicMock(return_value=now)
+            self._process_monitoring.sample(lateness=0.0)
+
+        # Assert
+        # On the first sample, 10 seconds later and after the exit, not on every sample
+        self.assertEqual(3, self._process_monitoring._group.refresh.call_count)
+        self.assertEqual(122.0, self._process_monitoring._group_refresh_at)
+
+    def test_process_group_total_memory_tier(self) -> None:
+        self.assertEqual('rollup', self._process_monitoring._group_tier([{'memory_tier': 'rollup'},
+                                                                          {'memory_tier': 'rollup'}]))
+        self.assertEqual('estimated', self._process_monitoring._group_tier([{'memory_tier': 'rollup'},
+                                                                             {'memory_tier': 'estimated'}]))
+
+    @patch('supplier.memory_collector.os.path.exists', MagicMock(return_value=True))
+    @patch('supplier.process_monitoring.datetime', wrapper=datetime)
+    @patch('builtins.print')
+    def test_process_group_metrics_with_rollup_tier(self, mock_print, mock_datetime) -> None:
+        # Mock
+        mock_datetime.now = MagicMock(return_value=datetime(2024, 2, 10, 17, 1, 2))
+        self._configuration.memory_tier = 'rollup'
+        self._configuration.target_mode = 'all'
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        self._process_monitoring._group = MagicMock()
+        self._process_monitoring._group.collect = MagicMock(return_value=[
+            {'pid': 10, 'cpu_percent': 1.0, 'private_memory': 100, 'handles_fds': 1, 'memory_tier': 'rollup',
+             'proportional_memory': 150},
+            {'pid': 11, 'cpu_percent': 2.0, 'private_memory': 200, 'handles_fds': 2, 'memory_tier': 'estimated',
+             'proportional_memory': 250},
+        ])
+
+        # Run
+        self._process_monitoring._process_metrics()
+
+        # Assert
+        row = self._process_monitoring._samples.last()
+        self.assertEqual(-1, row['pid'])
+        self.assertEqual(400, row['proportional_memory'])
+        self.assertEqual('estimated', row['memory_tier'])
+
+    @patch('builtins.print')
+    def test_process_group_metrics_without_running_process(self, mock_print) -> None:
+        # Mock
+        self._configuration.target_mode = 'all'
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        self._process_monitoring._group = MagicMock()
+        self._process_monitoring._group.collect = MagicMock(return_value=[])
+
+        # Run
+        with self.assertRaisesRegex(RuntimeError, 'No process pycharm is running anymore, application will stop'):
+            self._process_monitoring._process_metrics()
+
+        # Assert
+        self.assertEqual(0, len(self._process_monitoring._samples))
+        mock_print.assert_not_called()
     # endregion
     
+    # region _reattach
+    def create_reattach_monitoring(self) -> None:
+        self._configuration.reattach = True
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        self._process_monitoring._writer = MagicMock()
+
+    @patch('supplier.process_monitoring.datetime', wrapper=datetime)
+    @patch('builtins.print')
+    def test_process_metrics_with_process_exited(self, mock_print, mock_datetime) -> None:
+        # Mock
+        self.create_reattach_monitoring()
+        mock_datetime.now = MagicMock(return_value=datetime(2024, 2, 10, 17, 1, 2))
+        self._process_monitoring._process = MagicMock()
+        self._process_monitoring._process.pid = 1234
+        self._process_monitoring._process.cpu_percent = MagicMock(side_effect=NoSuchProcess(1234))
+
+        # Run
+        self._process_monitoring._process_metrics()
+
+        # Assert
+        self._process_monitoring._writer.flush.assert_called_once_with(self._process_monitoring._samples)
+        row = self._process_monitoring._samples.last()
+        self.assertEqual(1234, row['pid'])
+        self.assertEqual('exited', row['memory_tier'])
+        self.assertTrue(pd.isna(row['cpu_percent']))
+        self.assertEqual(0, self._process_monitoring._aggregates.count)
+        self.assertIsNone(self._process_monitoring._process)
+        self.assertIsNotNone(self._process_monitoring._reattach_at)
+        self.assertIsNone(self._process_monitoring.snapshot())
+
+    @patch('supplier.process_monitoring.time')
+    def test_reattach_with_backoff(self, mock_time) -> None:
+        # Mock
+        self.create_reattach_monitoring()
+        self._process_monitoring._reattach_at = 100.0
+        self._process_monitoring._resolver.resolve = MagicMock(return_value=[])
+
+        # Run
+        for now in [100.0, 100.5, 101.0, 103.0]:
+            mock_time.monotonic = MagicMock(return_value=now)
+            self._process_monitoring._process_metrics()
+
+        # Assert
+        self.assertEqual(3, self._process_monitoring._resolver.resolve.call_count)
+        self.assertEqual(107.0, self._process_monitoring._reattach_at)
+        self.assertEqual(8, self._process_monitoring._reattach_backoff)
+        self.assertEqual(0, len(self._process_monitoring._samples))
+
+    def test_reattach_skips_zombie(self) -> None:
+        # Mock
+        child = subprocess.Popen(['true'])
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                pidfile = Path(directory).joinpath('true.pid')
+                pidfile.write_text(str(child.pid))
+                wait_for_zombie(child.pid)
+                self._configuration.process_name = str(pidfile)
+                self._configuration.match = 'pidfile'
+                self.create_reattach_monitoring()
+
+                # Run
+                for _ in range(3):
+                    self._process_monitoring._reattach_at = 0.0
+                    self._process_monitoring._process_metrics()
+        finally:
+            child.wait()
+
+        # Assert
+        self.assertIsNone(self._process_monitoring._process)
+        self.assertEqual(0, self._process_monitoring._restarts)
+        self.assertEqual(0, len(self._process_monitoring._samples))
+
+    @patch('supplier.process_monitoring.datetime', wrapper=datetime)
+    @patch('supplier.process_monitoring.psutil', wrapper=psutil)
+    @patch('builtins.print')
+    def test_reattach(self, mock_print, mock_psutil, mock_datetime) -> None:
+        # Mock
+        self.create_reattach_monitoring()
+        mock_datetime.now = MagicMock(return_value=datetime(2024, 2, 10, 17, 1, 2))
+        self._process_monitoring._reattach_at = 0.0
+        self._process_monitoring._resolver.resolve = MagicMock(return_value=[MagicMock(pid=5678)])
+        process_mock = MagicMock()
+        process_mock.pid = 5678
+        process_mock.cpu_percent = MagicMock(side_effect=[0.0, 5.0])
+        process_mock.num_fds = MagicMock(return_value=12)
+        process_mock.memory_full_info = MagicMock(return_value=MagicMock(rss=4096, uss=2048))
+        mock_psutil.Process = MagicMock(return_value=process_mock)
+
+        # Run
+        self._process_monitoring._process_metrics()
+        self._process_monitoring._process_metrics()
+
+        # Assert
+        mock_psutil.Process.assert_called_once_with(5678)
+        self.assertEqual(1, self._process_monitoring._restarts)
+        self.assertIsNone(self._process_monitoring._reattach_at)
+        row = self._process_monitoring._samples.last()
+        self.assertEqual(1, len(self._process_monitoring._samples))
+        self.assertEqual(5678, row['pid'])
+        self.assertEqual(1, row['restarts'])
+        self.assertEqual(5.0, row['cpu_percent'])
+
+    @patch('supplier.process_monitoring.datetime', wrapper=datetime)
+    @patch('builtins.print')
+    def test_process_group_metrics_with_processes_exited(self, mock_print, mock_datetime) -> None:
+        # Mock
+        self._configuration.target_mode = 'all'
+        self.create_reattach_monitoring()
+        mock_datetime.now = MagicMock(return_value=datetime(2024, 2, 10, 17, 1, 2))
+        self._process_monitoring._group = MagicMock()
+        self._process_monitoring._group.collect = MagicMock(return_value=[])
+
+        # Run
+        self._process_monitoring._process_metrics()
+
+        # Assert
+        row = self._process_monitoring._samples.last()
+        self.assertEqual(-1, row['pid'])
+        self.assertEqual('exited', row['memory_tier'])
+        self.assertIsNotNone(self._process_monitoring._reattach_at)
+
+    @patch('supplier.process_monitoring.datetime', wrapper=datetime)
+    @patch('builtins.print')
+    def test_process_exits(self, mock_print, mock_datetime) -> None:
+        # Mock
+        self.create_reattach_monitoring()
+        mock_datetime.now = MagicMock(return_value=datetime(2024, 2, 10, 17, 1, 2))
+        self._process_monitoring._resolver.resolve = MagicMock(return_value=[])
+        # A zombie reports zeros until reaped by its parent
+        zombie = MagicMock()
+        zombie.pid = 1234
+        zombie.cpu_percent = MagicMock(return_value=0.0)
+        zombie.num_fds = MagicMock(return_value=0)
+        zombie.memory_full_info = MagicMock(return_value=MagicMock(rss=0, uss=0))
+        self._process_monitoring._process = zombie
+
+        # Run
+        self._process_monitoring.process_exits([1234])
+        self._process_monitoring._process_metrics()
+
+        # Assert
+        zombie.cpu_percent.assert_not_called()
+        self.assertEqual(1, len(self._process_monitoring._samples))
+        self.assertEqual('exited', self._process_monitoring._samples.last()['memory_tier'])
+        self.assertEqual(0, self._process_monitoring._aggregates.count)
+        self.assertIsNone(self._process_monitoring._process)
+
+    def test_process_exits_without_reattach(self) -> None:
+        self._process_monitoring._process = MagicMock(pid=1234)
+
+        with self.assertRaises(RuntimeError):
+            self._process_monitoring.process_exits([1234])
+
+    def test_process_exits_of_group_member(self) -> None:
+        # Mock
+        self._configuration.target_mode = 'all'
+        self.create_reattach_monitoring()
+        self._process_monitoring._group = MagicMock()
+        self._process_monitoring._group.__len__ = MagicMock(return_value=1)
+
+        # Run
+        self._process_monitoring.process_exits([11])
+
+        # Assert
+        self._process_monitoring._group.remove.assert_called_once_with([11])
+        self.assertEqual(0, len(self._process_monitoring._samples))
+        self.assertIsNone(self._process_monitoring._reattach_at)
+    # endregion
+
     # region _has_potential_memory_leak
     def test_has_potential_memory_leak_with_too_few_samples(self) -> None:
-        self._process_monitoring._dataframe = pd.DataFrame(
-            columns=['timestamp', 'cpu_percent', 'private_memory', 'handles_fds'],
-            data=np.array([
-                (None, 0, 1000, 0),
-                (None, 0, 2000, 0),
-                (None, 0, 3000, 0),
-                (None, 0, 4000, 0),
-                (None, 0, 5000, 0),
-                (None, 0, 6000, 0),
-                (None, 0, 7000, 0),
-                (None, 0, 8000, 0),
-                (None, 0, 9000, 0),
-            ])
-        )
+        self.append_samples([
+            (None, 0, 1000, 0),
+            (None, 0, 2000, 0),
+            (None, 0, 3000, 0),
+            (None, 0, 4000, 0),
+            (None, 0, 5000, 0),
+            (None, 0, 6000, 0),
+            (None, 0, 7000, 0),
+            (None, 0, 8000, 0),
+            (None, 0, 9000, 0),
+        ])
         self.assertFalse(self._process_monitoring._has_potential_memory_leak())
     
     def test_has_potential_memory_leak_with_constant_value(self) -> None:
-        self._process_monitoring._dataframe = pd.DataFrame(
-            columns=['timestamp', 'cpu_percent', 'private_memory', 'handles_fds'],
-            data=np.array([
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0)
-            ])
-        )
+        self.append_samples([
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0)
+        ])
         self.assertFalse(self._process_monitoring._has_potential_memory_leak())
 
     def test_has_potential_memory_leak_with_partial_increase_trend(self) -> None:
-        self._process_monitoring._dataframe = pd.DataFrame(
-            columns=['timestamp', 'cpu_percent', 'private_memory', 'handles_fds'],
-            data=np.array([
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 1000, 0),
-                (None, 0, 2000, 0),
-                (None, 0, 3000, 0),
-                (None, 0, 4000, 0),
-                (None, 0, 5000, 0)
-            ])
-        )
+        self.append_samples([
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 1000, 0),
+            (None, 0, 2000, 0),
+            (None, 0, 3000, 0),
+            (None, 0, 4000, 0),
+            (None, 0, 5000, 0)
+        ])
         self.assertFalse(self._process_monitoring._has_potential_memory_leak())
 
     def test_has_potential_memory_leak_with_increase_trend(self) -> None:
-        self._process_monitoring._dataframe = pd.DataFrame(
-            columns=['timestamp', 'cpu_percent', 'private_memory', 'handles_fds'],
-            data=np.array([
-                (None, 0, 1000, 0),
-                (None, 0, 2000, 0),
-                (None, 0, 2000, 0),
-                (None, 0, 2000, 0),
-                (None, 0, 3000, 0),
-                (None, 0, 4000, 0),
-                (None, 0, 5000, 0),
-                (None, 0, 6000, 0),
-                (None, 0, 7000, 0),
-                (None, 0, 8000, 0),
-                (None, 0, 9000, 0),
-                (None, 0, 9000, 0)
-            ])
-        )
+        self.append_samples([
+            (None, 0, 1000, 0),
+            (None, 0, 2000, 0),
+            (None, 0, 2000, 0),
+            (None, 0, 2000, 0),
+            (None, 0, 3000, 0),
+            (None, 0, 4000, 0),
+            (None, 0, 5000, 0),
+            (None, 0, 6000, 0),
+            (None, 0, 7000, 0),
+            (None, 0, 8000, 0),
+            (None, 0, 9000, 0),
+            (None, 0, 9000, 0)
+        ])
         self.assertTrue(self._process_monitoring._has_potential_memory_leak())
     
     def test_has_potential_memory_leak_without_increase_trend(self) -> None:
-        self._process_monitoring._dataframe = pd.DataFrame(
-            columns=['timestamp', 'cpu_percent', 'private_memory', 'handles_fds'],
-            data=np.array([
-                (None, 0, 1000, 0),
-                (None, 0, 2000, 0),
-                (None, 0, 2000, 0),
-                (None, 0, 2000, 0),
-                (None, 0, 3000, 0),
-                (None, 0, 4000, 0),
-                (None, 0, 3000, 0),
-                (None, 0, 6000, 0),
-                (None, 0, 7000, 0),
-                (None, 0, 8000, 0),
-                (None, 0, 9000, 0),
-                (None, 0, 9000, 0)
-            ])
-        )
+        self.append_samples([
+            (None, 0, 1000, 0),
+            (None, 0, 2000, 0),
+            (None, 0, 2000, 0),
+            (None, 0, 2000, 0),
+            (None, 0, 3000, 0),
+            (None, 0, 4000, 0),
+            (None, 0, 3000, 0),
+            (None, 0, 6000, 0),
+            (None, 0, 7000, 0),
+            (None, 0, 8000, 0),
+            (None, 0, 9000, 0),
+            (None, 0, 9000, 0)
+        ])
         self.assertFalse(self._process_monitoring._has_potential_memory_leak())
+
+    def test_has_potential_memory_leak_with_small_dip(self) -> None:
+        self.append_samples([
+            (None, 0, 1000, 0),
+            (None, 0, 2000, 0),
+            (None, 0, 3000, 0),
+            (None, 0, 4000, 0),
+            (None, 0, 5000, 0),
+            (None, 0, 4990, 0),  # Less than 1% decrease, e.g. a garbage collection
+            (None, 0, 6000, 0),
+            (None, 0, 7000, 0),
+            (None, 0, 8000, 0),
+            (None, 0, 9000, 0),
+            (None, 0, 10000, 0),
+            (None, 0, 11000, 0)
+        ])
+        self.assertTrue(self._process_monitoring._has_potential_memory_leak())
+    # endregion
+
+    # region _summarize
+    @patch('builtins.print')
+    def test_summarize(self, mock_print) -> None:
+        self.append_samples([
+            (None, 10.0, 10485760, 100),
+            (None, 20.0, 20971520, 200),
+            (None, 30.0, 31457280, 300),
+        ])
+
+        self._process_monitoring._summarize()
+
+        mock_print.assert_has_calls(calls=[
+            call('Summary of 3 samples for pycharm'),
+            call('CPU %:        avg 20.0, min 10.0, max 30.0, std 10.0, p50 19.89, p95 30.0, p99 30.0'),
+            call('Memory:       avg 20.0 MB, min 10.0 MB, max 30.0 MB, p50 19.84 MB, p95 30.0 MB, p99 30.0 MB'),
+            call('Handle / FDS: avg 200, min 100, max 300, p50 198, p95 300, p99 300'),
+            call('Memory trend: +35.16 GB per hour (confidence 1.0)'),
+            call('Resolution:   0.0 ms by name'),
+        ])
+
+    @patch('builtins.print')
+    def test_summarize_without_samples(self, mock_print) -> None:
+        self._process_monitoring._summarize()
+
+        mock_print.assert_not_called()
+
+    @patch('builtins.print')
+    def test_finalize_writes_the_summary_to_the_console(self, mock_print) -> None:
+        # Mock
+        self._process_monitoring._persist = MagicMock()
+        self.append_samples([(None, 10.0, 10485760, 100)])
+        console = MagicMock()
+
+        # Run
+        self._process_monitoring.finalize(console)
+
+        # Assert
+        mock_print.assert_not_called()
+        lines = console.write.call_args.args[0]
+        self.assertEqual('Summary of 1 samples for pycharm', lines[0])
     # endregion
 
     # region _persist
     def test_persist(self) -> None:
         # Mock
-        self._process_monitoring._dataframe = MagicMock()
-        self._process_monitoring._dataframe.to_csv = MagicMock()
+        self._process_monitoring._writer = MagicMock()
         
         # Run
         self._process_monitoring._persist()
         
         # Assert
-        self._process_monitoring._dataframe.to_csv.assert_called_once_with(
-            path_or_buf=Path('output/reports/pycharm_20240210170102.csv'),
-            index=False
+        self._process_monitoring._writer.flush.assert_called_once_with(self._process_monitoring._samples)
+        self._process_monitoring._writer.close.assert_called_once_with()
+
+    def test_persist_sketches(self) -> None:
+        # Mock
+        self._process_monitoring._writer = MagicMock()
+        self.append_samples([(None, 10.0, 10485760, 100), (None, 0.0, 20971520, 200)])
+
+        # Run
+        with tempfile.TemporaryDirectory() as directory:
+            self._configuration.reports_directory = Path(directory)
+            self._process_monitoring._persist()
+            sketches = load_sketches([self._configuration.sketches_report_path] * 2)
+
+        # Assert
+        self.assertEqual(['cpu_percent', 'private_memory', 'handles_fds'], list(sketches))
+        self.assertEqual(4, sketches['cpu_percent'].count)
+        self.assertEqual([0.0, 10.0], sketches['cpu_percent'].percentiles([50, 99]))
+
+    def test_scheduled_process_metrics_writes_pending_samples(self) -> None:
+        # Mock
+        self._process_monitoring._process_metrics = MagicMock()
+        self._process_monitoring._writer = MagicMock()
+
+        # Run
+        self._process_monitoring.sample(lateness=0.1)
+
+        # Assert
+        self.assertEqual(0.1, self._process_monitoring._lateness)
+        self._process_monitoring._process_metrics.assert_called_once_with()
+        self._process_monitoring._writer.write_pending.assert_called_once_with(self._process_monitoring._samples)
+
+    def test_writer(self) -> None:
+        self.assertIsInstance(self._process_monitoring._writer, CsvReportWriter)
+        self.assertEqual(Path('output/reports/pycharm_20240210170102.csv'), self._process_monitoring._writer.path)
+
+    def test_writer_with_npcol_format(self) -> None:
+        self._configuration.report_format = 'npcol'
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+
+        self.assertIsInstance(self._process_monitoring._writer, NpcolReportWriter)
+        self.assertEqual(Path('output/reports/pycharm_20240210170102.npcol'), self._process_monitoring._writer.path)
+    # endregion
+
+    # region _roll_up
+    def create_daemon_monitoring(self) -> None:
+        self._configuration.daemon = True
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        for resolution, (rollup, samples, writer) in self._process_monitoring._rollups.items():
+            self._process_monitoring._rollups[resolution] = (rollup, samples, MagicMock())
+
+    def test_daemon_writers(self) -> None:
+        self._configuration.daemon = True
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+
+        self.assertIsNone(self._process_monitoring.create_scheduler()._duration)
+        self.assertEqual(3600, self._process_monitoring._writer._rotate_interval)
+        self.assertEqual(1, self._process_monitoring._writer._max_rotations)
+        self.assertEqual(
+            [Path('output/reports/pycharm_20240210170102_1m.csv'), Path('output/reports/pycharm_20240210170102_1h.csv')],
+            [writer.path for _, _, writer in self._process_monitoring._rollups.values()]
+        )
+
+    def test_store_sample_rolls_up(self) -> None:
+        self.create_daemon_monitoring()
+
+        self.append_samples([
+            (datetime(2024, 2, 10, 17, 1, 2), 2.0, 100, 10),
+            (datetime(2024, 2, 10, 17, 1, 32), 4.0, 300, 12),
+            (datetime(2024, 2, 10, 17, 2, 2), 6.0, 200, 14),
+        ])
+
+        _, samples, writer = self._process_monitoring._rollups['1m']
+        writer.flush.assert_called_once_with(samples)
+        row = samples.last()
+        self.assertEqual(2, row['count'])
+        self.assertEqual(3.0, row['cpu_percent_mean'])
+        self.assertEqual(300, row['private_memory_max'])
+        self._process_monitoring._rollups['1h'][2].flush.assert_not_called()
+
+    def test_persist_flushes_rollups(self) -> None:
+        self.create_daemon_monitoring()
+        self._process_monitoring._writer = MagicMock()
+        self._process_monitoring._persist_sketches = MagicMock()
+        self.append_samples([(datetime(2024, 2, 10, 17, 1, 2), 2.0, 100, 10)])
+
+        self._process_monitoring._persist()
+
+        for _, samples, writer in self._process_monitoring._rollups.values():
+            self.assertEqual(1, len(samples))
+            writer.flush.assert_called_once_with(samples)
+            writer.close.assert_called_once_with()
+    # endregion
+
+    # region instrumentation
+    def test_instrumentation_disabled(self) -> None:
+        self.assertIsNone(self._process_monitoring._instrumentation)
+        self.assertNotIn('_collect_metrics', vars(self._process_monitoring))
+        self.assertNotIn('update', vars(self._process_monitoring._leak_detector))
+
+    @patch('builtins.print')
+    @patch('supplier.process_monitoring.datetime')
+    def test_instrumentation(self, mock_datetime, mock_print) -> None:
+        # Mock
+        self._configuration.instrumentation = True
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        instrumentation = self._process_monitoring._instrumentation
+        self._process_monitoring._writer.flush = instrumentation.wrap_persist(MagicMock())
+        self._process_monitoring._process = MagicMock(pid=1234)
+        self._process_monitoring._process.cpu_percent.return_value = 10.0
+        self._process_monitoring._process.memory_full_info.return_value = MagicMock(uss=1024)
+        self._process_monitoring._process.num_fds.return_value = 5
+        self._process_monitoring._is_running_on_windows = False
+        mock_datetime.now.return_value = datetime(2024, 2, 10, 17, 1, 2)
+
+        # Run
+        self._process_monitoring.sample(0.002)
+        self._process_monitoring.sample(0.004)
+        self.render()
+        self._process_monitoring._writer.flush(self._process_monitoring._samples)
+
+        # Assert
+        self.assertEqual([2, 2, 2, 2, 1], [instrumentation[stage].count for stage in STAGES])
+        self.assertAlmostEqual(0.003, instrumentation.lateness.mean)
+
+    def test_instrumentation_after_reattach(self) -> None:
+        self._configuration.instrumentation = True
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+
+        self._process_monitoring._leak_detector = self._process_monitoring._create_leak_detector()
+        self._process_monitoring._leak_detector.update(value=100, elapsed=1.0)
+
+        self.assertEqual(1, self._process_monitoring._instrumentation['leak'].count)
+
+    @patch('builtins.print')
+    def test_persist_and_summarize_overhead(self, mock_print) -> None:
+        # Mock
+        self._configuration.instrumentation = True
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        self._process_monitoring._writer = MagicMock()
+        self._process_monitoring._persist_sketches = MagicMock()
+        self._process_monitoring._instrumentation = MagicMock()
+        self._process_monitoring._instrumentation.write.return_value = {
+            'stages': {
+                'collect': {'count': 2, 'mean_ms': 0.05},
+                'aggregate': {'count': 2, 'mean_ms': 0.01},
+                'leak': {'count': 0, 'mean_ms': None},
+            },
+            'lateness': {'mean_ms': 0.2, 'max_ms': 0.3, 'std_ms': 0.1},
+            'busy_percent': 0.12,
+            'cpu_percent': 0.5,
+            'rss_bytes': 31457280,
+            'peak_rss_bytes': 41943040,
+        }
+        self.append_samples([(None, 10.0, 10485760, 100)])
+
+        # Run
+        self._process_monitoring._persist()
+        self._process_monitoring._summarize()
+
+        # Assert
+        self._process_monitoring._instrumentation.write.assert_called_once_with(
+            Path('output/reports/pycharm_20240210170102_overhead.json'))
+        mock_print.assert_has_calls(calls=[
+            call('Overhead:     0.12 % of the time, mean per call collect 0.05 ms, aggregate 0.01 ms'),
+            call('Jitter:       avg 0.2 ms, max 0.3 ms, std 0.1 ms'),
+            call('Monitor:      CPU 0.5 %, memory 30.0 MB, peak 40.0 MB'),
+        ])
+    # endregion
+
+    # region snapshot
+    def test_snapshot_is_built_once_per_sample(self) -> None:
+        # Mock
+        self._process_monitoring._aggregates.percentiles = MagicMock(return_value={})
+
+        # Run
+        self.append_samples([(None, 10.0, 10485760, 100)])
+        self._process_monitoring._publish(self._process_monitoring._samples.last())
+        first = self._process_monitoring.snapshot()
+        second = self._process_monitoring.snapshot()
+        self.append_samples([(None, 20.0, 20971520, 200)])
+        self._process_monitoring._publish(self._process_monitoring._samples.last())
+        third = self._process_monitoring.snapshot()
+
+        # Assert
+        self.assertIs(first, second)
+        self.assertEqual(1, first.count)
+        self.assertAlmostEqual(10.0, first.averages['cpu_percent'])
+        self.assertEqual(2, third.count)
+        self.assertAlmostEqual(15.0, third.averages['cpu_percent'])
+        self.assertEqual(2, self._process_monitoring._aggregates.percentiles.call_count)
+
+    def test_snapshot_during_sample(self) -> None:
+        # Mock
+        self.append_samples([(None, 10.0, 10485760, 100)])
+        self._process_monitoring._publish(self._process_monitoring._samples.last())
+
+        # Run
+        with self._process_monitoring._lock:
+            snapshot = self._process_monitoring.snapshot()
+
+        # Assert
+        self.assertEqual(1, snapshot.count)
+
+    def test_snapshot_without_reader(self) -> None:
+        # Mock
+        self._configuration.console = 'quiet'
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        self._process_monitoring._aggregates.percentiles = MagicMock()
+
+        # Run
+        self.append_samples([(None, 10.0, 10485760, 100)])
+        self._process_monitoring._publish(self._process_monitoring._samples.last())
+
+        # Assert
+        self.assertIsNone(self._process_monitoring.snapshot())
+        self._process_monitoring._aggregates.percentiles.assert_not_called()
+    # endregion
+
+    # region threads
+    def create_threads_monitoring(self, target_mode: str = 'first') -> None:
+        self._configuration.top_threads = 2
+        self._configuration.target_mode = target_mode
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        self._process_monitoring._thread_collector = MagicMock(wraps=self._process_monitoring._thread_collector)
+
+    def test_threads_disabled(self) -> None:
+        self.assertIsNone(self._process_monitoring._thread_collector)
+        self.assertNotIn('thread_1_tid', self._process_monitoring._samples.columns)
+
+    @patch('supplier.process_monitoring.datetime', wrapper=datetime)
+    @patch('builtins.print')
+    def test_process_metrics_with_threads(self, mock_print, mock_datetime) -> None:
+        # Mock
+        mock_datetime.now = MagicMock(return_value=datetime(2024, 2, 10, 17, 1, 2))
+        self.create_threads_monitoring()
+        self._process_monitoring._thread_collector.collect.return_value = [(1235, 80.5)]
+        self._process_monitoring._process = MagicMock(pid=1234)
+        self._process_monitoring._process.cpu_percent.return_value = 90.0
+        self._process_monitoring._process.memory_full_info.return_value = MagicMock(uss=1024)
+        self._process_monitoring._process.num_fds.return_value = 5
+        self._process_monitoring._is_running_on_windows = False
+
+        # Run
+        self._process_monitoring._process_metrics()
+
+        # Assert
+        row = self._process_monitoring._samples.last()
+        self.assertEqual(1235, row['thread_1_tid'])
+        self.assertEqual(80.5, row['thread_1_cpu_percent'])
+        self.assertEqual(-1, row['thread_2_tid'])
+        self.assertTrue(pd.isna(row['thread_2_cpu_percent']))
+        self._process_monitoring._thread_collector.collect.assert_called_once_with(
+            self._process_monitoring._process)
+
+    @patch('supplier.process_monitoring.datetime', wrapper=datetime)
+    @patch('builtins.print')
+    def test_process_group_metrics_with_threads(self, mock_print, mock_datetime) -> None:
+        # Mock
+        mock_datetime.now = MagicMock(return_value=datetime(2024, 2, 10, 17, 1, 2))
+        self.create_threads_monitoring(target_mode='all')
+        self._process_monitoring._thread_collector.busiest.return_value = [(12, 40.0), (10, 5.0)]
+        self._process_monitoring._group = MagicMock(pids=[10, 11])
+        self._process_monitoring._group.collect = MagicMock(return_value=[
+            {'pid': 10, 'cpu_percent': 10.0, 'private_memory': 100, 'handles_fds': 1, 'memory_tier': 'full',
+             'thread_1_tid': 10, 'thread_1_cpu_percent': 5.0, 'thread_2_tid': -1, 'thread_2_cpu_percent': float('nan')},
+            {'pid': 11, 'cpu_percent': 40.0, 'private_memory': 100, 'handles_fds': 1, 'memory_tier': 'full',
+             'thread_1_tid': 12, 'thread_1_cpu_percent': 40.0, 'thread_2_tid': -1, 'thread_2_cpu_percent': float('nan')},
+        ])
+
+        # Run
+        self._process_monitoring._process_metrics()
+
+        # Assert
+        row = self._process_monitoring._samples.last()
+        self.assertEqual(-1, row['pid'])
+        self.assertEqual([12, 40.0, 10, 5.0], [row['thread_1_tid'], row['thread_1_cpu_percent'],
+                                               row['thread_2_tid'], row['thread_2_cpu_percent']])
+        self.assertEqual([10, 11], list(self._process_monitoring._thread_collector.busiest.call_args.args[0]))
+        self._process_monitoring._thread_collector.retain.assert_called_once_with([10, 11])
+
+    @patch('supplier.process_monitoring.datetime', wrapper=datetime)
+    @patch('builtins.print')
+    def test_process_exited_with_threads(self, mock_print, mock_datetime) -> None:
+        # Mock
+        mock_datetime.now = MagicMock(return_value=datetime(2024, 2, 10, 17, 1, 2))
+        self._configuration.reattach = True
+        self.create_threads_monitoring()
+        self._process_monitoring._writer = MagicMock()
+        self._process_monitoring._process = MagicMock(pid=1234)
+        self._process_monitoring._process.cpu_percent = MagicMock(side_effect=NoSuchProcess(1234))
+
+        # Run
+        self._process_monitoring._process_metrics()
+
+        # Assert
+        row = self._process_monitoring._samples.last()
+        self.assertEqual('exited', row['memory_tier'])
+        self.assertEqual(-1, row['thread_1_tid'])
+        self.assertTrue(pd.isna(row['thread_1_cpu_percent']))
+    # endregion
+
+    # region collectors
+    def test_collectors_disabled(self) -> None:
+        self.assertEqual([], self._process_monitoring._collectors)
+        self.assertEqual(COLUMNS, self._process_monitoring._samples.columns)
+
+    @patch('supplier.process_monitoring.datetime', wrapper=datetime)
+    @patch('builtins.print')
+    def test_process_metrics_with_collectors(self, mock_print, mock_datetime) -> None:
+        # Mock
+        mock_datetime.now = MagicMock(return_value=datetime(2024, 2, 10, 17, 1, 2))
+        self._configuration.collectors = ['threads', 'ctx_switches']
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        self._process_monitoring._process = MagicMock(pid=1234)
+        self._process_monitoring._process.cpu_percent.return_value = 10.0
+        self._process_monitoring._process.memory_full_info.return_value = MagicMock(uss=1024)
+        self._process_monitoring._process.num_fds.return_value = 5
+        self._process_monitoring._process.num_threads.return_value = 12
+        self._process_monitoring._process.num_ctx_switches.return_value = MagicMock(voluntary=30, involuntary=4)
+        self._process_monitoring._is_running_on_windows = False
+
+        # Run
+        self._process_monitoring._process_metrics()
+
+        # Assert
+        self.assertEqual(COLUMNS + ['ctx_switches_voluntary', 'ctx_switches_involuntary', 'num_threads'],
+                         self._process_monitoring._samples.columns)
+        row = self._process_monitoring._samples.last()
+        self.assertEqual([30, 4, 12], [row['ctx_switches_voluntary'], row['ctx_switches_involuntary'],
+                                       row['num_threads']])
+        self._process_monitoring._process.io_counters.assert_not_called()
+        self._process_monitoring._process.connections.assert_not_called()
+
+    @patch('supplier.process_monitoring.datetime', wrapper=datetime)
+    @patch('builtins.print')
+    def test_process_group_metrics_with_collectors(self, mock_print, mock_datetime) -> None:
+        # Mock
+        mock_datetime.now = MagicMock(return_value=datetime(2024, 2, 10, 17, 1, 2))
+        self._configuration.collectors = ['threads']
+        self._configuration.target_mode = 'all'
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        self._process_monitoring._group = MagicMock()
+        self._process_monitoring._group.collect = MagicMock(return_value=[
+            {'pid': 10, 'cpu_percent': 1.0, 'private_memory': 100, 'handles_fds': 1, 'memory_tier': 'full',
+             'num_threads': 3},
+            {'pid': 11, 'cpu_percent': 2.0, 'private_memory': 200, 'handles_fds': 2, 'memory_tier': 'full',
+             'num_threads': 4},
+        ])
+
+        # Run
+        self._process_monitoring._process_metrics()
+
+        # Assert
+        row = self._process_monitoring._samples.last()
+        self.assertEqual(-1, row['pid'])
+        self.assertEqual(7, row['num_threads'])
+
+    @patch('supplier.process_monitoring.datetime', wrapper=datetime)
+    @patch('builtins.print')
+    def test_process_exited_with_collectors(self, mock_print, mock_datetime) -> None:
+        # Mock
+        mock_datetime.now = MagicMock(return_value=datetime(2024, 2, 10, 17, 1, 2))
+        self._configuration.collectors = ['threads']
+        self.create_reattach_monitoring()
+        self._process_monitoring._process = MagicMock(pid=1234)
+        self._process_monitoring._process.cpu_percent = MagicMock(side_effect=NoSuchProcess(1234))
+
+        # Run
+        self._process_monitoring._process_metrics()
+
+        # Assert
+        row = self._process_monitoring._samples.last()
+        self.assertEqual('exited', row['memory_tier'])
+        self.assertEqual(0, row['num_threads'])
+    # endregion
+
+    # region adaptive sampling
+    def test_adaptive_sampling_disabled(self) -> None:
+        self.assertIsNone(self._process_monitoring._adaptive_interval)
+        self.assertIsNone(self._process_monitoring.create_scheduler()._next_interval)
+
+    @patch('builtins.print')
+    def test_adaptive_sampling(self, mock_print) -> None:
+        # Mock
+        self._configuration.adaptive_sampling = True
+        self._configuration.daemon = True
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        rows = [
+            (datetime(2024, 2, 10, 17, 1, 2), 5.0, 1000, 5),
+            (datetime(2024, 2, 10, 17, 1, 3), 5.0, 1000, 5),
+            (datetime(2024, 2, 10, 17, 1, 4), 95.0, 1000, 5),
+        ]
+
+        # Run
+        intervals = []
+        for row in rows:
+            self.append_samples([row])
+            intervals.append(self._process_monitoring.create_scheduler()._next_interval())
+
+        # Assert
+        self.assertEqual([1.0, 1.25, 0.625], intervals)
+        # Weighted by the interval covering each sample: 1, 1 and 1.25
+        mean = (5.0 + 5.0 + 95.0 * 1.25) / 3.25
+        self.assertAlmostEqual(mean, self._process_monitoring._aggregates['cpu_percent'].mean)
+        self.assertEqual(3, self._process_monitoring._aggregates.count)
+        self.assertAlmostEqual(mean, self._process_monitoring._rollups['1m'][0].flush()['cpu_percent_mean'])
+
+    def test_adaptive_sampling_on_memory_leak(self) -> None:
+        # Mock
+        self._configuration.adaptive_sampling = True
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        self._process_monitoring._leak_detector = MagicMock(is_leaking=False)
+        self.append_samples([(datetime(2024, 2, 10, 17, 1, 2), 5.0, 1000, 5)])
+
+        # Run
+        self._process_monitoring._leak_detector.is_leaking = True
+        self.append_samples([(datetime(2024, 2, 10, 17, 1, 3), 5.0, 1000, 5)])
+        first_interval = self._process_monitoring._adaptive_interval.interval
+        self.append_samples([(datetime(2024, 2, 10, 17, 1, 3), 5.0, 1000, 5)])
+
+        # Assert
+        self.assertEqual(0.25, first_interval)
+        self.assertEqual(0.3125, self._process_monitoring._adaptive_interval.interval)
+
+    @patch('builtins.print')
+    def test_summarize_adaptive_sampling(self, mock_print) -> None:
+        self._configuration.adaptive_sampling = True
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        self.append_samples([(datetime(2024, 2, 10, 17, 1, 2), 5.0, 1000, 5)])
+
+        self._process_monitoring._summarize()
+
+        mock_print.assert_any_call('Sampling:     adaptive from 0.25 to 4 s, shortened 0 times')
+    # endregion
+
+    # region trends
+    def test_trends_disabled(self) -> None:
+        self.assertIsNone(self._process_monitoring._trend_detector)
+
+    @patch('builtins.print')
+    def test_trends(self, mock_print) -> None:
+        # Mock
+        self._configuration.trend_detection = True
+        self._process_monitoring = ProcessMonitoring(configuration=self._configuration)
+        start = datetime(2024, 2, 10, 17, 1, 2)
+
+        # Run
+        with self.assertLogs(level='WARNING') as logs:
+            for index in range(120):
+                # One more file descriptor every 10 seconds, the memory is stable
+                self.append_samples([(start + timedelta(seconds=index), 5.0 + index % 3, 1000, 5 + index // 10)])
+        self._process_monitoring._summarize()
+
+        # Assert
+        self.assertEqual(1, len(logs.records))
+        self.assertIn('Potential leak of pycharm: handles_fds increasing', logs.output[0])
+        self.assertEqual('stable', self._process_monitoring._trends['private_memory'].direction)
+        mock_print.assert_any_call(
+            'Trends:       cpu_percent stable (p 0.77), private_memory stable (p 1), '
+            'handles_fds increasing +360.0 per hour (p 4.9e-51)'
         )
     # endregion
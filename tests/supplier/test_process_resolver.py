@@ -0,0 +1,131 @@
+import os
+import subprocess
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+import psutil
+from psutil import NoSuchProcess
+
+from supplier.process_resolver import ProcessResolver
+
+
+def mock_process(pid: int, name: str = None, cmdline: list = None, status: str = 'sleeping') -> MagicMock:
+    process = MagicMock()
+    process.pid = pid
+    process.info = {'name': name, 'cmdline': cmdline, 'status': status}
+    return process
+
+
+def wait_for_zombie(pid: int) -> None:
+    deadline = time.monotonic() + 5
+    while psutil.Process(pid).status() != psutil.STATUS_ZOMBIE and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestProcessResolver(unittest.TestCase):
+
+    def test_unknown_match_mode(self) -> None:
+        with self.assertRaises(RuntimeError):
+            ProcessResolver(match='user')
+
+    # region index
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_resolve_by_name(self, mock_psutil) -> None:
+        mock_psutil.process_iter = MagicMock(return_value=[
+            mock_process(30, 'gunicorn'), mock_process(12, 'bash'), mock_process(10, 'gunicorn'),
+            mock_process(13, None), mock_process(14, 'gunicorn', status=psutil.STATUS_ZOMBIE),
+        ])
+        resolver = ProcessResolver()
+
+        processes = resolver.resolve('gunicorn')
+
+        self.assertEqual([10, 30], [process.pid for process in processes])
+        mock_psutil.process_iter.assert_called_once_with(attrs=['name', 'status'])
+        self.assertGreater(resolver.elapsed, 0)
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_resolve_by_regex(self, mock_psutil) -> None:
+        mock_psutil.process_iter = MagicMock(return_value=[
+            mock_process(10, 'python3.11'), mock_process(11, 'python'), mock_process(12, 'ipython'),
+        ])
+
+        processes = ProcessResolver(match='regex').resolve(r'python[\d.]*')
+
+        self.assertEqual([10, 11], [process.pid for process in processes])
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_resolve_by_cmdline(self, mock_psutil) -> None:
+        mock_psutil.process_iter = MagicMock(return_value=[
+            mock_process(10, cmdline=['python', 'manage.py', 'runserver']),
+            mock_process(11, cmdline=['python', 'worker.py']),
+            mock_process(12, cmdline=None),
+        ])
+
+        processes = ProcessResolver(match='cmdline').resolve('manage.py runserver')
+
+        self.assertEqual([10], [process.pid for process in processes])
+        mock_psutil.process_iter.assert_called_once_with(attrs=['cmdline', 'status'])
+    # endregion
+
+    # region pid
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_resolve_excludes_the_monitoring(self, mock_psutil) -> None:
+        # Mock
+        mock_psutil.Process = MagicMock(return_value=MagicMock(parents=MagicMock(return_value=[mock_process(7)])))
+        mock_psutil.process_iter = MagicMock(return_value=[
+            mock_process(7, cmdline=['bash', '-c', 'python main.py -p e2e/w --match cmdline']),
+            mock_process(os.getpid(), cmdline=['python', 'main.py', '-p', 'e2e/w', '--match', 'cmdline']),
+            mock_process(40, cmdline=['python', 'e2e/worker.py']),
+        ])
+        resolver = ProcessResolver(match='cmdline')
+
+        # Run
+        processes = resolver.resolve('e2e/w')
+
+        # Assert
+        self.assertEqual([40], [process.pid for process in processes])
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_resolve_by_pid(self, mock_psutil) -> None:
+        mock_psutil.Process = MagicMock(side_effect=[MagicMock(pid=1234), NoSuchProcess(1235)])
+        resolver = ProcessResolver(match='pid')
+
+        self.assertEqual([1234], [process.pid for process in resolver.resolve('1234')])
+        self.assertEqual([], resolver.resolve('1235'))
+        mock_psutil.process_iter.assert_not_called()
+
+    def test_resolve_by_pid_of_zombie(self) -> None:
+        # Exited but not reaped yet by its parent
+        child = subprocess.Popen(['true'])
+        try:
+            wait_for_zombie(child.pid)
+
+            self.assertEqual([], ProcessResolver(match='pid').resolve(str(child.pid)))
+        finally:
+            child.wait()
+
+    def test_resolve_by_invalid_pid(self) -> None:
+        with self.assertRaisesRegex(RuntimeError, 'Invalid pid pycharm'):
+            ProcessResolver(match='pid').resolve('pycharm')
+
+    @patch('supplier.process_resolver.psutil', wrapper=psutil)
+    def test_resolve_by_pidfile(self, mock_psutil) -> None:
+        mock_psutil.Process = MagicMock(return_value=MagicMock(pid=1234))
+        resolver = ProcessResolver(match='pidfile')
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath('nginx.pid')
+            self.assertEqual([], resolver.resolve(str(path)))
+
+            path.write_text('1234\n')
+            self.assertEqual([1234], [process.pid for process in resolver.resolve(str(path))])
+
+        mock_psutil.Process.assert_called_once_with(1234)
+    # endregion
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch, MagicMock
+
+import psutil
+from psutil import AccessDenied, NoSuchProcess
+
+from supplier.procfs_process import ProcfsProcess, is_procfs_available, parse_smaps_rollup
+
+SMAPS_ROLLUP = b'''55d0c6a00000-7ffd2b5fe000 ---p 00000000 00:00 0                          [rollup]
+Rss:               20480 kB
+Pss:               12288 kB
+Private_Clean:      2048 kB
+Private_Dirty:     14336 kB
+Private_Hugetlb:    1024 kB
+'''
+
+
+class TestParseSmapsRollup(unittest.TestCase):
+
+    def test_parse_smaps_rollup(self) -> None:
+        self.assertEqual((20971520, 17825792, 12582912), parse_smaps_rollup(SMAPS_ROLLUP))
+
+
+@unittest.skipUnless(is_procfs_available(), 'procfs is only available on Linux')
+class TestProcfsProcess(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._child = subprocess.Popen([sys.executable, '-c', 'import time; print("ready", flush=True); time.sleep(30)'],
+                                       stdout=subprocess.PIPE)
+        # Waiting for the interpreter startup so the memory does not change during the test
+        self._child.stdout.readline()
+        self._process = ProcfsProcess(self._child.pid)
+        self._expected = psutil.Process(self._child.pid)
+
+    def tearDown(self) -> None:
+        self._process.close()
+        self._child.kill()
+        self._child.wait()
+        if not self._child.stdout.closed:
+            self._child.stdout.close()
+
+    def test_metrics_same_as_psutil(self) -> None:
+        self.assertEqual(self._expected.memory_info().rss, self._process.memory_info().rss)
+        self.assertEqual(self._expected.memory_info().vms, self._process.memory_info().vms)
+        self.assertEqual(self._expected.num_fds(), self._process.num_fds())
+        self.assertEqual(self._expected.name(), self._process.name())
+        self.assertTrue(self._process.is_running())
+
+    @unittest.skipUnless(os.path.exists('/proc/self/smaps_rollup'), 'smaps_rollup is not available')
+    def test_smaps_rollup_same_as_psutil(self) -> None:
+        rss, uss, pss = self._process.smaps_rollup()
+        expected = self._expected.memory_full_info()
+
+        self.assertEqual(expected.uss, uss)
+        self.assertEqual(expected.pss, pss)
+        self.assertGreaterEqual(rss, pss)
+        self.assertGreaterEqual(pss, uss)
+
+    def test_cpu_percent(self) -> None:
+        self.assertEqual(0.0, self._process.cpu_percent())
+        self.assertGreaterEqual(self._process.cpu_percent(), 0.0)
+
+    def test_threads_same_as_psutil(self) -> None:
+        threads = self._process.threads()
+        expected = self._expected.threads()
+
+        self.assertEqual([thread.id for thread in expected], [thread.id for thread in threads])
+        self.assertAlmostEqual(expected[0].user_time, threads[0].user_time, delta=0.05)
+        self.assertAlmostEqual(expected[0].system_time, threads[0].system_time, delta=0.05)
+
+    def test_stat_metrics(self) -> None:
+        minor, major = self._process.page_faults()
+
+        self.assertGreater(minor, 0)
+        self.assertGreaterEqual(major, 0)
+        self.assertEqual(self._expected.num_threads(), self._process.num_threads())
+        # The child may block once more between the two reads, when it starts sleeping
+        self.assertAlmostEqual(self._expected.num_ctx_switches().voluntary, self._process.num_ctx_switches().voluntary,
+                               delta=1)
+
+    def test_threads_reuses_file_descriptors(self) -> None:
+        self._process.threads()
+        fds = psutil.Process().num_fds()
+
+        self._process.threads()
+
+        self.assertEqual(fds, psutil.Process().num_fds())
+        self._process.close()
+        self.assertEqual(fds - 4, psutil.Process().num_fds())
+
+    def test_reuses_file_descriptors(self) -> None:
+        self._process.memory_info()
+        fds = psutil.Process().num_fds()
+
+        self._process.cpu_percent()
+        self._process.memory_info()
+        self._process.num_fds()
+
+        self.assertEqual(fds, psutil.Process().num_fds())
+
+    def test_process_not_running(self) -> None:
+        self._child.kill()
+        self._child.wait()
+
+        with self.assertRaises(NoSuchProcess):
+            self._process.cpu_percent()
+        with self.assertRaises(NoSuchProcess):
+            self._process.memory_info()
+        with self.assertRaises(NoSuchProcess):
+            self._process.num_fds()
+        with self.assertRaises(NoSuchProcess):
+            self._process.threads()
+
+    def test_init_with_process_not_running(self) -> None:
+        self._child.kill()
+        self._child.wait()
+
+        with self.assertRaises(NoSuchProcess):
+            ProcfsProcess(self._child.pid)
+
+    def test_init_with_process_exiting_while_opening(self) -> None:
+        # Mock
+        open_file = os.open
+        opened = []
+
+        def open_until_statm(path, flags):
+            if path.endswith('/statm'):
+                raise ProcessLookupError()
+            opened.append(open_file(path, flags))
+            return opened[-1]
+
+        # Run
+        with patch('supplier.procfs_process.os.open', side_effect=open_until_statm):
+            with self.assertRaises(NoSuchProcess):
+                ProcfsProcess(self._child.pid)
+
+        # Assert
+        self.assertEqual(1, len(opened))
+        with self.assertRaises(OSError):
+            os.fstat(opened[0])
+
+    def test_init_with_access_denied(self) -> None:
+        # Mock
+        open_file = os.open
+        opened = []
+
+        def open_until_statm(path, flags):
+            if path.endswith('/statm'):
+                raise PermissionError()
+            opened.append(open_file(path, flags))
+            return opened[-1]
+
+        # Run
+        with patch('supplier.procfs_process.os.open', side_effect=open_until_statm):
+            with self.assertRaises(AccessDenied):
+                ProcfsProcess(self._child.pid)
+
+        # Assert
+        self.assertEqual(1, len(opened))
+        with self.assertRaises(OSError):
+            os.fstat(opened[0])
+
+    def test_smaps_rollup_with_access_denied(self) -> None:
+        # Mock
+        open_file = os.open
+
+        def open_except_smaps_rollup(path, flags):
+            if path.endswith('/smaps_rollup'):
+                raise PermissionError()
+            return open_file(path, flags)
+
+        with patch('supplier.procfs_process.os.open', side_effect=open_except_smaps_rollup):
+            process = ProcfsProcess(self._child.pid)
+        process._process.memory_full_info = MagicMock(side_effect=AccessDenied(self._child.pid))
+
+        # Run
+        try:
+            with self.assertRaises(AccessDenied):
+                process.smaps_rollup()
+            memory = process.memory_info()
+        finally:
+            process.close()
+
+        # Assert
+        self.assertEqual(self._expected.memory_info().rss, memory.rss)
+
+    @patch('supplier.procfs_process.os.stat', MagicMock(side_effect=PermissionError()))
+    def test_num_fds_with_access_denied(self) -> None:
+        with self.assertRaises(AccessDenied):
+            self._process.num_fds()
+
+    def test_close(self) -> None:
+        self._child.stdout.close()
+        fds = psutil.Process().num_fds()
+
+        self._process.close()
+
+        self.assertEqual(fds - 3, psutil.Process().num_fds())
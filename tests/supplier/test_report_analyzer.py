@@ -0,0 +1,142 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from model.leak_detector import MemoryLeakDetector
+from model.sample_buffer import SampleBuffer
+from supplier.process_monitoring import GROUP_REPORT_COLUMNS, REPORT_COLUMNS
+from supplier.report_analyzer import analyze_report, analyze_reports, find_reports, merge_analyses
+from supplier.report_writer import CsvReportWriter, NpcolReportWriter
+
+
+class TestReportAnalyzer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = Path(self._directory.name)
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def write(self, name: str, rows: list, columns: dict = REPORT_COLUMNS) -> Path:
+        samples = SampleBuffer(columns=columns)
+        timestamp = datetime(2024, 2, 10, 17, 0, 0)
+        for index, row in enumerate(rows):
+            samples.append({'timestamp': timestamp + timedelta(seconds=index), 'memory_tier': 'full',
+                            'lateness': 0.0, **row})
+        path = self._path.joinpath(name)
+        if path.suffix == '.npcol':
+            writer = NpcolReportWriter(path=path, columns=samples.columns, dtypes=samples.dtypes)
+        else:
+            writer = CsvReportWriter(path=path, columns=samples.columns)
+        writer.flush(samples)
+        writer.close()
+        return path
+
+    def growing_rows(self, count: int) -> list:
+        return [{'cpu_percent': float(index % 10), 'private_memory': 1000 + index * 10, 'handles_fds': 5}
+                for index in range(count)]
+
+    def test_analyze_report_by_chunks(self) -> None:
+        rows = self.growing_rows(50)
+        detector = MemoryLeakDetector(tolerance=0.01)
+        for index, row in enumerate(rows):
+            detector.update(row['private_memory'], elapsed=datetime(2024, 2, 10, 17, 0, index).timestamp())
+
+        for name in ['report.csv', 'report.npcol']:
+            analysis = analyze_report(self.write(name, rows), chunk_rows=7)
+
+            self.assertEqual(50, analysis.count)
+            self.assertEqual(np.datetime64('2024-02-10T17:00:00'), analysis.start)
+            self.assertEqual(np.datetime64('2024-02-10T17:00:49'), analysis.end)
+            self.assertAlmostEqual(4.5, analysis.statistics['cpu_percent'].mean)
+            self.assertAlmostEqual(np.std([row['cpu_percent'] for row in rows], ddof=1),
+                                   analysis.statistics['cpu_percent'].std)
+            self.assertEqual(1490, analysis.statistics['private_memory'].maximum)
+            self.assertAlmostEqual(9.0, analysis.sketches['cpu_percent'].quantile(0.99), delta=0.09)
+            self.assertTrue(analysis.leaking)
+            self.assertAlmostEqual(detector.slope, analysis.slope)
+            self.assertAlmostEqual(detector.confidence, analysis.confidence)
+            self.assertEqual('increasing', analysis.trends['private_memory'].direction)
+            self.assertAlmostEqual(36000, analysis.trends['private_memory'].slope_per_hour)
+            self.assertEqual('stable', analysis.trends['handles_fds'].direction)
+
+    def test_analyze_report_without_gap_markers(self) -> None:
+        rows = self.growing_rows(3) + [{'cpu_percent': np.nan, 'private_memory': 0, 'handles_fds': 0}]
+
+        analysis = analyze_report(self.write('report.csv', rows))
+
+        self.assertEqual(3, analysis.count)
+        self.assertEqual(1000, analysis.statistics['private_memory'].minimum)
+
+    def test_analyze_group_report(self) -> None:
+        rows = [
+            {'pid': 10, 'cpu_percent': 1.0, 'private_memory': 100, 'handles_fds': 1},
+            {'pid': 11, 'cpu_percent': 2.0, 'private_memory': 200, 'handles_fds': 2},
+            {'pid': -1, 'cpu_percent': 3.0, 'private_memory': 300, 'handles_fds': 3},
+        ]
+
+        analysis = analyze_report(self.write('report.csv', rows, GROUP_REPORT_COLUMNS))
+
+        self.assertEqual(1, analysis.count)
+        self.assertEqual(3.0, analysis.statistics['cpu_percent'].mean)
+
+    def test_analyze_empty_report(self) -> None:
+        analysis = analyze_report(self.write('report.csv', []))
+
+        self.assertEqual(0, analysis.count)
+        self.assertFalse(analysis.leaking)
+        self.assertEqual(['Summary of 0 samples in 1 reports for report.csv from None to None'], analysis.summary())
+
+    def test_analyze_invalid_report(self) -> None:
+        path = self._path.joinpath('report_1m.csv')
+        path.write_text('timestamp,count\n2024-02-10 17:00:00,1\n')
+
+        with self.assertRaises(RuntimeError):
+            analyze_report(path)
+
+    def test_find_reports(self) -> None:
+        csv_report = self.write('app_20240210170000.csv', [])
+        rotated_report = self.write('app_20240210170000.1.csv', [])
+        npcol_report = self.write('app_20240210170000.npcol', [])
+        self.write('app_20240210170000_1m.csv', [])
+        self._path.joinpath('app_20240210170000_overhead.json').write_text('{}')
+
+        self.assertEqual(sorted([csv_report, rotated_report, npcol_report]), find_reports([self._path]))
+        self.assertEqual([npcol_report], find_reports([npcol_report]))
+        with self.assertRaises(RuntimeError):
+            find_reports([self._path.joinpath('missing.csv')])
+
+    def test_find_reports_with_dot_in_process_name(self) -> None:
+        csv_report = self.write('python3.11_20240210170000.csv', [])
+        rotated_report = self.write('python3.11_20240210170000.1.csv', [])
+        self.write('python3.11_20240210170000_1m.csv', [])
+        self.write('python3.11_20240210170000_1h.2.csv', [])
+        self.write('node.exe_20240210170000_1m.npcol', [])
+
+        self.assertEqual(sorted([csv_report, rotated_report]), find_reports([self._path]))
+
+    def test_analyze_reports_in_parallel(self) -> None:
+        paths = [self.write(f'report_{index}.csv', self.growing_rows(20)) for index in range(3)]
+        invalid_path = self._path.joinpath('invalid.csv')
+        invalid_path.write_text('timestamp\n')
+
+        with self.assertLogs(level='ERROR'):
+            analyses = analyze_reports(paths + [invalid_path], workers=2, chunk_rows=6)
+        sequential_analyses = analyze_reports(paths, workers=1)
+        total = merge_analyses('all reports', analyses)
+
+        self.assertEqual(['report_0.csv', 'report_1.csv', 'report_2.csv'], [analysis.name for analysis in analyses])
+        self.assertEqual([analysis.to_dict() for analysis in sequential_analyses],
+                         [analysis.to_dict() for analysis in analyses])
+        self.assertEqual(3, total.reports)
+        self.assertEqual(60, total.count)
+        self.assertAlmostEqual(4.5, total.statistics['cpu_percent'].mean)
+        self.assertIsNone(total.leaking)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,239 @@
+import csv
+import json
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from model.sample_buffer import SampleBuffer
+from supplier.report_writer import CsvReportWriter, NpcolReportWriter, ReportWriter
+from utils.report_utils import load_npcol_columns
+
+COLUMNS = {
+    'timestamp': 'datetime64[us]',
+    'cpu_percent': 'float64',
+    'private_memory': 'int64',
+    'memory_tier': 'object',
+}
+
+
+class FakeClock:
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestReportWriter(unittest.TestCase):
+
+    def test_incomplete_writer(self) -> None:
+        class IncompleteReportWriter(ReportWriter):
+
+            def close(self) -> None:
+                pass
+
+            def _write(self, samples: SampleBuffer) -> None:
+                pass
+
+        # Without _size and _close_file, the writer fails when created, not on its first rotation
+        with self.assertRaises(TypeError):
+            IncompleteReportWriter(path=Path('report.csv'), columns=list(COLUMNS))
+
+
+class TestCsvReportWriter(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = Path(self._directory.name).joinpath('pycharm_20240210170102.csv')
+        self._samples = SampleBuffer(columns=COLUMNS)
+        self._clock = FakeClock()
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def writer(self, **kwargs) -> CsvReportWriter:
+        return CsvReportWriter(path=self._path, columns=list(COLUMNS), clock=self._clock, **kwargs)
+
+    def append(self, count: int, start: int = 0) -> None:
+        for index in range(start, start + count):
+            self._samples.append({
+                'timestamp': datetime(2024, 2, 10, 17, 0, index, 500),
+                'cpu_percent': index * 1.5,
+                'private_memory': index * 1024,
+                'memory_tier': 'full',
+            })
+
+    def read(self, path: Path = None) -> list:
+        with open(path or self._path, newline='') as report:
+            return list(csv.reader(report))
+
+    def test_write_pending_by_rows(self) -> None:
+        writer = self.writer(flush_rows=3, flush_interval=60)
+
+        self.append(2)
+        writer.write_pending(self._samples)
+        self.assertFalse(self._path.exists())
+        self.assertEqual(2, len(self._samples))
+
+        self.append(1, start=2)
+        writer.write_pending(self._samples)
+        self.assertEqual(4, len(self.read()))
+        self.assertEqual(0, len(self._samples))
+        self.assertEqual(3, writer.rows)
+
+    def test_write_pending_by_interval(self) -> None:
+        writer = self.writer(flush_rows=100, flush_interval=10)
+
+        self.append(1)
+        self._clock.now = 9.9
+        writer.write_pending(self._samples)
+        self.assertFalse(self._path.exists())
+
+        self._clock.now = 10.0
+        writer.write_pending(self._samples)
+        self.assertEqual([
+            ['timestamp', 'cpu_percent', 'private_memory', 'memory_tier'],
+            ['2024-02-10 17:00:00.000500', '0.0', '0', 'full'],
+        ], self.read())
+
+    def test_flush_appends_to_report(self) -> None:
+        writer = self.writer()
+
+        self.append(2)
+        writer.flush(self._samples)
+        self.append(2, start=2)
+        writer.flush(self._samples)
+        writer.close()
+
+        dataframe = pd.read_csv(self._path, parse_dates=['timestamp'])
+        self.assertEqual([0.0, 1.5, 3.0, 4.5], dataframe['cpu_percent'].tolist())
+        self.assertEqual([0, 1024, 2048, 3072], dataframe['private_memory'].tolist())
+        self.assertEqual(datetime(2024, 2, 10, 17, 0, 3, 500), dataframe['timestamp'].iloc[3])
+
+    def test_flush_with_missing_values(self) -> None:
+        writer = self.writer()
+        self._samples.append({'timestamp': None, 'cpu_percent': float('nan'), 'private_memory': 0,
+                              'memory_tier': None})
+
+        writer.flush(self._samples)
+
+        self.assertEqual(['', '', '0', ''], self.read()[1])
+
+    def test_close_without_samples(self) -> None:
+        writer = self.writer()
+
+        writer.flush(self._samples)
+        writer.close()
+
+        self.assertEqual([['timestamp', 'cpu_percent', 'private_memory', 'memory_tier']], self.read())
+
+    def test_rotate(self) -> None:
+        writer = self.writer(rotate_bytes=100)
+
+        self.append(2)
+        writer.flush(self._samples)
+        self.append(2, start=2)
+        writer.flush(self._samples)
+        self.append(2, start=4)
+        writer.flush(self._samples)
+        writer.close()
+
+        first_path = self._path.with_name('pycharm_20240210170102.1.csv')
+        second_path = self._path.with_name('pycharm_20240210170102.2.csv')
+        self.assertEqual(['0.0', '1.5'], [row[1] for row in self.read(first_path)[1:]])
+        self.assertEqual(['3.0', '4.5'], [row[1] for row in self.read(second_path)[1:]])
+        self.assertEqual(['6.0', '7.5'], [row[1] for row in self.read()[1:]])
+
+    def test_rotate_by_interval_with_retention(self) -> None:
+        writer = self.writer(rotate_interval=60, max_rotations=1)
+
+        for start in range(0, 6, 2):
+            self.append(2, start=start)
+            writer.flush(self._samples)
+            self._clock.now += 60
+        writer.close()
+
+        self.assertFalse(self._path.with_name('pycharm_20240210170102.1.csv').exists())
+        second_path = self._path.with_name('pycharm_20240210170102.2.csv')
+        self.assertEqual(['3.0', '4.5'], [row[1] for row in self.read(second_path)[1:]])
+        self.assertEqual(['6.0', '7.5'], [row[1] for row in self.read()[1:]])
+
+
+class TestNpcolReportWriter(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = Path(self._directory.name).joinpath('pycharm_20240210170102.npcol')
+        self._samples = SampleBuffer(columns=COLUMNS)
+        self._writer = NpcolReportWriter(path=self._path, columns=list(COLUMNS), dtypes=COLUMNS)
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def append(self, tiers: list) -> None:
+        for index, tier in enumerate(tiers):
+            self._samples.append({
+                'timestamp': datetime(2024, 2, 10, 17, 0, index),
+                'cpu_percent': index * 1.5,
+                'private_memory': index * 1024,
+                'memory_tier': tier,
+            })
+
+    def test_flush(self) -> None:
+        self.append(['full', 'rss'])
+        self._writer.flush(self._samples)
+        self.append(['rss', 'rollup', 'full'])
+        self._writer.flush(self._samples)
+        self._writer.close()
+
+        schema = json.loads(self._path.joinpath('schema.json').read_text())
+        self.assertEqual(5, schema['rows'])
+        self.assertEqual([
+            {'name': 'timestamp', 'dtype': 'datetime64[us]'},
+            {'name': 'cpu_percent', 'dtype': '<f8'},
+            {'name': 'private_memory', 'dtype': '<i8'},
+            {'name': 'memory_tier', 'dtype': 'category', 'categories': ['full', 'rss', 'rollup']},
+        ], schema['columns'])
+        self.assertEqual(5 * 8, self._path.joinpath('cpu_percent.bin').stat().st_size)
+        self.assertEqual(5, self._path.joinpath('memory_tier.bin').stat().st_size)
+
+        columns = load_npcol_columns(self._path)
+        np.testing.assert_array_equal(np.array([0.0, 1.5, 0.0, 1.5, 3.0]), columns['cpu_percent'])
+        np.testing.assert_array_equal(np.array([0, 1024, 0, 1024, 2048]), columns['private_memory'])
+        self.assertEqual(['full', 'rss', 'rss', 'rollup', 'full'], columns['memory_tier'].tolist())
+        self.assertEqual(np.datetime64('2024-02-10T17:00:02', 'us'), columns['timestamp'][4])
+        self.assertIsInstance(columns['cpu_percent'], np.memmap)
+
+    def test_ignores_rows_not_in_schema(self) -> None:
+        self.append(['full', 'full'])
+        self._writer.flush(self._samples)
+        # Partial write of a crashed flush
+        with open(self._path.joinpath('cpu_percent.bin'), 'ab') as column_file:
+            column_file.write(b'\x00' * 12)
+
+        self.assertEqual(2, len(load_npcol_columns(self._path)['cpu_percent']))
+
+    def test_close_without_samples(self) -> None:
+        self._writer.close()
+
+        columns = load_npcol_columns(self._path)
+        self.assertEqual(0, len(columns['timestamp']))
+        self.assertEqual(np.dtype('datetime64[us]'), columns['timestamp'].dtype)
+
+    def test_rotate(self) -> None:
+        writer = NpcolReportWriter(path=self._path, columns=list(COLUMNS), dtypes=COLUMNS, rotate_bytes=10)
+
+        self.append(['full'])
+        writer.flush(self._samples)
+        self.append(['rss', 'rss'])
+        writer.flush(self._samples)
+        writer.close()
+
+        rotated_path = self._path.with_name('pycharm_20240210170102.1.npcol')
+        self.assertEqual(['full'], load_npcol_columns(rotated_path)['memory_tier'].tolist())
+        self.assertEqual(['rss', 'rss'], load_npcol_columns(self._path)['memory_tier'].tolist())
@@ -0,0 +1,159 @@
+import asyncio
+import unittest
+from typing import List
+from unittest.mock import patch, MagicMock
+
+from supplier.sampling_scheduler import SamplingScheduler
+
+
+class FakeClock:
+
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps: List[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, duration: float) -> None:
+        self.sleeps.append(duration)
+        self.now += duration
+
+
+class TestSamplingScheduler(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._clock = FakeClock()
+        self._samples = []
+
+    def scheduler(self, interval: float, duration: float, overrun_policy: str = 'skip') -> SamplingScheduler:
+        return SamplingScheduler(interval=interval, duration=duration, overrun_policy=overrun_policy,
+                                 clock=self._clock.clock, sleep=self._clock.sleep)
+
+    def job(self, durations: dict = None):
+        def run(lateness: float) -> None:
+            self._samples.append((round(self._clock.now, 6), round(lateness, 6)))
+            self._clock.now += (durations or {}).get(len(self._samples), 0.001)
+        return run
+
+    def test_run(self) -> None:
+        self.scheduler(interval=2, duration=7).run(self.job())
+
+        self.assertEqual([(102.0, 0.0), (104.0, 0.0), (106.0, 0.0)], self._samples)
+
+    def test_run_sub_second_interval(self) -> None:
+        self.scheduler(interval=0.01, duration=0.05).run(self.job())
+
+        self.assertEqual([100.01, 100.02, 100.03, 100.04, 100.05], [sample[0] for sample in self._samples])
+
+    def test_run_without_drift(self) -> None:
+        # Each collection takes 1 ms, the deadlines stay on the initial grid
+        self.scheduler(interval=0.1, duration=100).run(self.job())
+
+        self.assertEqual(1000, len(self._samples))
+        self.assertAlmostEqual(200.0, self._samples[-1][0])
+
+    def test_run_with_overrun_skip(self) -> None:
+        scheduler = self.scheduler(interval=1, duration=6)
+        scheduler.run(self.job(durations={2: 2.5}))
+
+        # The sample at 104 and 105 are missed
+        self.assertEqual([(101.0, 0.0), (102.0, 0.0), (105.0, 0.0), (106.0, 0.0)], self._samples)
+        self.assertEqual(2, scheduler.skipped)
+
+    def test_run_with_overrun_catch_up(self) -> None:
+        scheduler = self.scheduler(interval=1, duration=5, overrun_policy='catch-up')
+        scheduler.run(self.job(durations={2: 2.5}))
+
+        self.assertEqual([(101.0, 0.0), (102.0, 0.0), (104.5, 1.5), (104.501, 0.501), (105.0, 0.0)], self._samples)
+        self.assertEqual(0, scheduler.skipped)
+
+    def test_run_with_late_wake_up(self) -> None:
+        def late_sleep(duration: float) -> None:
+            self._clock.now += duration + 0.002
+
+        scheduler = SamplingScheduler(interval=1, duration=2, clock=self._clock.clock, sleep=late_sleep)
+        scheduler.run(self.job())
+
+        self.assertEqual([(101.002, 0.002), (102.002, 0.002)], self._samples)
+
+    def test_run_async(self) -> None:
+        async def fake_sleep(duration: float) -> None:
+            self._clock.sleep(duration)
+
+        async def job(lateness: float) -> None:
+            self.job()(lateness)
+
+        with patch('supplier.sampling_scheduler.asyncio.sleep', fake_sleep):
+            asyncio.run(self.scheduler(interval=2, duration=7).run_async(job))
+
+        self.assertEqual([(102.0, 0.0), (104.0, 0.0), (106.0, 0.0)], self._samples)
+
+    def test_run_woken_up_by_exit(self) -> None:
+        exits = []
+
+        def wait(duration: float) -> list:
+            # The target exits 0.5 second after the first sample
+            if len(self._samples) == 1 and not exits:
+                self._clock.now += 0.5
+                return [42]
+            self._clock.sleep(duration)
+            return []
+
+        exit_watcher = MagicMock()
+        exit_watcher.wait = MagicMock(side_effect=wait)
+        scheduler = SamplingScheduler(interval=2, duration=7, clock=self._clock.clock, sleep=self._clock.sleep,
+                                      exit_watcher=exit_watcher)
+        scheduler.run(self.job(), on_exit=exits.append)
+
+        # The exited target is not sampled, the deadlines are unchanged
+        self.assertEqual([[42]], exits)
+        self.assertEqual([(102.0, 0.0), (104.0, 0.0), (106.0, 0.0)], self._samples)
+
+    def test_run_async_woken_up_by_exit(self) -> None:
+        exits = []
+
+        async def wait_async(duration: float) -> list:
+            if len(self._samples) == 1 and not exits:
+                self._clock.now += 0.5
+                return [42]
+            self._clock.sleep(duration)
+            return []
+
+        async def job(lateness: float) -> None:
+            self.job()(lateness)
+
+        async def on_exit(pids: list) -> None:
+            exits.append(pids)
+
+        exit_watcher = MagicMock()
+        exit_watcher.wait_async = wait_async
+        scheduler = SamplingScheduler(interval=2, duration=5, clock=self._clock.clock, sleep=self._clock.sleep,
+                                      exit_watcher=exit_watcher)
+        asyncio.run(scheduler.run_async(job, on_exit=on_exit))
+
+        self.assertEqual([[42]], exits)
+        self.assertEqual([(102.0, 0.0), (104.0, 0.0)], self._samples)
+
+    def test_run_with_adaptive_interval(self) -> None:
+        intervals = iter([0.5, 0.25, 2, 4, 4])
+        scheduler = SamplingScheduler(interval=1, duration=8, clock=self._clock.clock, sleep=self._clock.sleep,
+                                      next_interval=lambda: next(intervals))
+
+        scheduler.run(self.job())
+
+        self.assertEqual([(101.0, 0.0), (101.5, 0.0), (101.75, 0.0), (103.75, 0.0), (107.75, 0.0)], self._samples)
+
+    def test_run_with_adaptive_interval_and_overrun(self) -> None:
+        scheduler = SamplingScheduler(interval=1, duration=6, clock=self._clock.clock, sleep=self._clock.sleep,
+                                      next_interval=lambda: 0.5)
+
+        scheduler.run(self.job(durations={2: 1.2}))
+
+        # The deadlines 102 and 102.5 are missed, the following ones are still on the same grid
+        self.assertEqual([(101.0, 0.0), (101.5, 0.0), (103.0, 0.0)], self._samples[:3])
+        self.assertEqual(2, scheduler.skipped)
+
+    def test_unknown_overrun_policy(self) -> None:
+        with self.assertRaises(RuntimeError):
+            self.scheduler(interval=1, duration=5, overrun_policy='wait')
@@ -0,0 +1,91 @@
+import json
+import math
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from supplier.self_instrumentation import SelfInstrumentation, STAGES
+
+
+class TestSelfInstrumentation(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._instrumentation = SelfInstrumentation()
+
+    @patch('supplier.self_instrumentation.time.perf_counter')
+    def test_wrap(self, mock_perf_counter) -> None:
+        mock_perf_counter.side_effect = [1.0, 1.5, 2.0, 2.25]
+        function = MagicMock(return_value=3)
+
+        timed = self._instrumentation.wrap('collect', function)
+
+        self.assertEqual(3, timed('process'))
+        self.assertEqual(3, timed('process'))
+        function.assert_called_with('process')
+        self.assertEqual(2, self._instrumentation['collect'].count)
+        self.assertAlmostEqual(0.375, self._instrumentation['collect'].mean)
+        self.assertAlmostEqual(0.5, self._instrumentation['collect'].maximum)
+
+    def test_wrap_with_exception(self) -> None:
+        timed = self._instrumentation.wrap('persist', MagicMock(side_effect=OSError))
+
+        with self.assertRaises(OSError):
+            timed()
+
+        self.assertEqual(1, self._instrumentation['persist'].count)
+
+    def test_wrap_updates_under_the_lock(self) -> None:
+        timed = self._instrumentation.wrap('render', MagicMock())
+        thread = threading.Thread(target=timed)
+
+        with self._instrumentation._lock:
+            thread.start()
+            thread.join(timeout=0.1)
+            count = self._instrumentation['render'].count
+        thread.join(timeout=5)
+
+        self.assertEqual(0, count)
+        self.assertEqual(1, self._instrumentation['render'].count)
+
+    def test_wrap_persist_samples_resources(self) -> None:
+        function = MagicMock()
+
+        self._instrumentation.wrap_persist(function)('samples')
+
+        function.assert_called_once_with('samples')
+        self.assertEqual(1, self._instrumentation['persist'].count)
+        self.assertGreater(self._instrumentation.summary()['peak_rss_bytes'], 0)
+
+    def test_wrap_scheduled(self) -> None:
+        function = MagicMock()
+        scheduled = self._instrumentation.wrap_scheduled(function)
+
+        scheduled(0.001)
+        scheduled(0.003)
+
+        function.assert_called_with(0.003)
+        self.assertEqual(2, self._instrumentation.lateness.count)
+        self.assertAlmostEqual(0.003, self._instrumentation.lateness.maximum)
+
+    def test_write(self) -> None:
+        self._instrumentation.wrap('aggregate', lambda: None)()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath('report_overhead.json')
+            summary = self._instrumentation.write(path)
+            content = json.loads(path.read_text())
+
+        self.assertEqual(summary, content)
+        self.assertEqual(STAGES, list(content['stages']))
+        self.assertEqual(1, content['stages']['aggregate']['count'])
+        # Stages never called and single values have no statistics
+        self.assertIsNone(content['stages']['aggregate']['std_ms'])
+        self.assertIsNone(content['stages']['collect']['mean_ms'])
+        self.assertIsNone(content['lateness']['max_ms'])
+        self.assertFalse(any(isinstance(value, float) and math.isnan(value) for value in content.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import math
+import unittest
+from unittest.mock import MagicMock
+
+from supplier.procfs_process import pthread
+from supplier.thread_collector import ThreadCollector, thread_columns
+
+
+class TestThreadCollector(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._now = 0.0
+        self._collector = ThreadCollector(top=2, clock=lambda: self._now)
+
+    def sample(self, pid: int, now: float, cpu_times: dict) -> list:
+        process = MagicMock(pid=pid)
+        process.threads.return_value = [pthread(tid, cpu_time, 0.0) for tid, cpu_time in cpu_times.items()]
+        self._now = now
+        return self._collector.collect(process)
+
+    def test_first_sample_has_no_reference(self) -> None:
+        self.assertEqual([], self.sample(10, 1.0, {1: 5.0, 2: 3.0}))
+
+    def test_busiest_threads(self) -> None:
+        self.sample(10, 1.0, {1: 5.0, 2: 3.0, 3: 1.0})
+
+        busiest = self.sample(10, 3.0, {1: 5.5, 2: 4.0, 3: 1.2})
+
+        self.assertEqual([(2, 50.0), (1, 25.0)], busiest)
+
+    def test_new_and_exited_threads(self) -> None:
+        self.sample(10, 1.0, {1: 5.0, 2: 3.0})
+
+        # Thread 2 has exited and thread 4 started during the interval, a reused tid does not go negative
+        busiest = self.sample(10, 2.0, {1: 5.1, 4: 0.3})
+        self.assertEqual([(4, 30.0), (1, 10.0)], busiest)
+
+        busiest = self.sample(10, 3.0, {1: 5.1, 2: 0.2, 4: 0.3})
+        self.assertEqual([(2, 20.0), (1, 0.0)], busiest)
+
+    def test_fewer_threads_than_top(self) -> None:
+        self.sample(10, 1.0, {1: 5.0})
+
+        self.assertEqual([(1, 100.0)], self.sample(10, 2.0, {1: 6.0}))
+
+    def test_busiest_of_several_processes(self) -> None:
+        self.sample(10, 1.0, {1: 0.0, 2: 0.0})
+        self.sample(11, 1.0, {3: 0.0})
+        self.sample(10, 2.0, {1: 0.1, 2: 0.5})
+        self.sample(11, 2.0, {3: 0.3})
+
+        self.assertEqual([(2, 50.0), (3, 30.0)], self._collector.busiest([10, 11]))
+        self.assertEqual([(3, 30.0)], self._collector.busiest([11, 12]))
+
+    def test_retain(self) -> None:
+        self.sample(10, 1.0, {1: 0.0})
+        self.sample(10, 2.0, {1: 0.5})
+
+        self._collector.retain([11])
+
+        self.assertEqual([], self._collector.busiest([10]))
+        self.assertEqual([], self.sample(10, 3.0, {1: 1.0}))
+
+    def test_to_columns(self) -> None:
+        columns = self._collector.to_columns([(7, 12.5)])
+
+        self.assertEqual(list(thread_columns(2)), list(columns))
+        self.assertEqual(7, columns['thread_1_tid'])
+        self.assertEqual(12.5, columns['thread_1_cpu_percent'])
+        self.assertEqual(-1, columns['thread_2_tid'])
+        self.assertTrue(math.isnan(columns['thread_2_cpu_percent']))
+
+    def test_thousands_of_threads(self) -> None:
+        self.sample(10, 1.0, {tid: 1.0 for tid in range(5000, 0, -1)})
+
+        busiest = self.sample(10, 2.0, {tid: 1.0 + (0.9 if tid in (42, 4242) else 0.0) for tid in range(1, 5001)})
+
+        self.assertEqual([42, 4242], sorted(tid for tid, _ in busiest))
+        self.assertEqual([90.0, 90.0], [cpu_percent for _, cpu_percent in busiest])
+
+
+if __name__ == '__main__':
+    unittest.main()
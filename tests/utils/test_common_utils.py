@@ -1,5 +1,7 @@
+import json
 import os
 import sys
+import tempfile
 import unittest
 from datetime import datetime
 from pathlib import Path
@@ -7,7 +9,8 @@ from unittest.mock import patch, MagicMock
 
 from model.configuration import Configuration
 from utils import common_utils
-from utils.common_utils import is_running_on_windows, pretty_print_bytes
+from model.trend_detector import TrendResult
+from utils.common_utils import is_running_on_windows, pretty_print_bytes, load_targets, pretty_print_trend
 
 
 class TestCommonUtils(unittest.TestCase):
@@ -33,6 +36,15 @@ class TestCommonUtils(unittest.TestCase):
             configuration = common_utils.parse_configuration()
             self.assertEqual(expected_configuration, configuration)
 
+    def test_parse_configuration_with_group_refresh(self) -> None:
+        argv = ['main.py', '-p', 'gunicorn', '-d', '60', '-r', '.', '-l', '.', '-m', 'all', '--group-refresh', '30']
+
+        with patch.object(sys, 'argv', argv):
+            configuration = common_utils.parse_configuration()
+
+        self.assertEqual('all', configuration.target_mode)
+        self.assertEqual(30, configuration.group_refresh)
+
     @patch('model.configuration.datetime', wrapper=datetime)
     def test_parse_configuration_optional_sampling_with_success(self, mock_datetime) -> None:
         reference_datetime = datetime(2024, 2, 9, 1, 2, 3)
@@ -53,6 +65,133 @@ class TestCommonUtils(unittest.TestCase):
             configuration = common_utils.parse_configuration()
             self.assertEqual(expected_configuration, configuration)
 
+    @patch('model.configuration.datetime', wrapper=datetime)
+    def test_parse_configuration_sub_second_sampling_with_success(self, mock_datetime) -> None:
+        reference_datetime = datetime(2024, 2, 9, 1, 2, 3)
+        mock_datetime.now = MagicMock(return_value=reference_datetime)
+
+        expected_configuration = Configuration(
+            process_name='pycharm',
+            duration=2.5,
+            sampling=0.05,
+            reports_directory=Path('.'),
+            logs_directory=Path('.'),
+            reference_datetime=reference_datetime,
+            overrun_policy='catch-up'
+        )
+
+        argv = ['main.py', '-p', 'pycharm', '-d', '2.5', '-s', '0.05', '-r', '.', '-l', '.', '--overrun', 'catch-up']
+
+        with patch.object(sys, 'argv', argv):
+            configuration = common_utils.parse_configuration()
+            self.assertEqual(expected_configuration, configuration)
+
+    def test_parse_configuration_without_process(self) -> None:
+        argv = ['main.py', '-d', '60', '-r', '.', '-l', '.']
+
+        with patch.object(sys, 'argv', argv):
+            with self.assertRaises(SystemExit):
+                common_utils.parse_configuration()
+
+    def test_parse_configuration_daemon(self) -> None:
+        argv = ['main.py', '-p', 'pycharm', '--daemon', '--raw-retention', '600', '-r', '.', '-l', '.']
+
+        with patch.object(sys, 'argv', argv):
+            configuration = common_utils.parse_configuration()
+
+        self.assertTrue(configuration.daemon)
+        self.assertIsNone(configuration.duration)
+        self.assertEqual(600, configuration.raw_retention)
+
+    def test_parse_configuration_with_match(self) -> None:
+        argv = ['main.py', '-p', '/run/nginx.pid', '--match', 'pidfile', '-d', '60', '-r', '.', '-l', '.']
+
+        with patch.object(sys, 'argv', argv):
+            configuration = common_utils.parse_configuration()
+
+        self.assertEqual('pidfile', configuration.match)
+        self.assertEqual('/run/nginx.pid', configuration.process_name)
+
+    def test_parse_configuration_with_instrumentation(self) -> None:
+        argv = ['main.py', '-p', 'pycharm', '-d', '60', '--instrumentation', '-r', '.', '-l', '.']
+
+        with patch.object(sys, 'argv', argv):
+            configuration = common_utils.parse_configuration()
+
+        self.assertTrue(configuration.instrumentation)
+
+    def test_parse_configuration_with_metrics_port(self) -> None:
+        argv = ['main.py', '-p', 'pycharm', '-d', '60', '--metrics-port', '9464', '-r', '.', '-l', '.']
+
+        with patch.object(sys, 'argv', argv):
+            configuration = common_utils.parse_configuration()
+
+        self.assertEqual(9464, configuration.metrics_port)
+        self.assertEqual('127.0.0.1', configuration.metrics_host)
+
+    def test_parse_configuration_with_top_threads(self) -> None:
+        argv = ['main.py', '-p', 'pycharm', '-d', '60', '--top-threads', '3', '-r', '.', '-l', '.']
+
+        with patch.object(sys, 'argv', argv):
+            configuration = common_utils.parse_configuration()
+
+        self.assertEqual(3, configuration.top_threads)
+
+    def test_parse_configuration_with_collectors(self) -> None:
+        argv = ['main.py', '-p', 'pycharm', '-d', '60', '--collect', 'io', 'threads', '-r', '.', '-l', '.']
+
+        with patch.object(sys, 'argv', argv):
+            configuration = common_utils.parse_configuration()
+
+        self.assertEqual(['io', 'threads'], configuration.collectors)
+
+    def test_parse_configuration_with_adaptive_sampling(self) -> None:
+        argv = ['main.py', '-p', 'pycharm', '-d', '60', '--adaptive-sampling', '--max-sampling', '30', '-r', '.',
+                '-l', '.']
+
+        with patch.object(sys, 'argv', argv):
+            configuration = common_utils.parse_configuration()
+
+        self.assertTrue(configuration.adaptive_sampling)
+        self.assertEqual((1.25, 30.0), configuration.sampling_bounds)
+
+    def test_parse_configuration_with_trend(self) -> None:
+        argv = ['main.py', '-p', 'pycharm', '-d', '600', '--trend', '--trend-window', '300', '-r', '.', '-l', '.']
+
+        with patch.object(sys, 'argv', argv):
+            configuration = common_utils.parse_configuration()
+
+        self.assertTrue(configuration.trend_detection)
+        self.assertEqual(300, configuration.trend_window)
+
+    def test_parse_configuration_without_duration(self) -> None:
+        argv = ['main.py', '-p', 'pycharm', '-r', '.', '-l', '.']
+
+        with patch.object(sys, 'argv', argv):
+            with self.assertRaises(SystemExit):
+                common_utils.parse_configuration()
+
+    def test_parse_configuration_with_targets_file(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath('fleet.json')
+            path.write_text(json.dumps({'targets': [
+                {'process_name': 'gunicorn', 'duration': 60, 'target_mode': 'all'},
+                {'process_name': 'postgres', 'duration': 120, 'sampling': 10},
+            ]}))
+            argv = ['main.py', '-c', str(path), '-s', '2', '-r', '.', '-l', '.', '--max-workers', '3']
+
+            with patch.object(sys, 'argv', argv):
+                configuration = common_utils.parse_configuration()
+
+        self.assertEqual('fleet', configuration.process_name)
+        self.assertEqual(120, configuration.duration)
+        self.assertEqual(3, configuration.max_workers)
+        self.assertEqual(['gunicorn', 'postgres'], [target.process_name for target in configuration.targets])
+        self.assertEqual([60, 120], [target.duration for target in configuration.targets])
+        self.assertEqual([2, 10], [target.sampling for target in configuration.targets])
+        self.assertEqual(['all', 'first'], [target.target_mode for target in configuration.targets])
+        self.assertEqual(configuration.reference_datetime, configuration.targets[0].reference_datetime)
+
     def test_parse_configuration_with_invalid_duration(self) -> None:
         argv = ['main.py', '-p', 'pycharm', '-d', 'invalid', '-r', '.', '-l', '.']
     
@@ -68,6 +207,49 @@ class TestCommonUtils(unittest.TestCase):
                 common_utils.parse_configuration()
     #endregion
 
+    # region load_targets
+    def load(self, content: str) -> list:
+        self._base_configuration = Configuration(
+            process_name='fleet',
+            duration=30,
+            sampling=5,
+            reports_directory=Path('.'),
+            logs_directory=Path('.')
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath('fleet.json')
+            path.write_text(content)
+            return load_targets(path, self._base_configuration)
+
+    def test_load_targets(self) -> None:
+        targets = self.load(json.dumps({'max_workers': 2, 'targets': [
+            {'process_name': 'gunicorn', 'reports_directory': 'reports', 'memory_tier': 'rss'},
+        ]}))
+
+        self.assertEqual(2, self._base_configuration.max_workers)
+        self.assertEqual(1, len(targets))
+        self.assertEqual('gunicorn', targets[0].process_name)
+        self.assertEqual(30, targets[0].duration)
+        self.assertEqual(Path('reports'), targets[0].reports_directory)
+        self.assertEqual('rss', targets[0].memory_tier)
+
+    def test_load_targets_with_unknown_field(self) -> None:
+        with self.assertRaisesRegex(RuntimeError, 'Unknown target fields'):
+            self.load(json.dumps({'targets': [{'process_name': 'gunicorn', 'interval': 1}]}))
+
+    def test_load_targets_without_process_name(self) -> None:
+        with self.assertRaisesRegex(RuntimeError, 'without process_name'):
+            self.load(json.dumps({'targets': [{'duration': 1}]}))
+
+    def test_load_targets_without_targets(self) -> None:
+        with self.assertRaisesRegex(RuntimeError, 'No target has been found'):
+            self.load(json.dumps({'targets': []}))
+
+    def test_load_targets_with_invalid_json(self) -> None:
+        with self.assertRaisesRegex(RuntimeError, 'cannot be read'):
+            self.load('{"targets": ')
+    # endregion
+
     # region is_running_on_windows
     @patch('utils.common_utils.os', wrapper=os)
     def test_is_running_on_windows(self, mock_os) -> None:
@@ -88,5 +270,19 @@ class TestCommonUtils(unittest.TestCase):
         self.assertEqual('1.0 TB', pretty_print_bytes(1099511627776))
         self.assertEqual('123.4 MB', pretty_print_bytes(129394278))
 
+    def test_pretty_print_trend(self) -> None:
+        increasing = TrendResult(direction='increasing', slope=1024 / 3600, s=40, tau=0.9, z=4.2, p_value=2.6e-05,
+                                 points=10)
+        decreasing = TrendResult(direction='decreasing', slope=-0.5, s=-40, tau=-0.9, z=-4.2, p_value=2.6e-05,
+                                 points=10)
+        stable = TrendResult(direction='stable', slope=0.0, s=2, tau=0.04, z=0.1, p_value=0.92, points=10)
+
+        self.assertEqual('private_memory increasing +1.0 KB per hour (p 2.6e-05)',
+                         pretty_print_trend('private_memory', increasing))
+        self.assertEqual('handles_fds decreasing -1800.0 per hour (p 2.6e-05)',
+                         pretty_print_trend('handles_fds', decreasing))
+        self.assertEqual('cpu_percent stable (p 0.92)', pretty_print_trend('cpu_percent', stable))
+        self.assertEqual('cpu_percent not enough samples', pretty_print_trend('cpu_percent', None))
+
 
 
@@ -0,0 +1,52 @@
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from pandas._testing import assert_frame_equal
+
+from model.sample_buffer import SampleBuffer
+from supplier.report_writer import CsvReportWriter, NpcolReportWriter
+from utils.report_utils import load_report
+
+COLUMNS = {
+    'timestamp': 'datetime64[us]',
+    'cpu_percent': 'float64',
+    'private_memory': 'int64',
+    'memory_tier': 'object',
+}
+
+
+class TestReportUtils(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def write(self, writer_class, name: str, **kwargs) -> Path:
+        samples = SampleBuffer(columns=COLUMNS)
+        samples.append({'timestamp': datetime(2024, 2, 10, 17, 0, 0), 'cpu_percent': 1.5,
+                        'private_memory': 1024, 'memory_tier': 'full'})
+        samples.append({'timestamp': datetime(2024, 2, 10, 17, 0, 1), 'cpu_percent': 2.5,
+                        'private_memory': 2048, 'memory_tier': 'rss'})
+        path = Path(self._directory.name).joinpath(name)
+        writer = writer_class(path=path, columns=list(COLUMNS), **kwargs)
+        writer.flush(samples)
+        writer.close()
+        return path
+
+    def test_load_report_formats(self) -> None:
+        csv_report = load_report(self.write(CsvReportWriter, 'report.csv'))
+        npcol_report = load_report(self.write(NpcolReportWriter, 'report.npcol', dtypes=COLUMNS))
+
+        expected = pd.DataFrame({
+            'timestamp': pd.to_datetime(['2024-02-10 17:00:00', '2024-02-10 17:00:01']),
+            'cpu_percent': [1.5, 2.5],
+            'private_memory': [1024, 2048],
+            'memory_tier': ['full', 'rss'],
+        })
+        assert_frame_equal(expected, csv_report, check_dtype=False)
+        assert_frame_equal(expected, npcol_report.copy(), check_dtype=False)
@@ -1,31 +1,174 @@
 import argparse
+import dataclasses
+import json
 import os
 from pathlib import Path
+from typing import List, Optional
 
-from model.configuration import Configuration
+from model.configuration import Configuration, TARGET_MODES, MEMORY_TIERS, BACKENDS, OVERRUN_POLICIES, \
+    REPORT_FORMATS, MATCH_MODES, CONSOLE_MODES, METRIC_COLLECTORS
+from model.trend_detector import TrendResult
 
 
 def parse_configuration() -> Configuration:
     parser = argparse.ArgumentParser(description='Process resources monitoring application')
-    parser.add_argument('-p', '--process', help='Process name', type=str, required=True)
-    parser.add_argument('-d', '--duration', help='Overall duration of the monitoring (in seconds)', type=int, required=True)
-    parser.add_argument('-s', '--sampling', help='Sampling interval (in seconds)', type=int, default=5)
+    parser.add_argument('-p', '--process', help='Process name, or pattern, pid or pidfile depending on --match, '
+                                                'required without targets file', type=str)
+    parser.add_argument('-d', '--duration', help='Overall duration of the monitoring (in seconds), '
+                                                 'required without targets file or daemon mode', type=float)
+    parser.add_argument('-s', '--sampling', help='Sampling interval (in seconds, down to 0.01)', type=float, default=5)
     parser.add_argument('-r', '--reports-dir', help='Report directory to store CSV', type=str, default='output/reports')
     parser.add_argument('-l', '--logs-dir', help='Logs directory', type=str, default='output/logs')
+    parser.add_argument('--match', help='Match the process by exact name, name regex, command line regex, '
+                                        'pid or pidfile', type=str, choices=MATCH_MODES, default='name')
+    parser.add_argument('--reattach', help='When the process exits, wait for it to restart and keep monitoring it',
+                        action='store_true')
+    parser.add_argument('-m', '--mode', help='Monitor the first process matching the name, all of them, '
+                                             'or the first one and its descendants', type=str,
+                        choices=TARGET_MODES, default='first')
+    parser.add_argument('--group-refresh', help='With all or tree mode, look for new processes every N seconds '
+                                                '(0 for every sample)', type=float, default=10.0)
+    parser.add_argument('--memory-tier', help='Private memory collection: rss only, smaps_rollup (Linux) '
+                                              'or full memory information', type=str,
+                        choices=MEMORY_TIERS, default='full')
+    parser.add_argument('--memory-tier-interval', help='Collect the memory tier every N samples only, '
+                                                       'estimating it from the rss in between', type=int, default=1)
+    parser.add_argument('-b', '--backend', help='Sampling backend, procfs reads /proc directly on Linux', type=str,
+                        choices=BACKENDS, default='psutil')
+    parser.add_argument('--adaptive-sampling', help='Shorten the sampling interval when the metrics change fast and '
+                                                    'lengthen it when they are stable', action='store_true')
+    parser.add_argument('--min-sampling', help='Minimum adaptive sampling interval (in seconds), '
+                                               'a quarter of the sampling interval if not set', type=float,
+                        default=None)
+    parser.add_argument('--max-sampling', help='Maximum adaptive sampling interval (in seconds), '
+                                               'four times the sampling interval if not set', type=float, default=None)
+    parser.add_argument('--overrun', help='When a collection overruns the sampling interval, skip the missed samples '
+                                          'or catch up by sampling immediately', type=str,
+                        choices=OVERRUN_POLICIES, default='skip')
+    parser.add_argument('-c', '--config', help='JSON file with the list of targets to monitor concurrently', type=str)
+    parser.add_argument('--max-workers', help='Number of threads collecting the metrics of the targets', type=int,
+                        default=4)
+    parser.add_argument('-f', '--report-format', help='Report format, csv or npcol (binary columns, see README)',
+                        type=str, choices=list(REPORT_FORMATS), default='csv')
+    parser.add_argument('--flush-rows', help='Write the report every N samples', type=int, default=1000)
+    parser.add_argument('--flush-interval', help='Write the report at least every N seconds', type=float, default=10.0)
+    parser.add_argument('--rotate-size', help='Rotate the report when it exceeds this size (in MB)', type=float,
+                        default=None)
+    parser.add_argument('--leak-window', help='Memory leak detection window (in seconds), '
+                                              'whole monitoring if not set', type=float, default=None)
+    parser.add_argument('--leak-tolerance', help='Tolerated memory decrease before the leak trend is reset '
+                                                 '(in percent)', type=float, default=1.0)
+    parser.add_argument('--trend', help='Detect the trends of the CPU, memory and handles / fds with the '
+                                        'Mann-Kendall test and the Theil-Sen slope', action='store_true')
+    parser.add_argument('--trend-window', help='Trend detection window (in seconds), whole monitoring if not set',
+                        type=float, default=None)
+    parser.add_argument('--console', help='Console output: a row per refresh, a table updated in place '
+                                          'or nothing', type=str, choices=CONSOLE_MODES, default='rows')
+    parser.add_argument('--refresh-interval', help='Console refresh interval (in seconds)', type=float, default=1.0)
+    parser.add_argument('--daemon', help='Monitor until stopped, older samples are rolled up at 1 minute '
+                                         'and 1 hour resolutions', action='store_true')
+    parser.add_argument('--raw-retention', help='In daemon mode, keep the raw samples of this last period only '
+                                                '(in seconds)', type=float, default=3600.0)
+    parser.add_argument('--instrumentation', help='Measure the overhead of the monitoring itself, written next to '
+                                                  'the report', action='store_true')
+    parser.add_argument('--top-threads', help='Report the N threads using the most CPU in each sample', type=int,
+                        default=0)
+    parser.add_argument('--collect', help='Additional metrics collected in each sample', type=str, nargs='+',
+                        choices=METRIC_COLLECTORS, default=[])
+    parser.add_argument('--metrics-port', help='Serve the metrics in OpenMetrics format on this port, '
+                                               'e.g. for Prometheus', type=int, default=None)
+    parser.add_argument('--metrics-host', help='Address the metrics endpoint listens on', type=str,
+                        default='127.0.0.1')
     
     args = parser.parse_args()
+    if args.config is None and args.process is None:
+        parser.error('the following arguments are required without targets file: -p/--process')
+    if args.config is None and args.duration is None and not args.daemon:
+        parser.error('the following arguments are required without targets file or daemon mode: -d/--duration')
+    
     configuration = Configuration(
-        process_name=args.process,
+        process_name=args.process if args.process is not None else Path(args.config).stem,
         duration=args.duration,
         sampling=args.sampling,
         reports_directory=Path(args.reports_dir),
-        logs_directory=Path(args.logs_dir)
+        logs_directory=Path(args.logs_dir),
+        leak_window=args.leak_window,
+        leak_tolerance=args.leak_tolerance,
+        target_mode=args.mode,
+        group_refresh=args.group_refresh,
+        memory_tier=args.memory_tier,
+        memory_tier_interval=args.memory_tier_interval,
+        backend=args.backend,
+        overrun_policy=args.overrun,
+        max_workers=args.max_workers,
+        flush_rows=args.flush_rows,
+        flush_interval=args.flush_interval,
+        rotate_size=args.rotate_size,
+        report_format=args.report_format,
+        daemon=args.daemon,
+        raw_retention=args.raw_retention,
+        match=args.match,
+        reattach=args.reattach,
+        console=args.console,
+        refresh_interval=args.refresh_interval,
+        instrumentation=args.instrumentation,
+        metrics_host=args.metrics_host,
+        metrics_port=args.metrics_port,
+        top_threads=args.top_threads,
+        collectors=args.collect,
+        adaptive_sampling=args.adaptive_sampling,
+        min_sampling=args.min_sampling,
+        max_sampling=args.max_sampling,
+        trend_detection=args.trend,
+        trend_window=args.trend_window
     )
+    if args.config is not None:
+        configuration.targets = load_targets(Path(args.config), configuration)
+        if configuration.duration is None and not any(target.daemon for target in configuration.targets):
+            configuration.duration = max(target.duration for target in configuration.targets)
     configuration.validate()
     
     return configuration
 
 
+def load_targets(path: Path, base_configuration: Configuration) -> List[Configuration]:
+    # Each target overrides the fields of the command line configuration, e.g.
+    # {"max_workers": 8, "targets": [{"process_name": "gunicorn", "target_mode": "all", "sampling": 1}]}
+    try:
+        with open(path) as targets_file:
+            content = json.load(targets_file)
+    except (OSError, ValueError) as error:
+        raise RuntimeError(f'Targets file {path} cannot be read: {error}')
+    
+    if not isinstance(content, dict):
+        raise RuntimeError(f'Targets file {path} should contain a JSON object')
+    
+    if 'max_workers' in content:
+        base_configuration.max_workers = content['max_workers']
+    
+    fields = {field.name for field in dataclasses.fields(Configuration)} - {'reference_datetime', 'targets', 'max_workers'}
+    targets = []
+    for target in content.get('targets', []):
+        unknown_fields = set(target) - fields
+        if unknown_fields:
+            raise RuntimeError(f'Unknown target fields {sorted(unknown_fields)} in {path}')
+        if 'process_name' not in target:
+            raise RuntimeError(f'A target without process_name has been found in {path}')
+        
+        for directory in ['reports_directory', 'logs_directory']:
+            if directory in target:
+                target[directory] = Path(target[directory])
+        configuration = dataclasses.replace(base_configuration, targets=[], **target)
+        if configuration.duration is None and not configuration.daemon:
+            raise RuntimeError(f'Target {configuration.process_name} has no duration')
+        targets.append(configuration)
+    
+    if not targets:
+        raise RuntimeError(f'No target has been found in {path}')
+    
+    return targets
+
+
 def is_running_on_windows() -> bool:
     return os.name == 'nt'
 
@@ -38,3 +181,13 @@ def pretty_print_bytes(bytes: float, bsize: int = 1024) -> str:
             return f'{round(value, 2)} {unit}'
     
     return f'{bytes} Bytes'
+
+
+def pretty_print_trend(metric: str, trend: Optional[TrendResult]) -> str:
+    if trend is None:
+        return f'{metric} not enough samples'
+    if trend.direction == 'stable':
+        return f'{metric} stable (p {trend.p_value:.2g})'
+    slope = trend.slope_per_hour
+    growth = pretty_print_bytes(abs(slope)) if metric == 'private_memory' else round(abs(slope), 2)
+    return f'{metric} {trend.direction} {"+" if slope >= 0 else "-"}{growth} per hour (p {trend.p_value:.2g})'
@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+import numpy as np
+
+from model.quantile_sketch import QuantileSketch
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def load_npcol_columns(path: Path, names: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    # Columns are memory mapped, only the pages actually used by the analysis are read from the disk
+    schema = json.loads(path.joinpath('schema.json').read_text())
+    rows = schema['rows']
+
+    names = set(names) if names is not None else None
+    columns = {}
+    for column in schema['columns']:
+        name = column['name']
+        if names is not None and name not in names:
+            continue
+        if column['dtype'] == 'category':
+            dtype = np.dtype('<u1')
+        elif column['dtype'] == 'datetime64[us]':
+            dtype = np.dtype('<i8')
+        else:
+            dtype = np.dtype(column['dtype'])
+
+        if rows == 0:
+            values = np.empty(0, dtype=dtype)
+        else:
+            values = np.memmap(path.joinpath(f'{name}.bin'), dtype=dtype, mode='r', shape=(rows,))
+
+        if column['dtype'] == 'category':
+            values = np.array(column['categories'], dtype=object)[values]
+        elif column['dtype'] == 'datetime64[us]':
+            values = values.view('datetime64[us]')
+        columns[name] = values
+
+    return columns
+
+
+def load_report(path: Path) -> 'pd.DataFrame':
+    import pandas as pd
+
+    if path.is_dir():
+        return pd.DataFrame(load_npcol_columns(path), copy=False)
+    return pd.read_csv(path, parse_dates=['timestamp'])
+
+
+def load_sketches(paths: Iterable[Path]) -> Dict[str, QuantileSketch]:
+    # The sketches of several runs are merged per metric, e.g. to get the percentiles of a whole week
+    sketches = {}
+    for path in paths:
+        try:
+            content = json.loads(path.read_text())
+        except (OSError, ValueError) as error:
+            raise RuntimeError(f'Sketches {path} cannot be read: {error}')
+        for metric, sketch in content.items():
+            sketch = QuantileSketch.from_dict(sketch)
+            if metric in sketches:
+                sketches[metric].merge(sketch)
+            else:
+                sketches[metric] = sketch
+    return sketches